@@ -1,39 +1,109 @@
 import atexit
+import collections
 import concurrent.futures
 import glob
+import hashlib
+import importlib
+import importlib.util
+import io
 import logging
+import mmap
 import os
+import queue
 import re
 import shutil
 import subprocess
 import sys
 import json
+import logging.handlers
 import tempfile
 import threading
 import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import webbrowser
 print("Executável usado:", sys.executable)
 
 
-try:
-    import psutil
-    PSUtil_AVAILABLE = True
-except ImportError:
-    PSUtil_AVAILABLE = False
+# =============================================================================
+# IMPORTAÇÃO TARDIA DE DEPENDÊNCIAS
+# =============================================================================
+# Disponibilidade verificada com find_spec (sem importar); o módulo só é
+# carregado no primeiro uso, com o tempo gasto registrado para o relatório
+import_report = {}
+
+def dependencia_disponivel(nome):
+    """Verifica se o módulo está instalado sem importá-lo"""
+    try:
+        return importlib.util.find_spec(nome) is not None
+    except (ImportError, ValueError):
+        return False
+
+def importar_tardio(nome):
+    """Importa o módulo no primeiro uso e registra o tempo de importação"""
+    modulo = sys.modules.get(nome)
+    if modulo is not None:
+        return modulo
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nome)
+    import_report[nome] = time.perf_counter() - inicio
+    logging.info(f"Importação tardia: {nome} ({import_report[nome] * 1000:.0f} ms)")
+    return modulo
+
+def relatorio_importacoes():
+    """Linhas com o tempo de cada importação tardia já realizada"""
+    if not import_report:
+        return ["  Nenhuma dependência pesada carregada ainda"]
+    return [f"  {nome}: {segundos * 1000:.0f} ms" for nome, segundos in sorted(import_report.items())]
+
+PSUtil_AVAILABLE = dependencia_disponivel("psutil")
+if not PSUtil_AVAILABLE:
     logging.warning("psutil não disponível - algumas métricas estarão limitadas")
 
 
-pdf_metadata_cache = {}
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('juntapdf.log', encoding='utf-8')
-    ]
-)
+class IndiceMetadados:
+    """
+    Metadados dos PDFs de entrada, válidos enquanto tamanho e mtime do arquivo
+    não mudarem. Cada entrada acumula o que já foi calculado (texto do tooltip,
+    perfil de conteúdo...), evitando reabrir o PDF a cada consulta.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entradas = {}
+
+    def entrada(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        assinatura = (st.st_size, st.st_mtime_ns)
+        with self.lock:
+            atual = self.entradas.get(path)
+            if atual is None or atual['assinatura'] != assinatura:
+                atual = {'assinatura': assinatura, 'tamanho': st.st_size}
+                self.entradas[path] = atual
+            return atual
+
+    def obter(self, path, campo, calcular):
+        """Valor em cache do campo, calculado com calcular(path) na primeira vez"""
+        entrada = self.entrada(path)
+        if entrada is None:
+            return calcular(path)
+        if campo not in entrada:
+            entrada[campo] = calcular(path)
+        return entrada[campo]
+
+    def valores(self):
+        with self.lock:
+            return list(self.entradas.values())
+
+    def clear(self):
+        with self.lock:
+            self.entradas.clear()
+
+    def __len__(self):
+        return len(self.entradas)
+
+pdf_metadata_cache = IndiceMetadados()
 
 # =============================================================================
 # VARIÁVEIS GLOBAIS DE DEPENDÊNCIAS - DEFINIR PRIMEIRO
@@ -43,6 +113,7 @@ PIKEPDF_AVAILABLE = False
 DND_AVAILABLE = False
 PDFA_AVAILABLE = False
 GHOSTSCRIPT_PATH = None
+GHOSTSCRIPT_VERSION = None
 ICC_PROFILE_PATH = None
 _atexit_cleanup_registered = False
 temp_files_global = []
@@ -60,14 +131,17 @@ class SecureLogger:
             r'senha[=:]\s*\S+',
             r'pwd[=:]\s*\S+'
         ]
+        # Um único padrão pré-compilado: uma passada por mensagem
+        self.sensitive_regex = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.sensitive_patterns),
+            re.IGNORECASE
+        )
     
     def sanitize_log(self, message):
         """Remove informações sensíveis dos logs"""
         if not isinstance(message, str):
             message = str(message)
-        for pattern in self.sensitive_patterns:
-            message = re.sub(pattern, '[REDACTED]', message, flags=re.IGNORECASE)
-        return message
+        return self.sensitive_regex.sub('[REDACTED]', message)
 
 secure_logger = SecureLogger()
 
@@ -118,6 +192,16 @@ def setup_log_rotation():
         logging.warning(f"Erro no sistema de rotação de logs: {e}")
 
 
+class SanitizingQueueListener(logging.handlers.QueueListener):
+    """Sanitiza cada registro uma única vez, fora da thread que o emitiu"""
+
+    def prepare(self, record):
+        # QueueHandler já incorporou args e traceback em record.msg
+        record.msg = secure_logger.sanitize_log(record.msg)
+        return record
+
+log_listener = None
+
 def setup_logging():
     """Configura sistema de logging profissional para troubleshooting"""
     # 🔥 NOVO: Rotação de logs antes de criar novo
@@ -131,23 +215,28 @@ def setup_logging():
     
     log_file = os.path.join(log_dir, f"juntapdf_{time.strftime('%Y%m%d')}.log")
     
-    # Handler personalizado para sanitização
-    class SanitizedFileHandler(logging.FileHandler):
-        def emit(self, record):
-            record.msg = secure_logger.sanitize_log(record.msg)
-            if record.args:
-                record.args = tuple(secure_logger.sanitize_log(str(arg)) if isinstance(arg, str) else arg 
-                                  for arg in record.args)
-            super().emit(record)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            SanitizedFileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    # Handlers reais rodam na thread do listener; as threads de trabalho só enfileiram
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler(log_file, encoding='utf-8'),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    global log_listener
+    log_queue = queue.SimpleQueue()
+    log_listener = SanitizingQueueListener(log_queue, *handlers)
+    
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO)
+    
+    log_listener.start()
+    atexit.register(log_listener.stop)
     
     logging.info("=" * 60)
     logging.info("JuntaPDF Iniciado")
@@ -194,10 +283,49 @@ def show_first_run_disclaimer():
 # =============================================================================
 # CONSTANTES DE SEGURANÇA E LIMITES
 # =============================================================================
-MAX_CONCURRENT_OPERATIONS = 1
-MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
-MAX_TOTAL_PAGES = 10000
-MAX_FILES_PER_OPERATION = 100
+MAX_CONCURRENT_OPERATIONS = 4  # Teto de trabalhos simultâneos na fila
+TRABALHO_MEMORIA_ESTIMADA = 1024 * 1024 * 1024  # Memória reservada por trabalho ao dimensionar a fila
+FILA_ATUALIZACAO_MS = 500  # Intervalo de atualização da aba Fila de Trabalhos
+UI_TAXA_ATUALIZACAO = 25  # Hz: teto de aplicação das atualizações vindas das threads de trabalho
+MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB - teto sem pikepdf (PyPDF2 monta as saídas em memória)
+MAX_FILE_SIZE_GRANDE = 64 * 1024 * 1024 * 1024  # 64GB - teto com pikepdf (acesso sob demanda via qpdf)
+LIMITE_ARQUIVO_GRANDE = 200 * 1024 * 1024  # Acima disso o arquivo é processado fora do núcleo, pelo pikepdf
+MEMORIA_FRACAO_LIMITES = 0.5  # Fração da memória disponível considerada pelos limites de operação
+MEMORIA_POR_PAGINA = 2 * 1024  # Residente por página numa união em streaming (xref, árvore de páginas)
+MEMORIA_POR_ARQUIVO = 64 * 1024  # Residente por arquivo de entrada (lista, índice de metadados, checkpoint)
+FATOR_MEMORIA_PYPDF2 = 2  # A união pelo PdfMerger mantém as entradas inteiras em memória (~2x o tamanho)
+LIMITE_PAGINAS_MINIMO = 10000  # Pisos dos limites derivados da memória
+LIMITE_ARQUIVOS_MINIMO = 100
+STREAMING_PAGINAS_POR_NO = 128  # Páginas por nó intermediário da árvore gerada em streaming
+POOL_DESCRITORES_MAX = 64  # Teto de arquivos de entrada abertos ao mesmo tempo pelas uniões
+MERGE_SEGMENT_SIZE = 50  # Arquivos por segmento durável (permite retomar uniões grandes)
+CHECKPOINT_MAX_AGE = 3600  # Checkpoints sem intermediário durável expiram em 1 hora
+CHECKPOINT_RESUME_MAX_AGE = 7 * 24 * 3600  # Checkpoints retomáveis valem 7 dias
+CHECKPOINT_FLUSH_INTERVAL = 25  # Registros do journal por flush/fsync
+CHECKPOINT_COMPACT_INTERVAL = 500  # Registros até reescrever o journal compactado
+GS_MEMORIA_POR_PROCESSO = 256 * 1024 * 1024  # Estimativa conservadora por processo Ghostscript
+WORKSPACE_BYTE_BUDGET = 4 * 1024 * 1024 * 1024  # Orçamento quando o espaço livre do destino não pode ser lido (4GB)
+WORKSPACE_FREE_SPACE_MARGIN = 100 * 1024 * 1024  # Folga mínima de disco após reservar a operação
+SPOOL_MAX_MEMORY = 32 * 1024 * 1024  # Intermediários até 32MB ficam em memória, sem tocar o disco
+EXEC_POLL_INTERVAL = 0.1  # Segundos entre verificações de cancelamento de processos externos
+PROCESSO_TERMINATE_GRACE = 2  # Segundos para o processo encerrar antes do kill
+GS_COMPRESSAO_TIMEOUT = 3600  # Limite total da compressão (o progresso é acompanhado por página)
+GS_IDLE_TIMEOUT = 120  # Segundos sem nenhuma página concluída até considerar o Ghostscript travado
+GS_PDFSETTINGS = {  # Nível de compressão da interface -> -dPDFSETTINGS do Ghostscript
+    "Qualidade Máxima": "/printer",      # Balanço ideal qualidade/tamanho
+    "Qualidade Equilibrada": "/ebook",   # Boa qualidade, menor tamanho
+    "Tamanho Mínimo": "/screen",         # Tamanho mínimo, qualidade reduzida
+}
+GS_PDFSETTINGS_PADRAO = "/printer"  # Níveis sem mapeamento (ex.: Otimização Automática)
+SPLIT_GRAVADORES = 2  # Threads gravando partes da divisão em disco enquanto a próxima é montada
+SPLIT_BUFFER_MAX = 256 * 1024 * 1024  # Bytes de partes serializadas aguardando gravação
+SPLIT_OBJETO_OVERHEAD = 40  # Bytes estimados por objeto indireto (cabeçalho, dicionário, xref)
+SPLIT_PAGINA_OVERHEAD = 300  # Bytes estimados por página (dicionário da página e árvore de páginas)
+SPLIT_ARQUIVO_OVERHEAD = 1024  # Bytes estimados por arquivo (cabeçalho, catálogo, trailer)
+SPLIT_CHAVES_NAO_SEGUIDAS = ("/Parent", "/P", "/Dest")  # Ligações para a árvore e outras páginas, fora da estimativa
+AUDIT_QUEUE_SIZE = 1000  # Eventos de auditoria aguardando gravação
+AUDIT_BATCH_SIZE = 100  # Eventos gravados por lote
+AUDIT_FSYNC_INTERVAL = 5.0  # Segundos entre fsync do log de auditoria
 
 # =============================================================================
 # EXCEÇÕES PERSONALIZADAS
@@ -218,6 +346,60 @@ class PDFProcessingError(Exception):
     """Erro geral de processamento PDF"""
     pass
 
+class OperationCancelledError(PDFProcessingError):
+    """Operação cancelada pelo usuário"""
+    def __init__(self, message="Operação cancelada pelo usuário"):
+        super().__init__(message)
+
+# =============================================================================
+# CANCELAMENTO POR OPERAÇÃO
+# =============================================================================
+# Cada operação recebe seu próprio token. Ele é verificado em todos os laços
+# pesados, a cada escrita de objeto do PDF de saída e a cada EXEC_POLL_INTERVAL
+# durante processos externos; assim o cancelamento é atendido em até
+# EXEC_POLL_INTERVAL + PROCESSO_TERMINATE_GRACE segundos, sem afetar outras operações.
+class CancellationToken:
+    def __init__(self):
+        self._evento = threading.Event()
+
+    def cancel(self):
+        self._evento.set()
+
+    @property
+    def cancelled(self):
+        return self._evento.is_set()
+
+    def is_cancelled(self):
+        return self._evento.is_set()
+
+    def raise_if_cancelled(self):
+        if self._evento.is_set():
+            raise OperationCancelledError()
+
+    def wait(self, timeout):
+        """Pausa interrompível: retorna True se cancelado durante a espera"""
+        return self._evento.wait(timeout)
+
+class ArquivoCancelavel:
+    """Repassa escritas a um arquivo, interrompendo a serialização do PDF ao cancelar"""
+    def __init__(self, arquivo, token):
+        self.arquivo = arquivo
+        self.token = token
+
+    def write(self, data):
+        self.token.raise_if_cancelled()
+        return self.arquivo.write(data)
+
+    def tell(self):
+        return self.arquivo.tell()
+
+    def __getattr__(self, name):
+        return getattr(self.arquivo, name)
+
+def cancelar_operacao(tipo=None):
+    """Cancela os trabalhos do tipo indicado ("merge", "split"), ou todos quando tipo é None"""
+    fila_trabalhos.cancelar_tipo(tipo)
+
 # =============================================================================
 # MONITORAMENTO DE PERFORMANCE E SEGURANÇA
 # =============================================================================
@@ -246,36 +428,184 @@ performance_monitor = PerformanceMonitor()
 # =============================================================================
 # SISTEMA DE RECUPERAÇÃO DE FALHAS
 # =============================================================================
-def create_operation_checkpoint(operation_type, files_processed, current_step, temp_files):
-    """Salva estado atual da operação para recovery"""
-    checkpoint = {
-        'operation_type': operation_type,
-        'files_processed': list(files_processed),
-        'current_step': current_step,
-        'temp_files': list(temp_files),
-        'timestamp': time.time()
-    }
-    
-    checkpoint_file = os.path.join(tempfile.gettempdir(), f"juntapdf_checkpoint_{os.getpid()}.json")
-    try:
-        with open(checkpoint_file, 'w', encoding='utf-8') as f:
-            json.dump(checkpoint, f)
-        # Restringir permissões do arquivo
-        if hasattr(os, 'chmod'):
-            os.chmod(checkpoint_file, 0o600)
-        logging.info(f"Checkpoint criado: {checkpoint_file}")
-    except Exception as e:
-        logging.warning(f"Erro ao criar checkpoint: {e}")
+# Quando o programa é fechado no meio de uma união retomável, o checkpoint e
+# os segmentos duráveis são preservados para a próxima inicialização
+aplicacao_encerrando = False
+checkpoint_preservado = False
+merge_resume_state = None
+
+_checkpoint_seq = iter(range(1, 1 << 31))
+
+def checkpoint_path(nome):
+    """Caminho do journal de checkpoint de uma operação deste processo"""
+    return os.path.join(tempfile.gettempdir(), f"juntapdf_checkpoint_{os.getpid()}_{nome}.jsonl")
+
+def checkpoints_desta_instancia():
+    """Journals das operações deste processo (uma por trabalho da fila)"""
+    return glob.glob(checkpoint_path("*"))
+
+class CheckpointJournal:
+    """
+    Checkpoint da operação em journal append-only (JSON Lines).
+    O primeiro registro traz o estado completo; cada arquivo processado acrescenta
+    só um delta pequeno, com flush/fsync em lote. Segmentos duráveis são
+    sincronizados na hora. A cada CHECKPOINT_COMPACT_INTERVAL registros o journal
+    é reescrito atomicamente com o estado consolidado.
+    """
+
+    def __init__(self, operation_type, **estado):
+        self.path = checkpoint_path(next(_checkpoint_seq))
+        self.estado = {
+            'operation_type': operation_type,
+            'files_processed_count': 0,
+            'current_step': 0,
+            'temp_files': [],
+            'segments': [],
+            'timestamp': time.time()
+        }
+        self.estado.update(estado)
+        self.arquivo = None
+        self.pendentes = 0
+        self.registros = 0
+        self._compactar()
+
+    def _compactar(self):
+        """Reescreve o journal com um único registro de estado (gravação atômica)"""
+        try:
+            if self.arquivo:
+                self.arquivo.close()
+            temp_checkpoint = self.path + ".tmp"
+            with open(temp_checkpoint, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(dict(self.estado, tipo="estado")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            # Restringir permissões do arquivo
+            if hasattr(os, 'chmod'):
+                os.chmod(temp_checkpoint, 0o600)
+            os.replace(temp_checkpoint, self.path)
+            self.arquivo = open(self.path, 'a', encoding='utf-8')
+            self.pendentes = 0
+            self.registros = 0
+        except Exception as e:
+            logging.warning(f"Erro ao gravar checkpoint: {e}")
+            self.arquivo = None
+
+    def _anexar(self, registro, duravel=False):
+        if not self.arquivo:
+            return
+        try:
+            self.arquivo.write(json.dumps(registro) + "\n")
+            self.pendentes += 1
+            self.registros += 1
+            if duravel or self.pendentes >= CHECKPOINT_FLUSH_INTERVAL:
+                self.sincronizar()
+            if self.registros >= CHECKPOINT_COMPACT_INTERVAL:
+                self._compactar()
+        except Exception as e:
+            logging.warning(f"Erro ao gravar checkpoint: {e}")
+
+    def arquivo_processado(self, processados, current_step):
+        """Registra o avanço da operação (delta de tamanho constante)"""
+        agora = time.time()
+        self.estado.update(files_processed_count=processados, current_step=current_step, timestamp=agora)
+        self._anexar({'tipo': "arquivo", 'n': processados, 'step': current_step, 'ts': agora})
+
+    def segmento(self, segmento, **estado):
+        """Registra um segmento durável - sincronizado imediatamente"""
+        agora = time.time()
+        self.estado['segments'].append(segmento)
+        self.estado.update(estado, timestamp=agora)
+        self._anexar(dict(estado, tipo="segmento", segmento=segmento, ts=agora), duravel=True)
+
+    def sincronizar(self):
+        if self.arquivo and self.pendentes:
+            self.arquivo.flush()
+            os.fsync(self.arquivo.fileno())
+            self.pendentes = 0
+
+    def fechar(self):
+        try:
+            self.sincronizar()
+        except Exception as e:
+            logging.warning(f"Erro ao sincronizar checkpoint: {e}")
+        if self.arquivo:
+            self.arquivo.close()
+            self.arquivo = None
+
+    def remover(self):
+        """Remove o journal após operação concluída (ou descartada)"""
+        self.fechar()
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+                logging.info("Checkpoint removido")
+        except Exception as e:
+            logging.warning(f"Erro ao remover checkpoint: {e}")
+
+def carregar_checkpoint(path):
+    """Reconstrói o estado de um checkpoint reproduzindo o journal"""
+    estado = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                break  # Última linha incompleta: interrupção no meio da gravação
+            tipo = registro.pop('tipo', None)
+            if tipo == "estado":
+                estado = registro
+            elif estado is None:
+                break
+            elif tipo == "arquivo":
+                estado.update(files_processed_count=registro['n'], current_step=registro['step'], timestamp=registro['ts'])
+            elif tipo == "segmento":
+                estado['segments'].append(registro.pop('segmento'))
+                estado['timestamp'] = registro.pop('ts')
+                estado.update(registro)
+
+    if estado is None:
+        raise ValueError("Checkpoint sem registro de estado")
+    estado['files_processed'] = estado.get('files', [])[:estado.get('files_processed_count', 0)]
+    return estado
+
+def file_fingerprint(path):
+    """Tamanho e mtime do arquivo - detecta entradas alteradas antes de retomar"""
+    st = os.stat(path)
+    return [st.st_size, int(st.st_mtime)]
+
+def validar_segmentos_checkpoint(data):
+    """
+    Retorna o maior prefixo de segmentos duráveis ainda utilizáveis:
+    o segmento existe com o tamanho gravado e suas entradas não mudaram.
+    """
+    files = data.get('files', [])
+    fingerprints = data.get('fingerprints', [])
+    validos = []
+    coberto = 0
+
+    for segmento in data.get('segments', []):
+        fim = coberto + segmento.get('files_count', 0)
+        try:
+            if os.path.getsize(segmento['path']) != segmento.get('size'):
+                break
+            if any(file_fingerprint(files[i]) != fingerprints[i] for i in range(coberto, fim)):
+                logging.warning("Entradas alteradas desde a interrupção - retomada a partir do segmento anterior")
+                break
+        except (OSError, IndexError, KeyError):
+            break
+        validos.append(segmento)
+        coberto = fim
+
+    return validos
 
 def cleanup_checkpoint():
-    """Remove checkpoint após operação bem-sucedida"""
-    checkpoint_file = os.path.join(tempfile.gettempdir(), f"juntapdf_checkpoint_{os.getpid()}.json")
-    try:
-        if os.path.exists(checkpoint_file):
+    """Remove os checkpoints deste processo no encerramento"""
+    for checkpoint_file in checkpoints_desta_instancia():
+        try:
             os.remove(checkpoint_file)
             logging.info("Checkpoint removido")
-    except Exception as e:
-        logging.warning(f"Erro ao remover checkpoint: {e}")
+        except Exception as e:
+            logging.warning(f"Erro ao remover checkpoint: {e}")
 
 # =============================================================================
 # 🚨 CORREÇÃO 1: EXECUÇÃO SEGURA CENTRALIZADA - ELIMINA TODOS shell=True
@@ -283,24 +613,32 @@ def cleanup_checkpoint():
 
 def attempt_auto_recovery():
     """Tenta recuperação automática de operações interrompidas"""
-    checkpoint_pattern = os.path.join(tempfile.gettempdir(), "juntapdf_checkpoint_*.json")
+    checkpoint_pattern = os.path.join(tempfile.gettempdir(), "juntapdf_checkpoint_*.jsonl")
     checkpoints = glob.glob(checkpoint_pattern)
     
     recovered_operations = []
     
     for checkpoint_file in checkpoints:
         try:
-            with open(checkpoint_file, 'r', encoding='utf-8') as f:
-                checkpoint = json.load(f)
-            
-            # Verificar se é recente (menos de 1 hora) e válido
-            is_recent = time.time() - checkpoint.get('timestamp', 0) < 3600
+            # Checkpoint de uma operação em andamento nesta instância
+            if checkpoint_file in checkpoints_desta_instancia():
+                continue
+
+            checkpoint = carregar_checkpoint(checkpoint_file)
+
+            # Retomável: possui segmentos duráveis cuja área temporária ainda existe
+            resumable = bool(checkpoint.get('segments')) and os.path.isdir(checkpoint.get('workspace') or "")
+            max_age = CHECKPOINT_RESUME_MAX_AGE if resumable else CHECKPOINT_MAX_AGE
+
+            # Verificar se é recente e válido
+            is_recent = time.time() - checkpoint.get('timestamp', 0) < max_age
             has_valid_data = checkpoint.get('files_processed') and checkpoint.get('operation_type')
             
             if is_recent and has_valid_data:
                 recovered_operations.append({
                     'file': checkpoint_file,
                     'data': checkpoint,
+                    'resumable': resumable,
                     'age_minutes': int((time.time() - checkpoint['timestamp']) / 60)
                 })
                 
@@ -314,6 +652,25 @@ def attempt_auto_recovery():
     
     return recovered_operations
 
+# Prefixos das áreas temporárias criadas por ScratchWorkspace (únicas que o descarte apaga)
+PREFIXOS_AREA_TEMPORARIA = (".juntapdf_tmp_", "juntapdf_tmp_")
+
+def descartar_recuperacao(checkpoint_file, workspace_dir=None):
+    """Remove o checkpoint de uma operação interrompida e a área temporária preservada com ele"""
+    try:
+        os.remove(checkpoint_file)
+    except FileNotFoundError:
+        pass
+    if workspace_dir:
+        # O caminho vem de um JSON no diretório temporário compartilhado: só apaga o que é nosso
+        nome = os.path.basename(os.path.normpath(workspace_dir))
+        if (nome.startswith(PREFIXOS_AREA_TEMPORARIA) and os.path.isdir(workspace_dir)
+                and not os.path.islink(workspace_dir)):
+            shutil.rmtree(workspace_dir, ignore_errors=True)
+        else:
+            logging.warning(f"Área temporária do checkpoint ignorada (não é do JuntaPDF): {workspace_dir}")
+    logging.info(f"Recuperação descartada: {os.path.basename(checkpoint_file)}")
+
 def offer_recovery_on_startup():
     """Oferece recovery na inicialização do programa"""
     try:
@@ -332,12 +689,15 @@ def offer_recovery_on_startup():
                 f"• Tipo: {operation_type}\n"
                 f"• Arquivos: {file_count}\n" 
                 f"• Interrompida há: {age} minutos\n\n"
-                f"Deseja visualizar detalhes para possível recuperação?",
+                f"Deseja visualizar detalhes para possível recuperação?\n\n"
+                f"(Não: descarta o checkpoint e os resultados parciais)",
                 icon='warning'
             )
             
             if response:
                 show_recovery_details(recovery)
+            else:
+                descartar_recuperacao(recovery['file'], recovery['data'].get('workspace') if recovery.get('resumable') else None)
                 
     except Exception as e:
         logging.error(f"Erro no sistema de recovery: {e}")
@@ -381,73 +741,158 @@ Arquivos envolvidos:
     
     def cleanup_recovery():
         try:
-            os.remove(recovery['file'])
+            descartar_recuperacao(recovery['file'], data.get('workspace') if recovery.get('resumable') else None)
             details_window.destroy()
             show_toast("Checkpoint de recovery removido")
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao remover checkpoint: {e}")
     
+    def resume_recovery():
+        details_window.destroy()
+        retomar_merge(recovery)
+    
+    if recovery.get('resumable') and data.get('operation_type') == "merge":
+        ttk.Button(button_frame, text="Retomar União", 
+                  command=resume_recovery).pack(side="left", padx=5)
     ttk.Button(button_frame, text="Limpar Recovery", 
               command=cleanup_recovery).pack(side="left", padx=5)
     ttk.Button(button_frame, text="Fechar", 
               command=details_window.destroy).pack(side="right", padx=5)
 
+def retomar_merge(recovery):
+    """Restaura a união interrompida na aba Juntar e a reinicia do primeiro arquivo não segmentado"""
+    global merge_resume_state
+    data = recovery['data']
 
-def process_large_file_in_chunks(file_path, operation_callback, chunk_size=5*1024*1024):
+    segmentos = validar_segmentos_checkpoint(data)
+    if not segmentos:
+        descartar_recuperacao(recovery['file'], data.get('workspace'))
+        messagebox.showwarning(
+            "Retomada Indisponível",
+            "Os resultados parciais desta união não estão mais íntegros.\n\n"
+            "A operação precisará ser refeita desde o início."
+        )
+        return
+
+    missing = [f for f in data['files'] if not os.path.exists(f)]
+    if missing:
+        descartar_recuperacao(recovery['file'], data.get('workspace'))
+        messagebox.showerror(
+            "Retomada Indisponível",
+            f"{len(missing)} arquivo(s) de entrada não existem mais:\n\n"
+            + "\n".join(os.path.basename(f) for f in missing[:5])
+        )
+        return
+
+    # Restaura lista, destino e opções da operação original
+    merge_list.delete(0, tk.END)
+    for f in data['files']:
+        merge_list.insert(tk.END, f)
+    merge_output_entry.delete(0, tk.END)
+    merge_output_entry.insert(0, os.path.dirname(data['output_path']))
+
+    options = data.get('options', {})
+    compress_var.set(options.get('compress', False))
+    compress_level.set(options.get('compress_level', compress_level.get()))
+    meta_var.set(options.get('remove_metadata', False))
+    pdfa_var.set(options.get('pdfa', False) and PDFA_AVAILABLE)
+    protect_var.set(options.get('protected', False))
+
+    data = dict(data, segments=segmentos, checkpoint_file=recovery['file'])
+    merge_resume_state = data
+    notebook.select(0)
+    update_stats_debounced(merge_list, total_files_merge_var, total_pages_merge_var, total_size_merge_var)
+    enable_submit_on_conditions()
+
+    resumidos = sum(seg['files_count'] for seg in segmentos)
+    logging.info(f"Retomada preparada: {resumidos}/{len(data['files'])} arquivos já unidos")
+
+    if options.get('protected'):
+        # A senha nunca é gravada no checkpoint
+        messagebox.showinfo(
+            "Retomar União",
+            f"{resumidos} de {len(data['files'])} arquivos já foram unidos.\n\n"
+            "Digite novamente a senha de proteção e clique em 'Juntar PDFs' para continuar."
+        )
+    else:
+        merge_pdfs()
+
+def consumir_merge_resume(files):
     """
-    Processa arquivos grandes em chunks para economizar memória
-    operation_callback: função que processa cada chunk (deve retornar dados processados)
+    Retorna (e consome) o estado de retomada se corresponder à lista atual; se a
+    lista mudou, a retomada foi recusada e o checkpoint e os segmentos são descartados
     """
-    temp_files = []
+    global merge_resume_state
+    state, merge_resume_state = merge_resume_state, None
+    if not state:
+        return None
+    if list(files) == state.get('files'):
+        return state
+    descartar_recuperacao(state['checkpoint_file'], state.get('workspace'))
+    return None
+
+
+# Processos externos iniciados por esta instância (cancelamento direcionado)
+processos_ativos = set()
+processos_lock = threading.Lock()
+
+def finalizar_processo(processo):
+    """Encerra um processo filho: terminate, e kill se não sair no prazo"""
+    if processo.poll() is not None:
+        return False
+    processo.terminate()
     try:
-        file_size = os.path.getsize(file_path)
-        total_chunks = (file_size + chunk_size - 1) // chunk_size
-        
-        logging.info(f"Processando arquivo grande em chunks: {os.path.basename(file_path)} "
-                    f"({file_size/1024/1024:.1f}MB, {total_chunks} chunks)")
-        
-        with open(file_path, 'rb') as f:
-            for chunk_num in range(total_chunks):
-                if cancel_operation:
-                    raise PDFProcessingError("Operação cancelada pelo usuário")
-                
-                # Ler chunk
-                chunk_data = f.read(chunk_size)
-                if not chunk_data:
-                    break
-                
-                # Processar chunk usando a callback fornecida
-                processed_chunk = operation_callback(chunk_data, chunk_num, total_chunks)
-                
-                # Salvar chunk processado em arquivo temporário
-                temp_file = os.path.join(tempfile.gettempdir(), 
-                                       f"chunk_{chunk_num}_{os.getpid()}_{int(time.time())}.tmp")
-                with open(temp_file, 'wb') as temp_f:
-                    temp_f.write(processed_chunk)
-                
-                temp_files.append(temp_file)
-                add_temp_file(temp_file)
-                
-                # Atualizar progresso
-                progress = (chunk_num + 1) / total_chunks * 100
-                show_status(f"Processando chunk {chunk_num + 1}/{total_chunks} ({progress:.1f}%)", "info")
-                root.update_idletasks()
-        
-        return temp_files
-        
-    except Exception as e:
-        # Limpeza em caso de erro
-        for temp_file in temp_files:
+        processo.wait(timeout=PROCESSO_TERMINATE_GRACE)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+        processo.wait()
+    return True
+
+def descartar_saida(processo):
+    """Lê o que restou da saída sem esperar netos que herdaram os pipes"""
+    try:
+        processo.communicate(timeout=PROCESSO_TERMINATE_GRACE)
+    except (subprocess.TimeoutExpired, ValueError):
+        for pipe in (processo.stdout, processo.stderr):
+            if pipe:
+                pipe.close()
+
+def _ler_saida(pipe, linhas, on_line, ultima_atividade):
+    """Lê um pipe linha a linha (thread), repassando cada linha ao callback"""
+    for linha in pipe:
+        linhas.append(linha)
+        ultima_atividade[0] = time.monotonic()
+        if on_line:
             try:
-                os.remove(temp_file)
-                remove_temp_file(temp_file)
-            except:
-                pass
-        raise PDFProcessingError(f"Erro no processamento por chunks: {e}")
+                on_line(linha)
+            except Exception as e:
+                logging.debug(f"Erro ao interpretar saída: {e}")
+
+def _encerrar_leitores(processo, leitores):
+    """Espera as threads de leitura por PROCESSO_TERMINATE_GRACE e fecha os pipes lidos até o fim"""
+    for leitor, pipe in zip(leitores, (processo.stdout, processo.stderr)):
+        leitor.join(PROCESSO_TERMINATE_GRACE)
+        if leitor.is_alive():
+            # Um neto herdou o pipe: close() bloquearia junto com a leitura; a thread (daemon) termina no EOF
+            logging.debug(f"Pipe do pid {processo.pid} ainda aberto por outro processo")
+        else:
+            pipe.close()
+
+def _interromper(processo, leitores):
+    finalizar_processo(processo)
+    if leitores:
+        _encerrar_leitores(processo, leitores)
+    else:
+        descartar_saida(processo)
 
-def exec_segura(cmd, timeout=300, descricao="", progress_widget=None):
+def exec_segura(cmd, timeout=300, descricao="", progress_widget=None, should_cancel=None,
+                on_output_line=None, idle_timeout=None):
     """
     Execução centralizada e segura de comandos - ELIMINA shell=True
+    O processo é acompanhado pela operação que o iniciou: timeout e
+    should_cancel() encerram exatamente esse filho.
+    on_output_line: recebe cada linha do stdout assim que é produzida;
+    idle_timeout: encerra se o processo ficar esse tempo sem produzir saída.
     """
     # 🔒 CONVERSÃO OBRIGATÓRIA: string → lista
     if isinstance(cmd, str):
@@ -456,6 +901,7 @@ def exec_segura(cmd, timeout=300, descricao="", progress_widget=None):
     
     logging.info(f"Executando {descricao}: {' '.join(cmd)}")
     
+    processo = None
     try:
         # Configurar progresso se fornecido
         if progress_widget and hasattr(progress_widget, 'config'):
@@ -463,15 +909,56 @@ def exec_segura(cmd, timeout=300, descricao="", progress_widget=None):
             progress_widget.start(10)
         
         # 🚨 CRÍTICO: shell=False SEMPRE
-        result = subprocess.run(
+        processo = subprocess.Popen(
             cmd,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True, 
-            timeout=timeout,
             shell=False,  # 🔒 IMPEDE SHELL INJECTION
             encoding='utf-8',
             errors='ignore'
         )
+        with processos_lock:
+            processos_ativos.add(processo)
+        
+        # Modo streaming: threads leem stdout/stderr enquanto o processo roda
+        ultima_atividade = [time.monotonic()]
+        saida_stdout, saida_stderr = [], []
+        leitores = []
+        if on_output_line or idle_timeout:
+            leitores = [
+                threading.Thread(target=_ler_saida, args=(processo.stdout, saida_stdout, on_output_line, ultima_atividade), daemon=True),
+                threading.Thread(target=_ler_saida, args=(processo.stderr, saida_stderr, None, ultima_atividade), daemon=True)
+            ]
+            for leitor in leitores:
+                leitor.start()
+        
+        limite = time.monotonic() + timeout
+        while True:
+            try:
+                if leitores:
+                    processo.wait(timeout=EXEC_POLL_INTERVAL)
+                    _encerrar_leitores(processo, leitores)
+                    stdout, stderr = ''.join(saida_stdout), ''.join(saida_stderr)
+                else:
+                    stdout, stderr = processo.communicate(timeout=EXEC_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            
+            if should_cancel and should_cancel():
+                logging.info(f"Cancelando {descricao} (pid {processo.pid})")
+                _interromper(processo, leitores)
+                raise PDFProcessingError("Operação cancelada pelo usuário")
+            
+            agora = time.monotonic()
+            if agora > limite:
+                _interromper(processo, leitores)
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            if idle_timeout and agora - ultima_atividade[0] > idle_timeout:
+                logging.error(f"{descricao} sem atividade há {idle_timeout}s")
+                _interromper(processo, leitores)
+                raise subprocess.TimeoutExpired(cmd, idle_timeout)
         
         # Parar progresso
         if progress_widget and hasattr(progress_widget, 'stop'):
@@ -479,24 +966,77 @@ def exec_segura(cmd, timeout=300, descricao="", progress_widget=None):
             if hasattr(progress_widget, 'config'):
                 progress_widget.config(mode="determinate")
         
-        return result
+        return subprocess.CompletedProcess(cmd, processo.returncode, stdout, stderr)
         
     except subprocess.TimeoutExpired:
         logging.error(f"Timeout em {descricao}")
         if progress_widget and hasattr(progress_widget, 'stop'):
             progress_widget.stop()
-        kill_ghostscript_processes()
         raise
     except Exception as e:
         logging.error(f"Erro em {descricao}: {e}")
         if progress_widget and hasattr(progress_widget, 'stop'):
             progress_widget.stop()
         raise
+    finally:
+        if processo is not None:
+            with processos_lock:
+                processos_ativos.discard(processo)
 
 # =============================================================================
 # VALIDAÇÕES DE SEGURANÇA FORTALECIDAS
 # =============================================================================
-def validate_file_security(file_path):
+# Marcadores de risco procurados no arquivo inteiro: os bloqueantes rejeitam o PDF,
+# os demais são comuns em documentos legítimos e só ficam registrados no log
+MARCADORES_BLOQUEANTES = {
+    "/JavaScript": "JavaScript incorporado",
+    "/JS": "JavaScript incorporado",
+    "/Launch": "ação /Launch (execução de programas)",
+}
+MARCADORES_AVISO = {
+    "/EmbeddedFile": "arquivo embutido",
+    "/OpenAction": "ação automática na abertura",
+}
+MARCADORES_REGEX = re.compile(rb"/(JavaScript|JS|Launch|EmbeddedFile|OpenAction)(?=[\s/<>\[\]()%{}]|$)")
+# Nomes com escapes #xx (ex.: /J#61vaScript) são raros; só esses são decodificados
+NOME_ESCAPADO_REGEX = re.compile(rb"/[A-Za-z]*#[0-9A-Fa-f]{2}(?:[A-Za-z]|#[0-9A-Fa-f]{2})*")
+
+def mapear_pdf(file_path):
+    """Mapeia o arquivo só para leitura - a varredura, o hash e o parse compartilham o buffer"""
+    with open(file_path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SecurityError("Arquivo vazio")
+
+def varrer_marcadores(buffer):
+    """Uma passada pelo arquivo inteiro; devolve os marcadores encontrados (para no primeiro bloqueante)"""
+    encontrados = set()
+    for match in MARCADORES_REGEX.finditer(buffer):
+        nome = "/" + match.group(1).decode("ascii")
+        encontrados.add(nome)
+        if nome in MARCADORES_BLOQUEANTES:
+            return encontrados
+    for match in NOME_ESCAPADO_REGEX.finditer(buffer):
+        nome = NOME_PDF_ESCAPE_REGEX.sub(lambda m: chr(int(m.group(1), 16)), match.group(0).decode("latin-1"))
+        if nome in MARCADORES_BLOQUEANTES or nome in MARCADORES_AVISO:
+            encontrados.add(nome)
+    return encontrados
+
+def verificar_buffer_pdf(buffer, file_path):
+    """Assinatura e marcadores de risco sobre o buffer mapeado"""
+    if buffer[:4] != b'%PDF':
+        raise SecurityError("Arquivo não é um PDF válido (assinatura inválida)")
+    
+    # 🔒 VERIFICAR JAVASCRIPT / AÇÕES EMBUTIDAS (ARQUIVO INTEIRO)
+    encontrados = varrer_marcadores(buffer)
+    for nome in encontrados:
+        if nome in MARCADORES_BLOQUEANTES:
+            raise SecurityError(f"Arquivo PDF contém {MARCADORES_BLOQUEANTES[nome]} - potencial risco de segurança")
+    for nome in encontrados:
+        logging.info(f"{os.path.basename(file_path)}: {MARCADORES_AVISO[nome]} ({nome})")
+
+def validate_file_security(file_path, buffer=None):
     """Validação completa de segurança do arquivo - VERSÃO CORRIGIDA"""
     # Verificar se arquivo existe
     if not os.path.exists(file_path):
@@ -504,8 +1044,9 @@ def validate_file_security(file_path):
     
     # Tamanho máximo
     file_size = os.path.getsize(file_path)
-    if file_size > MAX_FILE_SIZE:
-        raise SecurityError(f"Arquivo muito grande ({file_size/1024/1024:.1f}MB > {MAX_FILE_SIZE/1024/1024}MB)")
+    limite = limite_tamanho_arquivo()
+    if file_size > limite:
+        raise SecurityError(f"Arquivo muito grande ({file_size/1024/1024:.1f}MB > {limite/1024/1024:.0f}MB)")
     
     # 🔥 CORREÇÃO CRÍTICA: Validação de nome de arquivo MAIS PERMISSIVA
     # Permite caracteres comuns como (), $, -, _ mas ainda bloqueia injeção
@@ -539,19 +1080,15 @@ def validate_file_security(file_path):
     except Exception as e:
         raise SecurityError(f"Erro ao validar caminho do arquivo: {e}")
     
-    # Verificar se é PDF pela assinatura
+    # Verificar assinatura e conteúdo - reaproveita o buffer de quem já mapeou o arquivo
     try:
-        with open(file_path, 'rb') as f:
-            header = f.read(4)
-            if header != b'%PDF':
-                raise SecurityError("Arquivo não é um PDF válido (assinatura inválida)")
-            
-            # 🔒 VERIFICAR JAVASCRIPT EMBUTIDO
-            f.seek(0)
-            first_chunk = f.read(4096)
-            if b'/JavaScript' in first_chunk:
-                raise SecurityError("Arquivo PDF contém JavaScript incorporado - potencial risco de segurança")
-                
+        if buffer is not None:
+            verificar_buffer_pdf(buffer, file_path)
+        else:
+            with mapear_pdf(file_path) as mapeado:
+                verificar_buffer_pdf(mapeado, file_path)
+    except SecurityError:
+        raise
     except Exception as e:
         raise SecurityError(f"Erro ao verificar arquivo: {e}")
 
@@ -590,7 +1127,7 @@ def check_dependencies():
         issues.append("⚠️ Ghostscript - PDF/A e compressão desabilitados")
     
     if not PIKEPDF_AVAILABLE:
-        issues.append("⚠️ pikepdf - Algumas otimizações limitadas")
+        issues.append(f"⚠️ pikepdf - arquivos acima de {MAX_FILE_SIZE // (1024 * 1024)} MB não são aceitos")
     
     if issues:
         messagebox.showwarning(
@@ -645,6 +1182,11 @@ def get_environment_report():
     report.append(f"  Disponível: {'✓ SIM' if PDFA_AVAILABLE else '✗ NÃO'}")
     report.append("")
     
+    # Importações tardias
+    report.append("TEMPOS DE IMPORTAÇÃO:")
+    report.extend(relatorio_importacoes())
+    report.append("")
+    
     # Diretórios
     report.append("DIRETÓRIOS:")
     report.append(f"  Temp: {tempfile.gettempdir()}")
@@ -653,9 +1195,11 @@ def get_environment_report():
     
     # Limites
     report.append("LIMITES CONFIGURADOS:")
-    report.append(f"  Máx. arquivos: {MAX_FILES_PER_OPERATION}")
-    report.append(f"  Máx. páginas: {MAX_TOTAL_PAGES}")
-    report.append(f"  Máx. tamanho: {MAX_FILE_SIZE/1024/1024} MB")
+    report.append(f"  Máx. arquivos: {limite_arquivos_operacao()} (pela memória disponível)")
+    report.append(f"  Máx. páginas: {limite_total_paginas()} (pela memória disponível)")
+    report.append(f"  Máx. tamanho: {limite_tamanho_arquivo()/1024/1024:.0f} MB")
+    report.append(f"  Modo arquivos grandes: acima de {LIMITE_ARQUIVO_GRANDE/1024/1024:.0f} MB"
+                  f"{'' if PIKEPDF_AVAILABLE else ' (indisponível sem pikepdf)'}")
     report.append("")
     
     # Status geral
@@ -665,19 +1209,25 @@ def get_environment_report():
     return "\n".join(report)
 
 def get_ghostscript_version():
-    """Obtém versão do Ghostscript"""
+    """Obtém versão do Ghostscript (reaproveita a detecção em cache)"""
+    global GHOSTSCRIPT_VERSION
     if not GHOSTSCRIPT_PATH:
         return "N/A"
     
+    if not GHOSTSCRIPT_VERSION:
+        GHOSTSCRIPT_VERSION = obter_versao_ghostscript(GHOSTSCRIPT_PATH)
+    return GHOSTSCRIPT_VERSION or "Erro ao obter versão"
+
+def obter_versao_ghostscript(gs_path):
+    """Executa 'gs --version' - None se falhar"""
     try:
-        result = exec_segura([GHOSTSCRIPT_PATH, "--version"], 
+        result = exec_segura([gs_path, "--version"], 
                            timeout=10, descricao="Ghostscript version")
         if result.returncode == 0:
             return result.stdout.strip()
-        else:
-            return "Erro ao obter versão"
     except Exception as e:
-        return f"Erro: {e}"
+        logging.warning(f"Erro ao obter versão do Ghostscript: {e}")
+    return None
 
 def show_environment_check():
     """Mostra diálogo detalhado de verificação de ambiente"""
@@ -744,7 +1294,7 @@ def show_environment_check():
     
     def open_ghostscript_download():
         """Abre página de download do Ghostscript"""
-        webbrowser.open("https://www.ghostscript.com/download/gsdnld.html")
+        importar_tardio("webbrowser").open("https://www.ghostscript.com/download/gsdnld.html")
     
     # Botões
     ttk.Button(button_frame, text="📋 Copiar Relatório", 
@@ -766,7 +1316,7 @@ def show_performance_dashboard():
     """Mostra métricas de performance do sistema"""
     dialog = tk.Toplevel(root)
     dialog.title("Dashboard de Performance - JuntaPDF")
-    dialog.geometry("500x400")
+    dialog.geometry("500x460")
     dialog.resizable(False, False)
     dialog.transient(root)
     dialog.grab_set()
@@ -811,15 +1361,20 @@ def show_performance_dashboard():
         cpu_percent = "N/A"
         thread_count = "N/A"
 
+    descritores = pool_descritores.estatisticas()
+
     metrics = {
         "📁 Arquivos em Cache": f"{len(pdf_metadata_cache)}",
+        "📂 Entradas Abertas": f"{descritores['abertos']}/{descritores['limite']} "
+                              f"(pico {descritores['pico']}, {descritores['entradas']} em uso)",
+        "🔁 Reaberturas": f"{descritores['reaberturas']}",
         "🧵 Threads Ativas": f"{thread_count}",
         "💾 Memória Utilizada": f"{memory_mb:.1f} MB" if isinstance(memory_mb, float) else memory_mb,
         "⚡ CPU em Uso": f"{cpu_percent}%" if isinstance(cpu_percent, float) else cpu_percent,
         "📊 Arquivos Temporários": f"{len(temp_files_global)}",
         "🔄 Operações Canceladas": "0",  # Poderia implementar contador
-        "✅ PDFs Válidos": f"{sum(1 for f in pdf_metadata_cache if 'Erro' not in f)}",
-        "❌ PDFs com Erro": f"{sum(1 for f in pdf_metadata_cache if 'Erro' in f)}"
+        "✅ PDFs Válidos": f"{sum(1 for e in pdf_metadata_cache.valores() if 'info' in e and not e.get('erro'))}",
+        "❌ PDFs com Erro": f"{sum(1 for e in pdf_metadata_cache.valores() if e.get('erro'))}"
     }
 
     # Exibir métricas em grid
@@ -881,19 +1436,6 @@ def handle_exception(exc_type, exc_value, exc_traceback):
 
 sys.excepthook = handle_exception
 
-# =============================================================================
-# THREAD POOL SEGURO
-# =============================================================================
-thread_executor = concurrent.futures.ThreadPoolExecutor(
-    max_workers=MAX_CONCURRENT_OPERATIONS,
-    thread_name_prefix="JuntaPDF"
-)
-
-def submit_thread_task(func, *args, **kwargs):
-    """Submete tarefa para execução com limites de recursos"""
-    performance_monitor.check_system_health()
-    return thread_executor.submit(func, *args, **kwargs)
-
 # =============================================================================
 # INICIALIZAÇÃO DE BIBLIOTECAS
 # =============================================================================
@@ -908,24 +1450,39 @@ except ImportError:
     DND_AVAILABLE = False
     logging.warning("tkinterdnd2 não disponível - arrastar/soltar desabilitado")
 
-# Tenta importar PyPDF2
-try:
-    from PyPDF2 import PdfMerger, PdfReader, PdfWriter
-    PDF_LIBS_AVAILABLE = True
+# PyPDF2: verificado agora, importado na primeira operação com PDF
+PDF_LIBS_AVAILABLE = dependencia_disponivel("PyPDF2")
+if PDF_LIBS_AVAILABLE:
     logging.info("PyPDF2 disponível")
-except ImportError as e:
-    PDF_LIBS_AVAILABLE = False  
-    logging.error(f"PyPDF2 não disponível: {e}")
+else:
+    logging.error("PyPDF2 não disponível")
     messagebox.showerror("Erro", "PyPDF2 é necessário para o funcionamento do programa!\n\nExecute o instalador 'install.bat' primeiro.")
     sys.exit(1)
 
-# Tenta importar pikepdf
-try:
-    import pikepdf
-    PIKEPDF_AVAILABLE = True
+def PdfReader(*args, **kwargs):
+    return importar_tardio("PyPDF2").PdfReader(*args, **kwargs)
+
+def PdfWriter(*args, **kwargs):
+    return importar_tardio("PyPDF2").PdfWriter(*args, **kwargs)
+
+_PdfMergerComPool = None
+
+def PdfMerger(*args, **kwargs):
+    """PdfMerger cujas entradas por caminho são lidas pelo pool de descritores"""
+    global _PdfMergerComPool
+    if _PdfMergerComPool is None:
+        class _PdfMergerComPool(importar_tardio("PyPDF2").PdfMerger):
+            def _create_stream(self, fileobj):
+                if isinstance(fileobj, (str, os.PathLike)):
+                    return pool_descritores.abrir(fileobj), None
+                return super()._create_stream(fileobj)
+    return _PdfMergerComPool(*args, **kwargs)
+
+# pikepdf
+PIKEPDF_AVAILABLE = dependencia_disponivel("pikepdf")
+if PIKEPDF_AVAILABLE:
     logging.info("pikepdf disponível")
-except ImportError:
-    PIKEPDF_AVAILABLE = False
+else:
     logging.warning("pikepdf não disponível - algumas funcionalidades estarão limitadas")
 
 # Criar janela principal
@@ -945,9 +1502,6 @@ except Exception as e:
 # VARIÁVEIS GLOBAIS
 # =============================================================================
 
-# Flag global para cancelamento
-cancel_operation = False
-
 # --- VARIÁVEIS PARA ESTATÍSTICAS ---
 total_files_merge_var = tk.StringVar(value="Arquivos: 0")
 total_pages_merge_var = tk.StringVar(value="Páginas: 0") 
@@ -986,11 +1540,13 @@ pdfa_var = tk.BooleanVar(value=False)
 pdfa_var_split = tk.BooleanVar(value=False)
 compress_var = tk.BooleanVar(value=False)
 meta_var = tk.BooleanVar(value=False)
+deep_validate_var = tk.BooleanVar(value=False)
 
 # Variáveis para os novos modos de divisão
-split_mode_var = tk.StringVar(value="extract")  # "extract", "all", "interval", "parts"
+split_mode_var = tk.StringVar(value="extract")  # "extract", "all", "interval", "parts", "size"
 split_interval_var = tk.StringVar(value="5")
 split_parts_var = tk.StringVar(value="3")
+split_size_var = tk.StringVar(value="10")
 
 # Variável de status global - DEFINIDA ANTES DE QUALQUER USO
 status_var = tk.StringVar()
@@ -998,32 +1554,424 @@ status_var = tk.StringVar()
 # Variável para nível de compressão
 compress_level = tk.StringVar(value="Otimização Automática")
 
-def safe_temp_file(prefix="temp", suffix=".pdf"):
-    """Cria arquivo temporário seguro"""
-    import tempfile
+def safe_temp_file(prefix="temp", suffix=".pdf", workspace=None):
+    """Cria arquivo temporário seguro (na área da operação, se informada)"""
     temp_file = tempfile.NamedTemporaryFile(
-        prefix=prefix, 
-        suffix=suffix, 
+        prefix=prefix,
+        suffix=suffix,
+        dir=workspace.get_path() if workspace else None,
         delete=False
     )
     temp_path = temp_file.name
     temp_file.close()
     add_temp_file(temp_path)
     return temp_path
-    
-def estimate_final_size(files, options):
-    """Estima tamanho final do arquivo"""
-    total_size = 0
-    for f in files:
-        if os.path.exists(f):
-            total_size += os.path.getsize(f)
-    
+
+# =============================================================================
+# ÁREA TEMPORÁRIA POR OPERAÇÃO (MESMO VOLUME DO DESTINO)
+# =============================================================================
+workspaces_ativos = []
+workspaces_lock = threading.Lock()
+
+class ScratchWorkspace:
+    """
+    Diretório temporário de uma operação, criado no mesmo volume da pasta de
+    destino sempre que possível para que o commit final seja um rename atômico.
+    O diretório só é criado no primeiro uso e respeita um orçamento de bytes,
+    derivado por padrão do espaço livre no volume de destino.
+    """
+    def __init__(self, destino, budget_bytes=None):
+        self.destino = destino
+        self.budget_bytes = budget_bytes if budget_bytes is not None else self._orcamento_livre(destino)
+        self.path = None
+        self.mesmo_volume = False
+        self.preservar = False  # Mantém o diretório no encerramento (segmentos retomáveis)
+        self.bytes_usados = 0
+        self.bytes_previstos = 0  # Informado no preflight; reverificado se a área mudar de volume
+        self.lock = threading.Lock()
+
+    @classmethod
+    def adotar(cls, destino, path, budget_bytes=None):
+        """Reutiliza a área temporária de uma operação interrompida"""
+        workspace = cls(destino, budget_bytes)
+        if path and os.path.isdir(path):
+            workspace.path = path
+            workspace.mesmo_volume = workspace._mesmo_volume(path)
+            with workspaces_lock:
+                workspaces_ativos.append(workspace)
+        return workspace
+
+    @staticmethod
+    def _orcamento_livre(destino):
+        """Espaço livre no volume de destino menos a folga mínima"""
+        try:
+            livre = shutil.disk_usage(destino).free
+        except OSError as e:
+            logging.warning(f"Não foi possível verificar espaço livre em {destino}: {e}")
+            return WORKSPACE_BYTE_BUDGET
+        return max(0, livre - WORKSPACE_FREE_SPACE_MARGIN)
+
+    def _mesmo_volume(self, caminho):
+        try:
+            return os.stat(caminho).st_dev == os.stat(self.destino).st_dev
+        except OSError:
+            return False
+
+    def get_path(self):
+        """Retorna o diretório da operação, criando-o na primeira chamada"""
+        with self.lock:
+            if self.path:
+                return self.path
+
+            try:
+                self.path = tempfile.mkdtemp(prefix=".juntapdf_tmp_", dir=self.destino)
+            except OSError as e:
+                logging.warning(f"Pasta de destino sem permissão para temporários ({e}) - usando {tempfile.gettempdir()}")
+                path = tempfile.mkdtemp(prefix="juntapdf_tmp_")
+                # O preflight olhou o volume de destino; o orçamento passa a ser o do volume usado
+                try:
+                    self._verificar_espaco(path, self.bytes_previstos)
+                except SystemOverloadError:
+                    shutil.rmtree(path, ignore_errors=True)
+                    raise
+                self.budget_bytes = min(self.budget_bytes, self._orcamento_livre(path))
+                self.path = path
+
+            self.mesmo_volume = self._mesmo_volume(self.path)
+            with workspaces_lock:
+                workspaces_ativos.append(self)
+            logging.debug(f"Área temporária criada: {self.path} (mesmo volume: {self.mesmo_volume})")
+            return self.path
+
+    def preflight(self, bytes_necessarios):
+        """Verifica orçamento e espaço livre antes de iniciar a operação"""
+        if bytes_necessarios > self.budget_bytes:
+            raise SystemOverloadError(
+                f"Operação exige ~{bytes_necessarios/1024/1024:.0f}MB de área temporária "
+                f"(orçamento: {self.budget_bytes/1024/1024:.0f}MB)"
+            )
+        self.bytes_previstos = bytes_necessarios
+        self._verificar_espaco(self.path or self.destino, bytes_necessarios)
+
+    @staticmethod
+    def _verificar_espaco(pasta, bytes_necessarios):
+        try:
+            livre = shutil.disk_usage(pasta).free
+        except OSError as e:
+            logging.warning(f"Não foi possível verificar espaço livre em {pasta}: {e}")
+            return
+
+        if livre < bytes_necessarios + WORKSPACE_FREE_SPACE_MARGIN:
+            raise SystemOverloadError(
+                f"Espaço insuficiente em disco: necessários ~{bytes_necessarios/1024/1024:.0f}MB, "
+                f"livres {livre/1024/1024:.0f}MB"
+            )
+
+    def registrar_uso(self, caminho):
+        """Contabiliza um intermediário gravado e aplica o orçamento de bytes"""
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            return
+        with self.lock:
+            self.bytes_usados += tamanho
+            if self.bytes_usados > self.budget_bytes:
+                raise SystemOverloadError(
+                    f"Orçamento de área temporária excedido "
+                    f"({self.bytes_usados/1024/1024:.0f}MB > {self.budget_bytes/1024/1024:.0f}MB)"
+                )
+
+    def liberar_uso(self, caminho):
+        """Devolve ao orçamento os bytes de um intermediário descartado"""
+        try:
+            tamanho = os.path.getsize(caminho)
+        except OSError:
+            return
+        with self.lock:
+            self.bytes_usados = max(0, self.bytes_usados - tamanho)
+
+    def commit(self, temp_path, final_path):
+        """Move o resultado para o destino - rename O(1) quando no mesmo volume"""
+        if self.path and not self.mesmo_volume:
+            logging.warning("Área temporária em outro volume - commit exigirá cópia completa")
+            shutil.move(temp_path, final_path)
+        else:
+            os.replace(temp_path, final_path)
+        remove_temp_file(temp_path)
+
+    def cleanup(self):
+        """Remove o diretório da operação e tudo que restou nele"""
+        with self.lock:
+            path, self.path = self.path, None
+        if not path:
+            return
+        shutil.rmtree(path, ignore_errors=True)
+        with workspaces_lock:
+            if self in workspaces_ativos:
+                workspaces_ativos.remove(self)
+        logging.debug(f"Área temporária removida: {path}")
+
+class SpooledIntermediate:
+    """
+    Intermediário de operação mantido em memória que só transborda para um
+    arquivo na área temporária quando passa de SPOOL_MAX_MEMORY bytes.
+    Implementa a interface de arquivo binário usada por PdfReader/PdfWriter.
+    """
+    def __init__(self, workspace, prefix="temp", max_size=None):
+        self.workspace = workspace
+        self.prefix = prefix
+        self.max_size = SPOOL_MAX_MEMORY if max_size is None else max_size
+        self.path = None
+        self._file = io.BytesIO()
+
+    @classmethod
+    def from_file(cls, workspace, path, prefix="temp"):
+        """Adota um arquivo já gravado na área temporária (ex.: saída do Ghostscript)"""
+        spooled = cls(workspace, prefix)
+        spooled._file.close()
+        spooled._file = open(path, "r+b")
+        spooled.path = path
+        return spooled
+
+    @property
+    def in_memory(self):
+        return self.path is None
+
+    def size(self):
+        if self.in_memory:
+            return self._file.getbuffer().nbytes
+        self._file.flush()
+        return os.fstat(self._file.fileno()).st_size
+
+    def _rollover(self):
+        """Transborda o conteúdo em memória para um arquivo da área temporária"""
+        posicao = self._file.tell()
+        path = safe_temp_file(prefix=self.prefix, suffix=".pdf", workspace=self.workspace)
+        arquivo = open(path, "w+b")
+        arquivo.write(self._file.getbuffer())
+        arquivo.seek(posicao)
+        self._file.close()
+        self._file = arquivo
+        self.path = path
+        logging.debug(f"Intermediário '{self.prefix}' transbordou para disco: {path}")
+
+    def write(self, data):
+        written = self._file.write(data)
+        if self.in_memory and self._file.getbuffer().nbytes > self.max_size:
+            self._rollover()
+        return written
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def __getattr__(self, name):
+        # Demais métodos de arquivo (readline, seekable...) delegados ao buffer atual
+        return getattr(self._file, name)
+
+    def finalizar_escrita(self):
+        """Contabiliza no orçamento da área temporária se o intermediário foi para disco"""
+        if not self.in_memory:
+            self._file.flush()
+            self.workspace.registrar_uso(self.path)
+
+    def materialize(self):
+        """Garante um caminho em disco (necessário para ferramentas externas)"""
+        if self.in_memory:
+            self._rollover()
+        self._file.flush()
+        return self.path
+
+    def commit(self, final_path):
+        """Grava o resultado no destino final - sem passar pelo diretório temporário se em memória"""
+        if self.in_memory:
+            pasta = os.path.dirname(final_path) or "."
+            with tempfile.NamedTemporaryFile(prefix=".juntapdf_", suffix=".part", dir=pasta, delete=False) as f_out:
+                f_out.write(self._file.getbuffer())
+                temp_destino = f_out.name
+            os.replace(temp_destino, final_path)
+            self._file.close()
+        else:
+            self._file.close()
+            self.workspace.commit(self.path, final_path)
+            self.path = None
+
+    def close(self):
+        """Descarta o intermediário (memória ou arquivo)"""
+        try:
+            self._file.close()
+        except Exception:
+            pass
+        if self.path:
+            self.workspace.liberar_uso(self.path)
+            remove_temp_file(self.path)
+            try:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+            except OSError as e:
+                logging.warning(f"Erro ao remover intermediário {self.path}: {e}")
+            self.path = None
+
+# =============================================================================
+# ESTIMATIVA DE TAMANHO DE SAÍDA
+# =============================================================================
+PERFIL_AMOSTRAS = 200  # Objetos amostrados por PDF para o perfil de conteúdo
+CATEGORIAS_PERFIL = ("imagens_jpeg", "imagens", "fontes", "conteudo", "conteudo_sem_filtro", "estrutura")
+
+# Fator (mínimo, típico, máximo) aplicado aos bytes de cada categoria por etapa
+_FATORES_GS_COMUNS = {
+    "fontes": (0.6, 0.85, 1.0),
+    "conteudo": (0.8, 0.95, 1.05),
+    "conteudo_sem_filtro": (0.2, 0.3, 0.45),
+    "estrutura": (0.5, 0.8, 1.1),
+}
+FATORES_TAMANHO = {
+    "/printer": {"imagens_jpeg": (0.5, 0.8, 1.0), "imagens": (0.3, 0.6, 1.0), **_FATORES_GS_COMUNS},
+    "/ebook": {"imagens_jpeg": (0.2, 0.4, 0.7), "imagens": (0.1, 0.3, 0.6), **_FATORES_GS_COMUNS},
+    "/screen": {"imagens_jpeg": (0.05, 0.15, 0.35), "imagens": (0.04, 0.12, 0.3), **_FATORES_GS_COMUNS},
+    # Conversão PDF/A: sem reamostragem, fontes passam a ser embutidas por completo
+    "pdfa": {"imagens_jpeg": (0.8, 1.0, 1.2), "imagens": (0.8, 1.0, 1.2), **_FATORES_GS_COMUNS,
+             "fontes": (1.0, 1.3, 2.0)},
+}
+FATOR_OBJECT_STREAMS = {
+    # (entrada usa, saída usa): fator sobre a estrutura
+    (True, False): (1.5, 2.0, 2.5),
+    (False, True): (0.35, 0.5, 0.7),
+}
+
+class ContadorBytes:
+    """Destino de escrita que só conta os bytes (mede objetos sem montá-los em memória)"""
+    def __init__(self):
+        self.total = 0
+
+    def write(self, data):
+        self.total += len(data)
+        return len(data)
+
+def tamanho_serializado(obj):
+    """Bytes do objeto do PyPDF2 como gravado - streams com os dados ainda codificados"""
+    contador = ContadorBytes()
+    obj.write_to_stream(contador, None)
+    return contador.total
+
+def perfil_conteudo(path):
+    """
+    Bytes por categoria (imagens, fontes, content streams, estrutura) estimados
+    a partir de uma amostra uniforme dos objetos do PDF. O leitor trabalha sobre
+    o arquivo mapeado: só os objetos da amostra são lidos do disco.
+    """
+    tamanho = os.path.getsize(path)
+    perfil = dict.fromkeys(CATEGORIAS_PERFIL, 0)
+    perfil.update(tamanho=tamanho, object_streams=False, amostras=0)
+    buffer = None
+    try:
+        generic = importar_tardio("PyPDF2.generic")
+        buffer = mapear_pdf(path)
+        reader = PdfReader(buffer, strict=False)
+        ids = [(idnum, geracao) for geracao, tabela in reader.xref.items() for idnum in tabela]
+        ids += [(idnum, 0) for idnum in reader.xref_objStm]
+        perfil['object_streams'] = bool(reader.xref_objStm)
+        passo = max(1, len(ids) // PERFIL_AMOSTRAS)
+        amostra = ids[::passo]
+
+        bytes_amostra = dict.fromkeys(CATEGORIAS_PERFIL, 0)
+        for idnum, geracao in amostra:
+            obj = reader.get_object(generic.IndirectObject(idnum, geracao, reader))
+            if not isinstance(obj, generic.StreamObject):
+                continue
+            if obj.get("/Type") in ("/ObjStm", "/XRef"):
+                continue
+            filtros = obj.get("/Filter")
+            filtros = [filtros] if isinstance(filtros, str) else list(filtros or [])
+            dados = tamanho_serializado(obj)
+            if obj.get("/Subtype") == "/Image":
+                jpeg = any(f in ("/DCTDecode", "/JPXDecode") for f in filtros)
+                bytes_amostra["imagens_jpeg" if jpeg else "imagens"] += dados
+            elif "/Length1" in obj or obj.get("/Subtype") in ("/Type1C", "/CIDFontType0C", "/OpenType"):
+                bytes_amostra["fontes"] += dados
+            else:
+                bytes_amostra["conteudo" if filtros else "conteudo_sem_filtro"] += dados
+
+        if amostra:
+            escala = len(ids) / len(amostra)
+            streams = sum(bytes_amostra.values()) * escala
+            # A extrapolação não pode passar do próprio arquivo
+            ajuste = min(1.0, tamanho / streams) if streams else 1.0
+            for categoria, valor in bytes_amostra.items():
+                perfil[categoria] = int(valor * escala * ajuste)
+            perfil['amostras'] = len(amostra)
+        perfil['estrutura'] = max(0, tamanho - sum(perfil[c] for c in CATEGORIAS_PERFIL if c != "estrutura"))
+    except Exception as e:
+        # Criptografado/ilegível: tudo vira estrutura e o intervalo fica largo
+        logging.debug(f"Perfil de conteúdo indisponível para {path}: {e}")
+        perfil['estrutura'] = tamanho
+    finally:
+        if buffer is not None:
+            buffer.close()
+    return perfil
+
+def obter_perfil_conteudo(path):
+    return pdf_metadata_cache.obter(path, 'perfil', perfil_conteudo)
+
+def ghostscript_grava_object_streams():
+    """Ghostscript 10.02+ compacta a estrutura em object streams por padrão"""
+    try:
+        versao = tuple(int(p) for p in re.findall(r"\d+", GHOSTSCRIPT_VERSION or "")[:2])
+        return versao >= (10, 2)
+    except ValueError:
+        return False
+
+def estimar_tamanho_saida(perfis, options):
+    """
+    Tamanho previsto da união para as opções (compress, compress_level, pdfa):
+    {'estimativa', 'minimo', 'maximo'} em bytes. O intervalo combina a incerteza
+    do modelo de cada etapa com o erro de amostragem do perfil.
+    """
+    etapas = []
+    if options.get('pdfa'):
+        etapas.append("pdfa")
     if options.get('compress'):
-        # Estimativa conservadora de compressão
-        reduction_factor = 0.7  # 30% de redução
-        total_size *= reduction_factor
-    
-    return max(total_size, 1024)  # Mínimo 1KB
+        etapas.append(GS_PDFSETTINGS.get(options.get('compress_level'), GS_PDFSETTINGS_PADRAO))
+    saida_object_streams = bool(etapas) and ghostscript_grava_object_streams()
+
+    totais = [0.0, 0.0, 0.0]
+    for perfil in perfis:
+        erro_amostra = 1 / (perfil['amostras'] ** 0.5) if perfil['amostras'] else 0.5
+        for categoria in CATEGORIAS_PERFIL:
+            faixa = [perfil[categoria]] * 3
+            for etapa in etapas:
+                faixa = [valor * fator for valor, fator in zip(faixa, FATORES_TAMANHO[etapa][categoria])]
+            if categoria == "estrutura":
+                fator = FATOR_OBJECT_STREAMS.get((perfil['object_streams'], saida_object_streams), (0.9, 1.0, 1.2))
+                faixa = [valor * f for valor, f in zip(faixa, fator)]
+            else:
+                faixa[0] *= max(0.0, 1 - erro_amostra)
+                faixa[2] *= 1 + erro_amostra
+            for i in range(3):
+                totais[i] += faixa[i]
+
+    if options.get('pdfa') and ICC_PROFILE_PATH:
+        try:
+            icc = os.path.getsize(ICC_PROFILE_PATH)
+            totais = [t + icc for t in totais]
+        except OSError:
+            pass
+
+    minimo, estimativa, maximo = (max(int(t), 1024) for t in totais)
+    return {'estimativa': estimativa, 'minimo': minimo, 'maximo': maximo}
+
+def estimate_final_size(files, options):
+    """Estima tamanho final do arquivo a partir do perfil de conteúdo de cada entrada"""
+    perfis = [obter_perfil_conteudo(f) for f in files if os.path.exists(f)]
+    return estimar_tamanho_saida(perfis, options)
 # =============================================================================
 # 🚨 CORREÇÃO CRÍTICA 1: CLEANUP ROBUSTO COM REGISTRO ÚNICO
 # =============================================================================
@@ -1043,23 +1991,33 @@ def cleanup_temp_files():
         except Exception as e:
             logging.warning(f"Erro ao limpar {temp_file}: {e}")
 
-    # Limpar checkpoint
-    try:
-        cleanup_checkpoint()
-    except Exception as e:
-        logging.warning(f"Erro ao limpar checkpoint: {e}")
+    # Remove áreas temporárias de operações ainda abertas (exceto segmentos retomáveis)
+    with workspaces_lock:
+        workspaces_to_clean = list(workspaces_ativos)
 
-    # Parar thread executor com fallback caso a versão do Python não aceite timeout
-    try:
-        thread_executor.shutdown(wait=True, timeout=5)
-    except TypeError:
-        # Algumas versões não suportam timeout no shutdown; tenta sem timeout
+    preservados = [w for w in workspaces_to_clean if w.preservar]
+    for workspace in workspaces_to_clean:
+        if workspace.preservar:
+            continue
         try:
-            thread_executor.shutdown(wait=True)
+            workspace.cleanup()
         except Exception as e:
-            logging.warning(f"Falha ao encerrar thread_executor: {e}")
+            logging.warning(f"Erro ao limpar área temporária: {e}")
+
+    # Limpar checkpoint
+    if preservados or checkpoint_preservado:
+        logging.info("Checkpoint preservado para retomada na próxima inicialização")
+    else:
+        try:
+            cleanup_checkpoint()
+        except Exception as e:
+            logging.warning(f"Erro ao limpar checkpoint: {e}")
+
+    # Parar a fila de trabalhos (espera limitada pelos trabalhos em execução)
+    try:
+        fila_trabalhos.encerrar(timeout=5)
     except Exception as e:
-        logging.warning(f"Erro ao encerrar thread_executor: {e}")
+        logging.warning(f"Erro ao encerrar fila de trabalhos: {e}")
 
 # Registrar a limpeza automática UMA ÚNICA VEZ
 if not _atexit_cleanup_registered:
@@ -1082,6 +2040,10 @@ def safe_widget_config(widget, **kwargs):
     try:
         if widget is None:
             return False
+        # Widgets Tk só são tocados pela thread principal; das demais, passa pela bomba
+        if isinstance(widget, tk.Misc) and not bomba_ui.na_thread_principal():
+            bomba_ui.configurar(widget, **kwargs)
+            return True
         # winfo_exists pode levantar em alguns cenários; proteger com try
         if hasattr(widget, "winfo_exists") and widget.winfo_exists():
             try:
@@ -1093,46 +2055,98 @@ def safe_widget_config(widget, **kwargs):
         return False
     return False
 
+# =============================================================================
+# BOMBA DE ATUALIZAÇÕES DA INTERFACE
+# =============================================================================
+class BombaAtualizacoesUI:
+    """
+    Threads de trabalho publicam atualizações por chave; a thread do Tk drena a
+    fila a no máximo `taxa` Hz e aplica só a mais recente de cada chave. Eventos
+    que não podem ser descartados (diálogos) usam agendar() e saem em ordem.
+    """
+    def __init__(self, taxa):
+        self.intervalo_ms = max(1, int(1000 / taxa))
+        self.lock = threading.Lock()
+        self.pendentes = {}
+        self.eventos = []
+        self.coalescidas = 0
+        self.raiz = None
+
+    @staticmethod
+    def na_thread_principal():
+        return threading.current_thread() is threading.main_thread()
+
+    def publicar(self, chave, funcao, *args):
+        """Substitui a atualização pendente de mesma chave"""
+        if self.na_thread_principal():
+            funcao(*args)
+            return
+        with self.lock:
+            if chave in self.pendentes:
+                self.coalescidas += 1
+            self.pendentes[chave] = (funcao, args)
+
+    def configurar(self, widget, **kwargs):
+        """widget.config(...) com as opções pendentes mescladas (ex.: maximum e value)"""
+        chave = ("config", str(widget))
+        with self.lock:
+            if chave in self.pendentes:
+                self.coalescidas += 1
+                kwargs = {**self.pendentes[chave][1][1], **kwargs}
+            self.pendentes[chave] = (safe_widget_config, (widget, kwargs))
+
+    def agendar(self, funcao, *args):
+        with self.lock:
+            self.eventos.append((funcao, args))
+
+    def iniciar(self, raiz):
+        self.raiz = raiz
+        self.raiz.after(self.intervalo_ms, self._drenar)
+
+    def _drenar(self):
+        try:
+            # Reagenda antes de aplicar: um diálogo modal não deve parar a bomba
+            self.raiz.after(self.intervalo_ms, self._drenar)
+        except tk.TclError:
+            return  # Janela destruída
+        with self.lock:
+            pendentes, self.pendentes = self.pendentes, {}
+            eventos, self.eventos = self.eventos, []
+        for chave, (funcao, args) in pendentes.items():
+            try:
+                if chave[0] == "config":
+                    funcao(args[0], **args[1])
+                else:
+                    funcao(*args)
+            except Exception as e:
+                logging.debug(f"Erro ao aplicar atualização da interface: {e}")
+        for funcao, args in eventos:
+            try:
+                funcao(*args)
+            except Exception as e:
+                logging.error(f"Erro em evento da interface: {e}")
+
+bomba_ui = BombaAtualizacoesUI(UI_TAXA_ATUALIZACAO)
+
 # =============================================================================
 # 🚨 CORREÇÃO 2: GERENCIAMENTO DE PROCESSOS GHOSTSCRIPT ROBUSTO (I18N)
 # =============================================================================
 def kill_ghostscript_processes():
-    """Mata processos Ghostscript de forma robusta (multilíngue)"""
-    try:
-        killed = 0
-        
-        # Windows
-        if sys.platform == "win32":
-            # ✅ ROBUSTO: taskkill retorna 0 se matou algo, 128 se não encontrou
-            result1 = exec_segura(["taskkill", "/f", "/im", "gswin64c.exe"], 
-                                timeout=10, descricao="Kill gswin64c")
-            result2 = exec_segura(["taskkill", "/f", "/im", "gswin32c.exe"], 
-                                timeout=10, descricao="Kill gswin32c")
-            
-            # ✅ CORRETO: returncode == 0 significa SUCESSO (qualquer idioma)
-            if result1.returncode == 0 or result2.returncode == 0:
-                killed = 1
-                logging.info("Processos Ghostscript finalizados no Windows")
-            else:
-                logging.info("Nenhum processo Ghostscript encontrado para finalizar")
-                
-        # Linux/Mac
-        else:
-            result = exec_segura(["pkill", "-f", "gs"], 
-                               timeout=10, descricao="Kill gs processes")
-            
-            # ✅ pkill retorna 0 se matou processos, 1 se não encontrou
-            if result.returncode == 0:
-                killed = 1
-                logging.info("Processos Ghostscript finalizados no Linux/Mac")
-            else:
-                logging.info("Nenhum processo Ghostscript encontrado para finalizar")
-                
-        return killed
-        
-    except Exception as e:
-        logging.error(f"Erro ao finalizar processos Ghostscript: {e}")
-        return 0
+    """Finaliza apenas os processos externos iniciados por esta instância"""
+    with processos_lock:
+        processos = list(processos_ativos)
+    
+    killed = 0
+    for processo in processos:
+        try:
+            if finalizar_processo(processo):
+                killed += 1
+        except Exception as e:
+            logging.error(f"Erro ao finalizar processo {processo.pid}: {e}")
+    
+    if killed:
+        logging.info(f"{killed} processo(s) Ghostscript finalizado(s)")
+    return killed
 
 # -----------------------
 # GHOSTSCRIPT E ICC - DETECÇÃO AUTOMÁTICA
@@ -1207,133 +2221,559 @@ def encontrar_perfil_icc(gs_exec):
     logging.warning("Perfil ICC não encontrado")
     return None
 
-def validate_file_security(file_path):
+# =============================================================================
+# FILA DE TRABALHOS
+# =============================================================================
+class ProgressoTrabalho:
     """
-    Valida segurança do arquivo antes do processamento
-    CORREÇÃO: Esta função estava FALTANDO no código original
+    Destino das atualizações de progresso de um trabalho. Tem a interface da
+    Progressbar usada por safe_widget_config, sem tocar no Tk fora da thread principal.
+    """
+    def __init__(self, trabalho):
+        self.trabalho = trabalho
+
+    def winfo_exists(self):
+        return True
+
+    def config(self, **kwargs):
+        if 'maximum' in kwargs:
+            self.trabalho.maximo = max(1, kwargs['maximum'])
+        if 'value' in kwargs:
+            self.trabalho.valor = kwargs['value']
+
+    configure = config
+
+class Trabalho:
+    """Operação enfileirada: parâmetros congelados, token de cancelamento e progresso próprios"""
+    def __init__(self, trabalho_id, tipo, descricao, funcao):
+        self.id = trabalho_id
+        self.tipo = tipo
+        self.descricao = descricao
+        self.funcao = funcao
+        self.token = CancellationToken()
+        self.progresso = ProgressoTrabalho(self)
+        self.estado = "Na fila"
+        self.maximo = 1
+        self.valor = 0
+        self.erro = None
+
+    @property
+    def finalizado(self):
+        return self.estado in ("Concluído", "Cancelado", "Falhou")
+
+def memoria_para_limites():
+    """Bytes que os limites de operação podem ocupar (sem psutil, presume TRABALHO_MEMORIA_ESTIMADA livre)"""
+    disponivel = TRABALHO_MEMORIA_ESTIMADA
+    if PSUtil_AVAILABLE:
+        try:
+            import psutil
+            disponivel = psutil.virtual_memory().available
+        except Exception as e:
+            logging.debug(f"Não foi possível medir memória para os limites: {e}")
+    return int(disponivel * MEMORIA_FRACAO_LIMITES)
+
+def limite_total_paginas():
+    """Páginas por operação que a união em streaming comporta na memória disponível"""
+    return max(LIMITE_PAGINAS_MINIMO, memoria_para_limites() // MEMORIA_POR_PAGINA)
+
+def limite_arquivos_operacao():
+    return max(LIMITE_ARQUIVOS_MINIMO, memoria_para_limites() // MEMORIA_POR_ARQUIVO)
+
+def uniao_cabe_em_memoria(total_bytes, total_paginas):
+    """Se a união pelo PdfMerger, com todas as entradas residentes, cabe na memória disponível"""
+    return total_bytes * FATOR_MEMORIA_PYPDF2 + total_paginas * MEMORIA_POR_PAGINA <= memoria_para_limites()
+
+def calcular_concorrencia_fila():
+    """Trabalhos simultâneos pelos núcleos e memória disponíveis"""
+    limite = max(1, (os.cpu_count() or 1) // 2)
+    if PSUtil_AVAILABLE:
+        try:
+            import psutil
+            limite = min(limite, max(1, int(psutil.virtual_memory().available // TRABALHO_MEMORIA_ESTIMADA)))
+        except Exception as e:
+            logging.debug(f"Não foi possível medir memória para a fila: {e}")
+    return min(limite, MAX_CONCURRENT_OPERATIONS)
+
+class FilaTrabalhos:
+    """
+    Fila de uniões e divisões. A ordem da lista de pendentes é a prioridade
+    (ajustável pelo usuário); até `concorrencia` trabalhos rodam ao mesmo tempo.
+    """
+    def __init__(self, concorrencia):
+        self.condicao = threading.Condition()
+        self.pendentes = []
+        self.trabalhos = []
+        self.workers = []
+        self.executando = 0
+        self.concorrencia = concorrencia
+        self.proximo_id = 1
+        self.encerrada = False
+
+    def _garantir_workers(self):
+        while len(self.workers) < self.concorrencia:
+            worker = threading.Thread(target=self._executar, name=f"JuntaPDF-trabalho-{len(self.workers) + 1}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def enfileirar(self, tipo, descricao, funcao):
+        """funcao(trabalho) roda em uma thread da fila; retorna True em caso de sucesso"""
+        with self.condicao:
+            trabalho = Trabalho(self.proximo_id, tipo, descricao, funcao)
+            self.proximo_id += 1
+            self.pendentes.append(trabalho)
+            self.trabalhos.append(trabalho)
+            self._garantir_workers()
+            self.condicao.notify()
+        logging.info(f"Trabalho #{trabalho.id} enfileirado: {descricao}")
+        return trabalho
+
+    def definir_concorrencia(self, concorrencia):
+        with self.condicao:
+            self.concorrencia = max(1, min(MAX_CONCURRENT_OPERATIONS, concorrencia))
+            self._garantir_workers()
+            self.condicao.notify_all()
+        logging.info(f"Trabalhos simultâneos: {self.concorrencia}")
+
+    def _executar(self):
+        while True:
+            with self.condicao:
+                while not self.encerrada and (not self.pendentes or self.executando >= self.concorrencia):
+                    self.condicao.wait()
+                if self.encerrada:
+                    return
+                trabalho = self.pendentes.pop(0)
+                trabalho.estado = "Executando"
+                self.executando += 1
+
+            logging.info(f"Trabalho #{trabalho.id} iniciado")
+            try:
+                sucesso = trabalho.funcao(trabalho)
+                if sucesso:
+                    estado = "Concluído"
+                elif trabalho.token.cancelled:
+                    estado = "Cancelado"
+                else:
+                    estado = "Falhou"
+            except Exception as e:
+                logging.error(f"Trabalho #{trabalho.id} falhou: {e}")
+                trabalho.erro = str(e)
+                estado = "Falhou"
+                show_message_in_main_thread("Erro", f"Trabalho #{trabalho.id} falhou:\n{e}", "error")
+
+            with self.condicao:
+                trabalho.estado = estado
+                self.executando -= 1
+                self.condicao.notify_all()
+            logging.info(f"Trabalho #{trabalho.id}: {estado}")
+
+    def _buscar(self, trabalho_id):
+        return next((t for t in self.trabalhos if t.id == trabalho_id), None)
+
+    def mover(self, trabalho_id, direcao):
+        """Reordena um trabalho pendente: "topo", "subir" ou "descer" """
+        with self.condicao:
+            trabalho = self._buscar(trabalho_id)
+            if trabalho not in self.pendentes:
+                return False
+            posicao = self.pendentes.index(trabalho)
+            destino = {"topo": 0, "subir": posicao - 1, "descer": posicao + 1}[direcao]
+            destino = max(0, min(len(self.pendentes) - 1, destino))
+            self.pendentes.insert(destino, self.pendentes.pop(posicao))
+            return True
+
+    def cancelar(self, trabalho_id):
+        with self.condicao:
+            trabalho = self._buscar(trabalho_id)
+            if not trabalho or trabalho.finalizado:
+                return
+            if trabalho in self.pendentes:
+                self.pendentes.remove(trabalho)
+                trabalho.estado = "Cancelado"
+            trabalho.token.cancel()
+
+    def em_destaque(self, tipo):
+        """Trabalho acompanhado pela aba do tipo: o último em execução ou, sem nenhum, o último na fila"""
+        with self.condicao:
+            ativos = [t for t in self.trabalhos if t.tipo == tipo and not t.finalizado]
+            executando = [t for t in ativos if t.estado == "Executando"]
+            alvos = executando or ativos
+            return alvos[-1].id if alvos else None
+
+    def cancelar_tipo(self, tipo=None):
+        with self.condicao:
+            alvos = [t.id for t in self.trabalhos if not t.finalizado and (tipo is None or t.tipo == tipo)]
+        for trabalho_id in alvos:
+            self.cancelar(trabalho_id)
+
+    def limpar_finalizados(self):
+        with self.condicao:
+            self.trabalhos = [t for t in self.trabalhos if not t.finalizado]
+
+    def listar(self):
+        """Retrato consistente da fila para a interface"""
+        with self.condicao:
+            return [(t.id, t.tipo, t.descricao, t.estado, t.maximo, t.valor, t.erro) for t in self.trabalhos]
+
+    def encerrar(self, timeout=5):
+        self.cancelar_tipo()
+        with self.condicao:
+            self.encerrada = True
+            self.condicao.notify_all()
+        limite = time.monotonic() + timeout
+        for worker in self.workers:
+            worker.join(max(0, limite - time.monotonic()))
+
+fila_trabalhos = FilaTrabalhos(calcular_concorrencia_fila())
+
+STARTXREF_REGEX = re.compile(rb"startxref\s+(\d+)\s+%%EOF", re.S)
+ROOT_REF_REGEX = re.compile(rb"/Root\s+(\d+)\s+(\d+)\s+R")
+CABECALHO_OBJETO_REGEX = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+VALIDACAO_JANELA_FINAL = 64 * 1024  # Bytes lidos do fim do arquivo (trailer, startxref, %%EOF)
+
+def _offset_objeto_xref_classica(f, offset_xref, numero):
+    """Offset do objeto `numero` pela tabela xref clássica (salta subseções sem lê-las)"""
+    f.seek(offset_xref + 4)
+    while True:
+        linha = f.readline()
+        while linha and not linha.strip():
+            linha = f.readline()
+        partes = linha.split()
+        if len(partes) != 2 or not all(p.isdigit() for p in partes):
+            return None  # Chegou ao "trailer" sem encontrar o objeto
+        inicio, quantidade = int(partes[0]), int(partes[1])
+        posicao = f.tell()
+        if inicio <= numero < inicio + quantidade:
+            f.seek(posicao + (numero - inicio) * 20)
+            entrada = f.read(20).split()
+            return int(entrada[0]) if len(entrada) >= 3 and entrada[2] == b"n" else None
+        f.seek(posicao + quantidade * 20)
+
+def verificar_estrutura_pdf(file_path):
+    """
+    Validação estrutural barata: cabeçalho, %%EOF/startxref no fim do arquivo,
+    offset da xref apontando para uma tabela ou stream de xref e, em xref
+    clássica, o catálogo (/Root) no offset indicado. Não lê o corpo do PDF.
     """
-    # Verificar se arquivo existe
-    if not os.path.exists(file_path):
-        raise SecurityError(f"Arquivo não existe: {file_path}")
-    
-    # Verificar tamanho máximo
     file_size = os.path.getsize(file_path)
-    if file_size > MAX_FILE_SIZE:
-        raise SecurityError(f"Arquivo muito grande: {file_size/1024/1024:.1f}MB > {MAX_FILE_SIZE/1024/1024:.1f}MB")
-    
-    # Verificar se é PDF pela assinatura
+    with open(file_path, 'rb') as f:
+        if not f.read(1024).startswith(b'%PDF-'):
+            return False, "assinatura %PDF- ausente"
+
+        f.seek(max(0, file_size - VALIDACAO_JANELA_FINAL))
+        final = f.read()
+        ocorrencias = list(STARTXREF_REGEX.finditer(final))
+        if not ocorrencias:
+            return False, "startxref/%%EOF ausente (arquivo truncado?)"
+        offset_xref = int(ocorrencias[-1].group(1))
+        if offset_xref >= file_size:
+            return False, f"startxref aponta para fora do arquivo ({offset_xref})"
+
+        f.seek(offset_xref)
+        inicio_xref = f.read(4096)
+        if inicio_xref.startswith(b"xref"):
+            trailer = final[final.rfind(b"trailer"):] if b"trailer" in final else b""
+            root = ROOT_REF_REGEX.search(trailer)
+            if not root:
+                return False, "trailer sem /Root"
+            offset_root = _offset_objeto_xref_classica(f, offset_xref, int(root.group(1)))
+            if offset_root is None or offset_root >= file_size:
+                return False, "catálogo ausente da tabela xref"
+            f.seek(offset_root)
+            cabecalho = CABECALHO_OBJETO_REGEX.match(f.read(64))
+            if not cabecalho or cabecalho.group(1) != root.group(1):
+                return False, "offset do catálogo na xref não confere"
+        else:
+            cabecalho = CABECALHO_OBJETO_REGEX.match(inicio_xref)
+            if not cabecalho or b"/XRef" not in inicio_xref:
+                return False, "startxref não aponta para uma tabela/stream de xref"
+            if not ROOT_REF_REGEX.search(inicio_xref):
+                return False, "stream de xref sem /Root"
+    return True, "estrutura OK"
+
+def contar_paginas_arvore(file_path, senha=None):
+    """/Count da raiz da árvore de páginas - resolve só trailer, catálogo e /Pages"""
+    if arquivo_grande(file_path):
+        # Saídas grandes: o qpdf lê só a xref e os três objetos do caminho até /Count
+        pikepdf = importar_tardio("pikepdf")
+        with pikepdf.open(file_path, password=senha or "", access_mode=pikepdf.AccessMode.mmap) as pdf:
+            return int(pdf.Root.Pages.Count)
+    # Sobre o arquivo mapeado o PdfReader lê só a xref na abertura; os objetos
+    # do caminho trailer -> /Root -> /Pages são resolvidos sob demanda
+    buffer = mapear_pdf(file_path)
     try:
-        with open(file_path, 'rb') as f:
-            header = f.read(4)
-            if header != b'%PDF':
-                raise SecurityError("Arquivo não é um PDF válido")
-    except Exception as e:
-        raise SecurityError(f"Erro ao validar arquivo: {e}")
-    
-    return True
-    
-class ThreadManager:
-    """Gerencia threads de forma segura - CORREÇÃO: Esta classe estava FALTANDO"""
-    def __init__(self):
-        self.executor = None
-        self.lock = threading.RLock()
+        reader = PdfReader(buffer, strict=False)
+        if reader.is_encrypted:
+            reader.decrypt(senha or "")
+        return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+    finally:
+        buffer.close()
+
+def validacao_completa_pdf(file_path):
+    """Validação profunda: percorre todas as páginas e extrai texto das primeiras"""
+    with open(file_path, 'rb') as f:
+        reader = PdfReader(f)
+        if len(reader.pages) == 0:
+            raise PDFCorruptionError("PDF de saída não contém páginas")
         
-    def submit_task(self, task_function):
-        """Submete tarefa para execução em thread"""
-        with self.lock:
-            if self.executor is None:
-                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
-            return self.executor.submit(task_function)
-    
-    def shutdown(self):
-        """Finaliza executor de threads"""
-        with self.lock:
-            if self.executor is not None:
-                self.executor.shutdown(wait=False)
-                self.executor = None
-
-# Instância global do gerenciador de threads
-thread_manager = ThreadManager()
-
-def submit_thread_task(task_function):
-    """Submete tarefa para thread de forma segura"""
-    return thread_manager.submit_task(task_function)
+        # Tentar acessar metadados básicos (não crítico se falhar)
+        try:
+            _ = reader.metadata
+        except:
+            logging.debug("Metadados do PDF não acessíveis (pode ser normal)")
+        
+        # Verificar algumas páginas para garantir que são acessíveis
+        pages_to_check = min(3, len(reader.pages))
+        for i in range(pages_to_check):
+            try:
+                _ = reader.pages[i].extract_text()
+            except:
+                # Não crítico se não conseguir extrair texto
+                pass
+        return len(reader.pages)
 
-def validate_output_pdf(file_path):
-    """Valida se o PDF de saída é válido e legível"""
+def validate_output_pdf(file_path, paginas_esperadas=None, completa=False, senha=None):
+    """
+    Valida o PDF de saída. O padrão é a checagem estrutural (cabeçalho, trailer,
+    xref e contagem da árvore de páginas contra o esperado); `completa` acrescenta
+    a leitura de todas as páginas. Retorna (válido, mensagem, tempos em ms).
+    """
+    tempos = {}
     try:
         # Verificar se arquivo existe e tem tamanho razoável
         if not os.path.exists(file_path):
-            return False, "Arquivo de saída não existe"
+            return False, "Arquivo de saída não existe", tempos
         
         file_size = os.path.getsize(file_path)
         if file_size == 0:
-            return False, "Arquivo de saída está vazio"
+            return False, "Arquivo de saída está vazio", tempos
         
         if file_size < 100:  # PDF mínimo tem pelo menos 100 bytes
-            return False, "Arquivo de saída é muito pequeno para ser um PDF válido"
+            return False, "Arquivo de saída é muito pequeno para ser um PDF válido", tempos
         
-        with open(file_path, 'rb') as f:
-            # Verificar assinatura PDF
-            header = f.read(4)
-            if header != b'%PDF':
-                return False, "Arquivo de saída não é um PDF válido (assinatura incorreta)"
-            
-            # Verificar se é legível
+        inicio = time.perf_counter()
+        estrutura_ok, detalhe = verificar_estrutura_pdf(file_path)
+        if not estrutura_ok:
+            return False, f"Estrutura do PDF de saída inválida: {detalhe}", tempos
+        try:
+            paginas = contar_paginas_arvore(file_path, senha)
+        except Exception as e:
+            return False, f"Árvore de páginas ilegível: {e}", tempos
+        tempos['estrutural_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
+        
+        if paginas == 0:
+            return False, "PDF de saída não contém páginas", tempos
+        if paginas_esperadas is not None and paginas != paginas_esperadas:
+            return False, f"PDF de saída tem {paginas} páginas, esperadas {paginas_esperadas}", tempos
+        
+        if completa:
+            inicio = time.perf_counter()
             try:
-                f.seek(0)
-                reader = PdfReader(f)
-                
-                if len(reader.pages) == 0:
-                    return False, "PDF de saída não contém páginas"
-                
-                # Tentar acessar metadados básicos (não crítico se falhar)
-                try:
-                    _ = reader.metadata
-                except:
-                    logging.debug("Metadados do PDF não acessíveis (pode ser normal)")
-                
-                # Verificar algumas páginas para garantir que são acessíveis
-                pages_to_check = min(3, len(reader.pages))
-                for i in range(pages_to_check):
-                    try:
-                        _ = reader.pages[i].extract_text()
-                    except:
-                        # Não crítico se não conseguir extrair texto
-                        pass
-                        
+                paginas = validacao_completa_pdf(file_path)
             except Exception as e:
-                return False, f"PDF de saída corrompido ou ilegível: {str(e)}"
+                return False, f"PDF de saída corrompido ou ilegível: {str(e)}", tempos
+            tempos['completa_ms'] = round((time.perf_counter() - inicio) * 1000, 1)
         
-        return True, f"PDF válido ({len(reader.pages)} páginas, {file_size/1024/1024:.2f} MB)"
+        modo = "completa" if completa else "estrutural"
+        return True, f"PDF válido ({paginas} páginas, {file_size/1024/1024:.2f} MB, validação {modo})", tempos
         
     except Exception as e:
-        return False, f"Erro na validação: {str(e)}"
-# Detecta Ghostscript e ICC na inicialização
-GHOSTSCRIPT_PATH = encontrar_ghostscript()
-ICC_PROFILE_PATH = encontrar_perfil_icc(GHOSTSCRIPT_PATH) if GHOSTSCRIPT_PATH else None
-PDFA_AVAILABLE = bool(GHOSTSCRIPT_PATH and ICC_PROFILE_PATH)
+        return False, f"Erro na validação: {str(e)}", tempos
+# =============================================================================
+# CACHE DA DETECÇÃO DE AMBIENTE (Ghostscript, versão e perfil ICC)
+# =============================================================================
+AMBIENTE_CACHE_MAX_AGE = 7 * 24 * 3600  # Detecção completa refeita em segundo plano depois de 7 dias
+
+def diretorio_dados_usuario():
+    """
+    Pasta de dados do usuário (LOCALAPPDATA / XDG_CACHE_HOME), criada só para ele.
+    O cache de ambiente indica qual executável rodar: não pode ficar no temporário compartilhado.
+    """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        pasta = os.path.join(base, "JuntaPDF")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        pasta = os.path.join(base, "juntapdf")
+    os.makedirs(pasta, mode=0o700, exist_ok=True)
+    return pasta
+
+def caminho_cache_ambiente():
+    try:
+        return os.path.join(diretorio_dados_usuario(), "ambiente.json")
+    except OSError as e:
+        logging.warning(f"Pasta de dados do usuário indisponível - cache de ambiente desativado: {e}")
+        return None
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except (OSError, TypeError):
+        return None
+
+def descobrir_ambiente(incluir_versao=True):
+    """Detecção completa - pode ser lenta (busca recursiva do ICC, processo do gs)"""
+    gs_path = encontrar_ghostscript()
+    icc_path = encontrar_perfil_icc(gs_path) if gs_path else None
+    return {
+        'gs_path': gs_path,
+        'gs_mtime': _mtime(gs_path),
+        'gs_version': obter_versao_ghostscript(gs_path) if gs_path and incluir_versao else None,
+        'icc_path': icc_path,
+        'icc_mtime': _mtime(icc_path),
+        'path_env': os.environ.get('PATH', ''),
+        'timestamp': time.time()
+    }
+
+def ghostscript_em_cache_valido(gs_path):
+    """O executável em cache só é aceito se for o mesmo que a busca (barata) escolhe agora"""
+    if not isinstance(gs_path, str) or not os.path.isabs(gs_path) or not os.path.isfile(gs_path):
+        return False
+    atual = encontrar_ghostscript()
+    if not atual:
+        return False
+    return os.path.normcase(os.path.realpath(gs_path)) == os.path.normcase(os.path.realpath(atual))
+
+def carregar_cache_ambiente():
+    """
+    Retorna a detecção em cache se ainda válida: mesmo PATH, executável igual ao
+    encontrado agora e executável/perfil com o mesmo mtime. Sem Ghostscript em
+    cache, a detecção já é barata e é refeita.
+    """
+    cache_path = caminho_cache_ambiente()
+    if not cache_path:
+        return None
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            ambiente = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(ambiente, dict) or ambiente.get('path_env') != os.environ.get('PATH', ''):
+        return None
+    if not ghostscript_em_cache_valido(ambiente.get('gs_path')):
+        return None
+    if _mtime(ambiente['gs_path']) != ambiente.get('gs_mtime'):
+        return None
+    icc_path = ambiente.get('icc_path')
+    if icc_path and (not isinstance(icc_path, str) or not icc_path.lower().endswith(".icc")
+                     or _mtime(icc_path) != ambiente.get('icc_mtime')):
+        return None
+    return ambiente
+
+def salvar_cache_ambiente(ambiente):
+    cache_path = caminho_cache_ambiente()
+    if not cache_path:
+        return
+    try:
+        temp_cache = cache_path + ".tmp"
+        with open(temp_cache, 'w', encoding='utf-8') as f:
+            json.dump(ambiente, f)
+        os.replace(temp_cache, cache_path)
+    except Exception as e:
+        logging.warning(f"Erro ao salvar cache de ambiente: {e}")
+
+def aplicar_ambiente(ambiente):
+    global GHOSTSCRIPT_PATH, GHOSTSCRIPT_VERSION, ICC_PROFILE_PATH, PDFA_AVAILABLE
+    GHOSTSCRIPT_PATH = ambiente['gs_path']
+    GHOSTSCRIPT_VERSION = ambiente.get('gs_version')
+    ICC_PROFILE_PATH = ambiente['icc_path']
+    PDFA_AVAILABLE = bool(GHOSTSCRIPT_PATH and ICC_PROFILE_PATH)
+
+def atualizar_ambiente_em_segundo_plano(ambiente=None):
+    """
+    Fora da thread principal: completa com a versão do gs a detecção recém-feita
+    ou, sem `ambiente`, refaz a detecção inteira (cache expirado). Grava o cache
+    para o próximo início e, se o resultado mudou, atualiza a interface.
+    """
+    def tarefa():
+        try:
+            if ambiente:
+                novo = dict(ambiente, gs_version=obter_versao_ghostscript(ambiente['gs_path']))
+            else:
+                novo = descobrir_ambiente()
+            salvar_cache_ambiente(novo)
+            mudou = (novo['gs_path'], novo['icc_path']) != (GHOSTSCRIPT_PATH, ICC_PROFILE_PATH)
+            aplicar_ambiente(novo)
+            if mudou:
+                logging.info("Ambiente alterado desde o último início - detecção atualizada")
+                # Resolvido na thread principal, quando a interface já existe
+                bomba_ui.agendar(lambda: atualizar_ui_ambiente())
+        except Exception as e:
+            logging.warning(f"Erro ao atualizar detecção de ambiente: {e}")
+    
+    threading.Thread(target=tarefa, name="JuntaPDF-ambiente", daemon=True).start()
+
+def detectar_ambiente():
+    """Detecta Ghostscript e ICC na inicialização, usando o cache quando válido"""
+    ambiente = carregar_cache_ambiente()
+    if ambiente:
+        logging.info(f"Ghostscript (cache): {ambiente['gs_path']}")
+        aplicar_ambiente(ambiente)
+        if time.time() - ambiente.get('timestamp', 0) > AMBIENTE_CACHE_MAX_AGE:
+            atualizar_ambiente_em_segundo_plano()
+        return
+    
+    # Sem cache: só a versão (processo extra) e a gravação do cache ficam para a thread de fundo
+    ambiente = descobrir_ambiente(incluir_versao=False)
+    aplicar_ambiente(ambiente)
+    if ambiente['gs_path']:
+        atualizar_ambiente_em_segundo_plano(ambiente)
 
-def comprimir_com_ghostscript(input_path, output_path, nivel="Otimização Automática"):
+detectar_ambiente()
+
+class ProgressoGhostscript:
+    """
+    Converte a saída do Ghostscript ('Processing pages 1 through N.' e 'Page N')
+    em progresso determinado: callback(feitas, total, paginas_por_segundo, eta_segundos)
+    """
+    RE_TOTAL = re.compile(r'Processing pages \d+ through (\d+)')
+    RE_PAGINA = re.compile(r'^Page \d+')
+
+    def __init__(self, callback, total=None):
+        self.callback = callback
+        self.total = total
+        self.feitas = 0
+        self.inicio = time.monotonic()
+
+    def __call__(self, linha):
+        match = self.RE_TOTAL.search(linha)
+        if match:
+            self.total = int(match.group(1))
+            return
+        if not self.RE_PAGINA.match(linha):
+            return
+
+        self.feitas += 1
+        decorrido = time.monotonic() - self.inicio
+        taxa = self.feitas / decorrido if decorrido > 0 else 0.0
+        eta = None
+        if self.total and taxa > 0:
+            eta = max(0.0, (self.total - self.feitas) / taxa)
+        self.callback(self.feitas, self.total, taxa, eta)
+
+def formatar_eta(segundos):
+    """Tempo restante legível: '45s', '3min 20s'"""
+    if segundos is None:
+        return "calculando..."
+    segundos = int(segundos)
+    if segundos < 60:
+        return f"{segundos}s"
+    return f"{segundos // 60}min {segundos % 60:02d}s"
+
+def comprimir_com_ghostscript(input_path, output_path, nivel="Otimização Automática", progress_callback=None, token=None):
     """
     Compressão REAL de PDF usando Ghostscript com diferentes níveis
+    progress_callback(feitas, total, paginas_por_segundo, eta_segundos) a cada página
     """
     if not GHOSTSCRIPT_PATH:
         raise PDFProcessingError("Ghostscript não disponível para compressão")
     
-    # Mapeamento de níveis de compressão
-    niveis = {
-        "Qualidade Máxima": "/printer",      # Balanço ideal qualidade/tamanho
-        "Qualidade Equilibrada": "/ebook",      # Boa qualidade, menor tamanho  
-        "Tamanho Mínimo": "/screen"           # Tamanho mínimo, qualidade reduzida
-    }
-    
     comando = [
         GHOSTSCRIPT_PATH,
         "-sDEVICE=pdfwrite",
-        f"-dPDFSETTINGS={niveis.get(nivel, '/printer')}",
+        f"-dPDFSETTINGS={GS_PDFSETTINGS.get(nivel, GS_PDFSETTINGS_PADRAO)}",
         "-dCompatibilityLevel=1.4",
-        "-dNOPAUSE", "-dQUIET", "-dBATCH",
+        "-dNOPAUSE", "-dBATCH",  # Sem -dQUIET: a saída por página alimenta o progresso
         "-dDetectDuplicateImages=true",
         "-dCompressFonts=true",
         "-dCompressPages=true",
@@ -1342,7 +2782,11 @@ def comprimir_com_ghostscript(input_path, output_path, nivel="Otimização Autom
     ]
     
     logging.info(f"Iniciando compressão: {os.path.basename(input_path)} -> {nivel}")
-    resultado = exec_segura(comando, timeout=120, descricao="Compressão Ghostscript")
+    # Timeout por inatividade: compressões longas seguem enquanto houver páginas avançando
+    resultado = exec_segura(comando, timeout=GS_COMPRESSAO_TIMEOUT, descricao="Compressão Ghostscript",
+                            should_cancel=token.is_cancelled if token else None,
+                            on_output_line=ProgressoGhostscript(progress_callback) if progress_callback else None,
+                            idle_timeout=GS_IDLE_TIMEOUT)
     
     if resultado.returncode != 0:
         error_msg = resultado.stderr or "Erro desconhecido"
@@ -1361,6 +2805,142 @@ def comprimir_com_ghostscript(input_path, output_path, nivel="Otimização Autom
     
     return reducao
 
+# -----------------------
+# CONVERSÃO PDF/A (GHOSTSCRIPT)
+# -----------------------
+_pdfa_def_path = None
+_pdfa_def_lock = threading.Lock()
+
+def obter_pdfa_def():
+    """Gera (uma vez por execução) o PDFA_def.ps com o OutputIntent sRGB"""
+    global _pdfa_def_path
+    with _pdfa_def_lock:
+        if _pdfa_def_path and os.path.exists(_pdfa_def_path):
+            return _pdfa_def_path
+
+        # PostScript exige barras normais e parênteses escapados
+        icc_ps = ICC_PROFILE_PATH.replace("\\", "/").replace("(", "\\(").replace(")", "\\)")
+        conteudo = (
+            "%!\n"
+            "[/Title (JuntaPDF) /DOCINFO pdfmark\n"
+            f"/ICCProfile ({icc_ps}) def\n"
+            "[/_objdef {icc_PDFA} /type /stream /OBJ pdfmark\n"
+            "[{icc_PDFA} <</N 3>> /PUT pdfmark\n"
+            "[{icc_PDFA} ICCProfile (r) file /PUT pdfmark\n"
+            "[/_objdef {OutputIntent_PDFA} /type /dict /OBJ pdfmark\n"
+            "[{OutputIntent_PDFA} <<\n"
+            "  /Type /OutputIntent\n"
+            "  /S /GTS_PDFA1\n"
+            "  /DestOutputProfile {icc_PDFA}\n"
+            "  /OutputConditionIdentifier (sRGB)\n"
+            ">> /PUT pdfmark\n"
+            "[{Catalog} <</OutputIntents [ {OutputIntent_PDFA} ]>> /PUT pdfmark\n"
+        )
+
+        caminho = os.path.join(tempfile.gettempdir(), f"juntapdf_PDFA_def_{os.getpid()}.ps")
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        add_temp_file(caminho)
+        _pdfa_def_path = caminho
+        return caminho
+
+def converter_para_pdfa(input_path, output_path, timeout=300, token=None):
+    """Converte um PDF para PDF/A-2B usando Ghostscript"""
+    if not PDFA_AVAILABLE:
+        raise PDFProcessingError("PDF/A indisponível: Ghostscript ou perfil ICC não encontrados")
+
+    comando = [
+        GHOSTSCRIPT_PATH,
+        "-dPDFA=2",
+        "-dBATCH", "-dNOPAUSE", "-dQUIET", "-dNOOUTERSAVE",
+        "-sDEVICE=pdfwrite",
+        "-sColorConversionStrategy=RGB",
+        "-dPDFACompatibilityPolicy=1",
+        f"--permit-file-read={ICC_PROFILE_PATH}",
+        f"-sOutputFile={output_path}",
+        obter_pdfa_def(),
+        input_path
+    ]
+
+    resultado = exec_segura(comando, timeout=timeout, descricao="Conversão PDF/A",
+                            should_cancel=token.is_cancelled if token else None)
+
+    if resultado.returncode != 0:
+        error_msg = resultado.stderr or "Erro desconhecido"
+        raise PDFProcessingError(f"Falha na conversão PDF/A: {error_msg.strip()[:200]}")
+
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        raise PDFProcessingError("Arquivo PDF/A não foi gerado ou está vazio")
+
+def calcular_workers_ghostscript():
+    """Dimensiona o pool de processos Ghostscript por núcleos e memória disponível"""
+    limite = max(1, (os.cpu_count() or 1) - 1)
+
+    if PSUtil_AVAILABLE:
+        try:
+            import psutil
+            disponivel = psutil.virtual_memory().available
+            limite = min(limite, max(1, int(disponivel // GS_MEMORIA_POR_PROCESSO)))
+        except Exception as e:
+            logging.debug(f"Não foi possível medir memória para o pool Ghostscript: {e}")
+
+    return limite
+
+def _converter_parte_pdfa(parte, token=None):
+    """Converte uma parte no lugar: gera arquivo temporário ao lado e substitui o original"""
+    if token:
+        token.raise_if_cancelled()
+
+    temp_pdfa = parte + ".pdfa.tmp"
+    add_temp_file(temp_pdfa)
+    try:
+        converter_para_pdfa(parte, temp_pdfa, token=token)
+        os.replace(temp_pdfa, parte)
+    finally:
+        remove_temp_file(temp_pdfa)
+        try:
+            if os.path.exists(temp_pdfa):
+                os.remove(temp_pdfa)
+        except OSError:
+            pass
+
+def converter_partes_pdfa(partes, on_parte_concluida=None, token=None):
+    """
+    Converte as partes de uma divisão para PDF/A em um pool limitado de processos gs.
+    Falhas ficam isoladas na parte: o arquivo original (não PDF/A) é mantido.
+    Retorna lista de (parte, erro) das conversões que falharam.
+    """
+    if not partes:
+        return []
+
+    workers = min(calcular_workers_ghostscript(), len(partes))
+    logging.info(f"Convertendo {len(partes)} parte(s) para PDF/A com {workers} processo(s) Ghostscript")
+
+    falhas = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="JuntaPDF-gs") as pool:
+        futuros = {pool.submit(_converter_parte_pdfa, parte, token): parte for parte in partes}
+
+        for concluidas, futuro in enumerate(concurrent.futures.as_completed(futuros), start=1):
+            parte = futuros[futuro]
+            if token and token.cancelled:
+                # Partes ainda na fila nem chegam a iniciar o Ghostscript
+                for pendente in futuros:
+                    pendente.cancel()
+            try:
+                futuro.result()
+            except (OperationCancelledError, concurrent.futures.CancelledError):
+                continue
+            except Exception as e:
+                logging.error(f"Falha na conversão PDF/A de {os.path.basename(parte)}: {e}")
+                falhas.append((parte, str(e)))
+
+            if on_parte_concluida:
+                on_parte_concluida(concluidas, len(partes), parte)
+
+    if token:
+        token.raise_if_cancelled()
+    return falhas
+
 if PDFA_AVAILABLE:
     logging.info("PDF/A disponível: Ghostscript e ICC encontrados")
 else:
@@ -1482,15 +3062,17 @@ def debounce(wait):
     return decorator
 
 # Aplicar debounce a funções pesadas
-def process_in_batches(file_list, batch_size=10):
+def process_in_batches(file_list, batch_size=10, token=None):
     """Processa muitos arquivos em lotes para evitar sobrecarga"""
     for i in range(0, len(file_list), batch_size):
         batch = file_list[i:i + batch_size]
         yield batch
-        # Pequena pausa entre lotes
-        time.sleep(0.5)
-        if cancel_operation:
-            break
+        # Pequena pausa entre lotes (interrompida imediatamente pelo cancelamento)
+        if token:
+            if token.wait(0.5):
+                break
+        else:
+            time.sleep(0.5)
 @debounce(0.3)
 def update_stats_debounced(listbox, files_var, pages_var, size_var):
     update_stats(listbox, files_var, pages_var, size_var)
@@ -1498,35 +3080,343 @@ def update_stats_debounced(listbox, files_var, pages_var, size_var):
 # -----------------------
 # Validação de PDFs SEGURA
 # -----------------------
-def safe_pdf_reader(file_path):
-    """Wrapper seguro para ler PDFs potencialmente corrompidos"""
+def abrir_pdf_verificado(file_path):
+    """
+    Mapeia o arquivo uma vez, faz a varredura de segurança sobre o mapeamento e
+    entrega o mesmo buffer ao PdfReader. Retorna (reader, buffer); o buffer vive
+    enquanto o reader o referenciar.
+    """
+    buffer = mapear_pdf(file_path)
     try:
-        validate_file_security(file_path)
-        
-        with open(file_path, 'rb') as f:
-            # Verificar assinatura PDF novamente
-            if f.read(4) != b'%PDF':
-                raise PDFCorruptionError("Arquivo não é um PDF válido")
-            
-        reader = PdfReader(file_path)
+        validate_file_security(file_path, buffer)
+        reader = PdfReader(buffer)
         # Tentar acessar propriedades críticas
         _ = len(reader.pages)
         _ = reader.metadata
-        
+        return reader, buffer
+    except Exception:
+        buffer.close()
+        raise
+
+def safe_pdf_reader(file_path):
+    """Wrapper seguro para ler PDFs potencialmente corrompidos"""
+    try:
+        reader, _ = abrir_pdf_verificado(file_path)
         return reader
+    except SecurityError:
+        raise
     except Exception as e:
         logging.error(f"PDF corrompido ou inválido: {file_path} - {e}")
         raise PDFCorruptionError(f"PDF corrompido ou inválido: {os.path.basename(file_path)}")
 
+# =============================================================================
+# ARQUIVOS GRANDES - ACESSO SOB DEMANDA (PIKEPDF/QPDF)
+# =============================================================================
+def limite_tamanho_arquivo():
+    """Teto de tamanho por entrada: sem pikepdf tudo passa pelo PyPDF2, que monta as saídas em memória"""
+    return MAX_FILE_SIZE_GRANDE if PIKEPDF_AVAILABLE else MAX_FILE_SIZE
+
+def arquivo_grande(path):
+    """Entrada processada fora do núcleo: pikepdf disponível e arquivo acima de LIMITE_ARQUIVO_GRANDE"""
+    if not PIKEPDF_AVAILABLE:
+        return False
+    try:
+        return os.path.getsize(path) > LIMITE_ARQUIVO_GRANDE
+    except OSError:
+        return False
+
+def abrir_pdf_grande(path):
+    """
+    Abre o PDF pelo qpdf sobre o arquivo mapeado: na abertura só a xref é lida;
+    objetos e streams são lidos quando usados (ao contar ou copiar páginas),
+    sem o parse da árvore inteira pelo PyPDF2. A verificação de segurança
+    (validate_file_security) fica a cargo de quem chama.
+    """
+    pikepdf = importar_tardio("pikepdf")
+    return pikepdf.open(path, access_mode=pikepdf.AccessMode.mmap)
+
+def contar_paginas_pdf(path):
+    """Número de páginas, em cache no índice de metadados"""
+    return pdf_metadata_cache.obter(path, 'paginas', _contar_paginas_pdf)
+
+def _contar_paginas_pdf(path):
+    if arquivo_grande(path):
+        validate_file_security(path)
+        with abrir_pdf_grande(path) as pdf:
+            return len(pdf.pages)
+    return len(safe_pdf_reader(path).pages)
+
+def estimar_bytes_pagina_grande(page, contabilizados):
+    """
+    Equivalente a estimar_bytes_pagina para páginas do pikepdf: usa o /Length
+    declarado dos streams, sem ler nem decodificar o conteúdo.
+    """
+    pikepdf = importar_tardio("pikepdf")
+    total = SPLIT_PAGINA_OVERHEAD
+    pendentes = [page.obj]
+    while pendentes:
+        obj = pendentes.pop()
+        if not isinstance(obj, pikepdf.Object):
+            continue  # Escalares chegam convertidos para tipos do Python
+        if obj.is_indirect:
+            if obj.objgen in contabilizados:
+                continue
+            contabilizados.add(obj.objgen)
+            total += SPLIT_OBJETO_OVERHEAD
+        if isinstance(obj, pikepdf.Stream):
+            total += int(obj.get("/Length", 0))
+            pendentes.extend(valor for chave, valor in obj.stream_dict.items() if chave != "/Length")
+        elif isinstance(obj, pikepdf.Dictionary):
+            pendentes.extend(valor for chave, valor in obj.items() if chave not in SPLIT_CHAVES_NAO_SEGUIDAS)
+        elif isinstance(obj, pikepdf.Array):
+            pendentes.extend(obj)
+    return total
+
+class EscritorGrande:
+    """
+    Parte de divisão montada com pikepdf (interface de PdfWriter usada na divisão).
+    As páginas são copiadas da origem sob demanda e a poda de recursos fica com o qpdf.
+    """
+    # Gravada pela thread do trabalho direto no destino: objetos do qpdf não são
+    # thread-safe e os dados da parte já estão em memória no qpdf (um buffer os duplicaria)
+    gravacao_direta = True
+
+    def __init__(self):
+        self.pdf = importar_tardio("pikepdf").new()
+
+    def add_page(self, page):
+        self.pdf.pages.append(page)
+
+    def write(self, stream):
+        self.pdf.remove_unreferenced_resources()
+        self.pdf.save(stream)
+
+class EscritorStreaming:
+    """
+    Parte de divisão gravada página a página pelo UniaoStreaming. Usada quando
+    os dados de uma parte de arquivo grande não cabem na memória: o qpdf os
+    copiaria inteiros ao montar a parte. Recursos não são podados e marcadores
+    e formulários não são copiados.
+    """
+    gravacao_direta = True
+
+    def __init__(self, path, indices, token):
+        self.path = path
+        self.indices = list(indices)
+        self.token = token
+
+    def write(self, stream):
+        uniao = UniaoStreaming(stream, self.token)
+        uniao.append(self.path, self.indices)
+        uniao.finalizar()
+
+def parte_grande_cabe_em_memoria(reader, indices, token):
+    """Se os streams das páginas (pelo /Length declarado) cabem na memória disponível"""
+    limite = memoria_para_limites()
+    contabilizados = set()
+    total = SPLIT_ARQUIVO_OVERHEAD
+    for indice in indices:
+        token.raise_if_cancelled()
+        total += estimar_bytes_pagina_grande(reader.pages[indice], contabilizados)
+        if total > limite:
+            return False
+    return True
+
+class UniaoGrande:
+    """
+    Substitui o PdfMerger quando a união envolve arquivos grandes, evitando o parse
+    pelo PyPDF2. O qpdf copia os dados dos streams junto com as páginas, então a
+    memória acompanha o tamanho das entradas: uniões que não cabem seguem pelo
+    motor em streaming (escolher_motor_uniao). As origens são lidas pelo pool de
+    descritores e liberadas em close().
+    """
+    def __init__(self):
+        self.pikepdf = importar_tardio("pikepdf")
+        self.saida = self.pikepdf.new()
+        self.origens = []
+        self.entradas = []
+        self.senha = None
+
+    @property
+    def pages(self):
+        return self.saida.pages
+
+    def _abrir(self, path):
+        entrada = pool_descritores.abrir(path)
+        self.entradas.append(entrada)
+        origem = self.pikepdf.open(entrada, access_mode=self.pikepdf.AccessMode.stream)
+        self.origens.append(origem)
+        return origem
+
+    def append(self, path):
+        self.saida.pages.extend(self._abrir(path).pages)
+
+    def merge(self, posicao, path):
+        for deslocamento, page in enumerate(self._abrir(path).pages):
+            self.saida.pages.insert(posicao + deslocamento, page)
+
+    def proteger(self, senha):
+        """Criptografia aplicada na própria gravação (RC4 128 bits, como aplicar_criptografia)"""
+        self.senha = senha
+
+    def write(self, stream):
+        opcoes = {}
+        if self.senha:
+            opcoes['encryption'] = self.pikepdf.Encryption(user=self.senha, owner=self.senha, R=3, aes=False, metadata=False)
+        self.saida.save(stream, **opcoes)
+
+    def close(self):
+        self.saida.close()
+        for origem in self.origens:
+            origem.close()
+        self.origens.clear()
+        for entrada in self.entradas:
+            entrada.close()
+        self.entradas.clear()
+
+HASH_BLOCO = 1024 * 1024  # Bytes lidos por vez no hash de conteúdo
+
+def hash_conteudo(path):
+    """BLAKE2b (128 bits) do arquivo inteiro, lido em blocos num buffer reutilizado"""
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(HASH_BLOCO)
+    visao = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            lidos = f.readinto(buffer)
+            if not lidos:
+                break
+            digest.update(visao[:lidos])
+    return digest.hexdigest()
+
+def obter_hash_conteudo(path):
+    return pdf_metadata_cache.obter(path, 'hash', hash_conteudo)
+
+def hashes_conteudo(arquivos):
+    """{arquivo: hash}; arquivos que não puderam ser lidos ficam de fora da comparação"""
+    hashes = {}
+    for f in arquivos:
+        try:
+            hashes[f] = obter_hash_conteudo(f)
+        except OSError as e:
+            logging.warning(f"Hash de conteúdo indisponível para {os.path.basename(f)}: {e}")
+    return hashes
+
+def grupos_duplicados(arquivos):
+    """
+    Grupos de arquivos com conteúdo idêntico; só arquivos de mesmo tamanho são
+    comparados pelo hash (em geral já no índice, calculado ao adicionar à lista).
+    Lê arquivos inteiros: não chamar na thread principal.
+    """
+    por_tamanho = collections.defaultdict(list)
+    for f in arquivos:
+        try:
+            por_tamanho[os.path.getsize(f)].append(f)
+        except OSError:
+            continue
+    grupos = []
+    for candidatos in por_tamanho.values():
+        if len(candidatos) < 2:
+            continue
+        por_hash = collections.defaultdict(list)
+        for f, digest in hashes_conteudo(candidatos).items():
+            por_hash[digest].append(f)
+        grupos.extend(g for g in por_hash.values() if len(g) > 1)
+    return grupos
+
+def confirmar_duplicados(listbox, novos, hashes):
+    """
+    Filtra arquivos novos cujo conteúdo já está na lista (ou repete outro novo),
+    mesmo com nome diferente; o usuário decide se adiciona as cópias assim mesmo.
+    Arquivos sem hash em `hashes` não entram na comparação.
+    """
+    vistos = {hashes[f]: f for f in listbox.get(0, tk.END) if f in hashes}
+    aceitos, duplicados = [], []
+    for f in novos:
+        digest = hashes.get(f)
+        if digest is None:
+            aceitos.append(f)
+        elif digest in vistos:
+            duplicados.append((f, vistos[digest]))
+        else:
+            vistos[digest] = f
+            aceitos.append(f)
+
+    if duplicados:
+        linhas = "\n".join(f"• {os.path.basename(copia)} = {os.path.basename(original)}"
+                           for copia, original in duplicados[:5])
+        if len(duplicados) > 5:
+            linhas += f"\n... e mais {len(duplicados) - 5}"
+        logging.warning(f"{len(duplicados)} arquivo(s) com conteúdo duplicado")
+        if messagebox.askyesno(
+            "Documentos Duplicados",
+            f"{len(duplicados)} arquivo(s) têm conteúdo idêntico a outro da lista:\n\n{linhas}\n\n"
+            "Adicionar as cópias mesmo assim?",
+            icon='warning'
+        ):
+            aceitos.extend(copia for copia, _ in duplicados)
+    return aceitos
+
+def adicionar_sem_duplicados(listbox, candidatos, ao_adicionar, ao_rejeitar=None):
+    """
+    Validação (varredura de segurança + parse) e hash dos arquivos numa thread
+    (lê cada arquivo inteiro - lento em arquivos grandes ou na rede); de volta à
+    thread principal, avisa dos inválidos via ao_rejeitar([(path, erro)]),
+    confirma as cópias, insere os arquivos e chama ao_adicionar(inseridos).
+    """
+    if not candidatos:
+        return
+    candidatos = list(candidatos)
+    existentes = list(listbox.get(0, tk.END))
+
+    def calcular():
+        validos, invalidos = [], []
+        for f in candidatos:
+            is_valid, error = validate_pdf(f)
+            if is_valid:
+                validos.append(f)
+            else:
+                invalidos.append((f, error))
+        hashes = hashes_conteudo(existentes + validos) if validos else {}
+        bomba_ui.agendar(concluir, validos, invalidos, hashes)
+
+    def concluir(validos, invalidos, hashes):
+        if invalidos and ao_rejeitar:
+            ao_rejeitar(invalidos)
+        inseridos = []
+        for f in confirmar_duplicados(listbox, validos, hashes):
+            if f not in listbox.get(0, tk.END):
+                listbox.insert(tk.END, f)
+                inseridos.append(f)
+        ao_adicionar(inseridos)
+
+    show_status(f"Verificando {len(candidatos)} arquivo(s)...", "info")
+    threading.Thread(target=calcular, name="JuntaPDF-hash", daemon=True).start()
+
 def validate_pdf(path):
     """Valida se o PDF é legível e não está corrompido."""
     try:
-        # Validação de segurança primeiro
-        validate_file_security(path)
+        # Segurança e conteúdo numa única leitura (arquivo mapeado)
+        try:
+            if arquivo_grande(path):
+                # Estrutura conferida pelo qpdf, sem carregar a árvore de páginas no PyPDF2
+                buffer = mapear_pdf(path)
+                try:
+                    validate_file_security(path, buffer)
+                    with abrir_pdf_grande(path) as pdf:
+                        pdf_metadata_cache.obter(path, 'paginas', lambda _: len(pdf.pages))
+                except Exception:
+                    buffer.close()
+                    raise
+            else:
+                reader, buffer = abrir_pdf_verificado(path)
+        except SecurityError:
+            raise
+        except Exception as e:
+            raise PDFCorruptionError(f"PDF corrompido ou inválido: {os.path.basename(path)} ({e})")
         
-        # Agora valida o conteúdo do PDF
-        reader = safe_pdf_reader(path)
-        _ = len(reader.pages)
+        # O hash de conteúdo (duplicados) fica com adicionar_sem_duplicados, fora da thread principal
+        buffer.close()
         return True, None
     except (SecurityError, PDFCorruptionError) as e:
         logging.warning(f"PDF inválido ou inseguro: {path} - {e}")
@@ -1545,19 +3435,20 @@ def update_stats(listbox, files_var, pages_var, size_var):
     total_size_bytes = 0
     
     # Limite de arquivos para prevenir sobrecarga
-    if len(files) > MAX_FILES_PER_OPERATION:
-        files = files[:MAX_FILES_PER_OPERATION]
-        logging.warning(f"Limite de {MAX_FILES_PER_OPERATION} arquivos excedido")
+    max_arquivos = limite_arquivos_operacao()
+    max_paginas = limite_total_paginas()
+    if len(files) > max_arquivos:
+        files = files[:max_arquivos]
+        logging.warning(f"Limite de {max_arquivos} arquivos excedido")
     
     for f in files:
         try:
-            reader = safe_pdf_reader(f)
-            total_pages += len(reader.pages)
+            total_pages += contar_paginas_pdf(f)
             total_size_bytes += os.path.getsize(f)
             
             # Verificar limite total de páginas
-            if total_pages > MAX_TOTAL_PAGES:
-                raise SystemOverloadError(f"Limite de {MAX_TOTAL_PAGES} páginas excedido")
+            if total_pages > max_paginas:
+                raise SystemOverloadError(f"Limite de {max_paginas} páginas excedido")
                 
         except Exception as e:
             logging.warning(f"Erro ao ler {f} para estatísticas: {e}")
@@ -1576,19 +3467,26 @@ def update_stats(listbox, files_var, pages_var, size_var):
 
 def get_pdf_info(path):
     """Retorna string com informações básicas do PDF para tooltip."""
-    
     # 🔥 VERIFICAR CACHE PRIMEIRO
-    if path in pdf_metadata_cache:
-        return pdf_metadata_cache[path]
+    return pdf_metadata_cache.obter(path, 'info', _ler_pdf_info)
+
+def _ler_pdf_info(path):
     try:
-        reader = safe_pdf_reader(path)
-        num_pages = len(reader.pages)
-        meta = reader.metadata or {}
+        if arquivo_grande(path):
+            validate_file_security(path)
+            with abrir_pdf_grande(path) as pdf:
+                num_pages = len(pdf.pages)
+                meta = {chave: str(valor) for chave, valor in pdf.docinfo.items()}
+                is_encrypted = pdf.is_encrypted
+        else:
+            reader = safe_pdf_reader(path)
+            num_pages = len(reader.pages)
+            meta = reader.metadata or {}
+            is_encrypted = reader.is_encrypted
         title = meta.get("/Title") or meta.get("Title") or "Sem título"
         author = meta.get("/Author") or meta.get("Author") or "Desconhecido"
         size_kb = max(1, os.path.getsize(path) // 1024)
         
-        is_encrypted = reader.is_encrypted
         encryption_note = "\nProtegido com senha" if is_encrypted else ""
         
         return (
@@ -1599,6 +3497,9 @@ def get_pdf_info(path):
             f"Tamanho: {size_kb} KB{encryption_note}"
         )
     except Exception as e:
+        entrada = pdf_metadata_cache.entrada(path)
+        if entrada is not None:
+            entrada['erro'] = True
         return f"{os.path.basename(path)}\n[Erro ao ler PDF: {e}]"
 
 def attach_dynamic_tooltips(listbox):
@@ -1781,45 +3682,43 @@ def setup_context_menu(listbox, files_var, pages_var, size_var):
 # -----------------------
 def add_files(listbox, files_var, pages_var, size_var, event=None):
     files = filedialog.askopenfilenames(filetypes=[("Arquivos PDF", "*.pdf")])
-    added = 0
-    invalid = []
     
     # Verificar limite de arquivos
     current_count = listbox.size()
-    if current_count + len(files) > MAX_FILES_PER_OPERATION:
+    max_arquivos = limite_arquivos_operacao()
+    if current_count + len(files) > max_arquivos:
         messagebox.showwarning(
             "Limite Excedido", 
-            f"Máximo de {MAX_FILES_PER_OPERATION} arquivos por operação.\n"
+            f"Máximo de {max_arquivos} arquivos por operação.\n"
             f"Atualmente: {current_count}, tentando adicionar: {len(files)}"
         )
-        files = files[:MAX_FILES_PER_OPERATION - current_count]
-    
-    for f in files:
-        if f and f.lower().endswith(".pdf") and f not in listbox.get(0, tk.END):
-            is_valid, error = validate_pdf(f)
-            if is_valid:
-                listbox.insert(tk.END, f)
-                added += 1
-                logging.info(f"Arquivo adicionado: {os.path.basename(f)}")
-            else:
-                invalid.append((os.path.basename(f), error))
-                logging.warning(f"Arquivo inválido: {os.path.basename(f)} - {error}")
-    
-    if invalid:
+        files = files[:max_arquivos - current_count]
+    
+    # Validação e hash seguem para a thread de adicionar_sem_duplicados
+    existentes = listbox.get(0, tk.END)
+    candidatos = [f for f in files if f and f.lower().endswith(".pdf") and f not in existentes]
+    
+    def ao_adicionar(inseridos):
+        for f in inseridos:
+            logging.info(f"Arquivo adicionado: {os.path.basename(f)}")
+        if inseridos:
+            status_var.set(f"{len(inseridos)} arquivo(s) adicionados.")
+            show_toast(f"{len(inseridos)} arquivo(s) adicionados.")
+            update_stats_debounced(listbox, files_var, pages_var, size_var)
+        # Inserção assíncrona: o estado dos botões só vale depois dela
+        enable_submit_on_conditions()
+
+    def ao_rejeitar(invalid):
+        for f, err in invalid:
+            logging.warning(f"Arquivo inválido: {os.path.basename(f)} - {err}")
         error_msg = "PDFs inválidos ou corrompidos:\n\n"
-        for name, err in invalid[:5]:
-            error_msg += f"• {name}\n  {err[:50]}...\n\n"
+        for f, err in invalid[:5]:
+            error_msg += f"• {os.path.basename(f)}\n  {err[:50]}...\n\n"
         if len(invalid) > 5:
             error_msg += f"... e mais {len(invalid) - 5} arquivo(s)"
         messagebox.showwarning("Aviso", error_msg)
-    
-    if added > 0:
-        status_var.set(f"{added} arquivo(s) adicionados.")
-        show_toast(f"{added} arquivo(s) adicionados.")
-        update_stats_debounced(listbox, files_var, pages_var, size_var)
-    
-    # CORREÇÃO: Atualizar estado dos botões após adicionar arquivos
-    enable_submit_on_conditions()
+
+    adicionar_sem_duplicados(listbox, candidatos, ao_adicionar, ao_rejeitar)
 
 def remove_selected(listbox, files_var, pages_var, size_var, event=None):
     """🔒 CORREÇÃO 5: MULTI-SELECÇÃO FUNCIONAL - AGORA CORRIGIDA"""
@@ -1877,18 +3776,54 @@ def choose_output_folder(entry):
         entry.insert(0, folder)
         logging.info(f"Pasta de saída selecionada: {folder}")
 
-def generate_unique_filename(folder, base_name):
-    name, ext = os.path.splitext(base_name)
-    counter = 1
-    new_name = base_name
-    while os.path.exists(os.path.join(folder, new_name)):
-        new_name = f"{name}({counter}){ext}"
-        counter += 1
-        if counter > 1000:  # Limite de segurança
-            timestamp = int(time.time())
-            new_name = f"{name}_{timestamp}{ext}"
-            break
-    return os.path.join(folder, new_name)
+class IndiceNomesSaida:
+    """
+    Gera nomes de saída únicos a partir de uma única listagem da pasta por
+    trabalho, em vez de um os.path.exists por tentativa (caro em compartilhamentos
+    de rede). O nome escolhido é reservado com criação exclusiva ('xb'), o que
+    mantém a geração segura contra outros trabalhos gravando na mesma pasta.
+    """
+    def __init__(self, folder):
+        self.folder = folder
+        self.lock = threading.Lock()
+        self.proximo_contador = {}
+        try:
+            with os.scandir(folder) as entradas:
+                self.existentes = {os.path.normcase(entrada.name) for entrada in entradas}
+        except OSError as e:
+            logging.warning(f"Não foi possível listar {folder}: {e}")
+            self.existentes = set()
+
+    def reservar(self, base_name):
+        """Cria o arquivo vazio com o primeiro nome livre (nome, nome(1), nome(2)...) e devolve o caminho"""
+        name, ext = os.path.splitext(base_name)
+        with self.lock:
+            counter = self.proximo_contador.get(base_name, 0)
+            while True:
+                new_name = base_name if counter == 0 else f"{name}({counter}){ext}"
+                counter += 1
+                chave = os.path.normcase(new_name)
+                if chave in self.existentes:
+                    continue
+                self.existentes.add(chave)
+                caminho = os.path.join(self.folder, new_name)
+                try:
+                    with open(caminho, "xb"):
+                        pass
+                except FileExistsError:
+                    # Criado por outro trabalho/programa depois da listagem
+                    continue
+                self.proximo_contador[base_name] = counter
+                return caminho
+
+    @staticmethod
+    def liberar(caminho):
+        """Remove a reserva se nada chegou a ser gravado nela"""
+        try:
+            if os.path.getsize(caminho) == 0:
+                os.remove(caminho)
+        except OSError:
+            pass
 
 def get_default_output_name(operation_type, files, options=None, page_ranges=None):
     if not files:
@@ -1951,8 +3886,9 @@ def parse_page_ranges(ranges_str, max_pages):
         pages = sorted(list(pages))
         
         # Verificar limite de páginas
-        if len(pages) > MAX_TOTAL_PAGES:
-            raise SystemOverloadError(f"Limite de {MAX_TOTAL_PAGES} páginas excedido")
+        max_paginas = limite_total_paginas()
+        if len(pages) > max_paginas:
+            raise SystemOverloadError(f"Limite de {max_paginas} páginas excedido")
             
         return pages
     except ValueError as e:
@@ -1961,45 +3897,6 @@ def parse_page_ranges(ranges_str, max_pages):
         else:
             raise
 
-# -----------------------
-# UI State Management - AGORA COM SEGURANÇA
-# -----------------------
-def set_ui_state(enabled):
-    """Habilita ou desabilita elementos da UI durante processamento - COM VERIFICAÇÕES SEGURAS"""
-    state = "normal" if enabled else "disabled"
-    
-    # Usar safe_widget_config para todos os widgets
-    safe_widget_config(btn_merge, state=state)
-    safe_widget_config(btn_split, state=state)
-    
-    # Verificar frames de botões
-    if 'btn_frame_merge' in globals():
-        for widget in btn_frame_merge.winfo_children():
-            if isinstance(widget, ttk.Button):
-                safe_widget_config(widget, state=state)
-    
-    if 'btn_frame_split' in globals():
-        for widget in btn_frame_split.winfo_children():
-            if isinstance(widget, ttk.Button):
-                safe_widget_config(widget, state=state)
-    
-    # Esconde botões de cancelamento se existirem
-    if enabled:
-        if 'btn_cancel_merge' in globals():
-            try:
-                btn_cancel_merge.pack_forget()
-            except tk.TclError:
-                pass
-        if 'btn_cancel_split' in globals():
-            try:
-                btn_cancel_split.pack_forget()
-            except tk.TclError:
-                pass
-        
-        safe_widget_config(root, cursor="")
-    else:
-        safe_widget_config(root, cursor="watch")
-
 def validate_pdfa_protection_compatibility():
     """
     Valida e ajusta automaticamente o conflito entre PDF/A e proteção por senha.
@@ -2131,8 +4028,8 @@ def enable_submit_on_conditions():
     has_files_merge = merge_list.size() > 0
     has_files_split = split_list.size() > 0
     
-    # Para merge: precisa ter arquivos
-    safe_widget_config(btn_merge, state="normal" if has_files_merge else "disabled")
+    # Para merge: precisa ter arquivos (e nenhuma união aguardando a verificação de duplicados)
+    safe_widget_config(btn_merge, state="normal" if has_files_merge and not verificando_merge else "disabled")
     
     # Para split: precisa ter arquivos E modo válido
     if has_files_split:
@@ -2154,6 +4051,11 @@ def enable_submit_on_conditions():
                 valid = int(split_parts_var.get()) > 0
             except:
                 valid = False
+        elif mode == "size":
+            try:
+                valid = float(split_size_var.get().replace(",", ".")) > 0
+            except ValueError:
+                valid = False
         
         safe_widget_config(btn_split, state="normal" if valid else "disabled")
     else:
@@ -2216,6 +4118,9 @@ def validate_password_strength(password):
 
 def show_status(message, type="info"):
     """Mostra status com cores diferentes - COM VERIFICAÇÃO DE SEGURANÇA"""
+    if not bomba_ui.na_thread_principal():
+        bomba_ui.publicar(("status",), show_status, message, type)
+        return
     try:
         colors = {
             "info": "blue",
@@ -2239,27 +4144,14 @@ def check_dependencies():
     logging.info(f"   - Ghostscript: {bool(GHOSTSCRIPT_PATH)}")
     logging.info(f"   - PDF/A: {PDFA_AVAILABLE}")
     logging.info(f"   - Drag & Drop: {DND_AVAILABLE}")
+    for linha in relatorio_importacoes():
+        logging.info(f"   Importação tardia -{linha}")
 
 def show_first_run_disclaimer():
     """Mostra aviso inicial se necessário - CORREÇÃO: Função faltando"""
     # Pode deixar vazio ou adicionar um aviso opcional
     pass
 
-def offer_recovery_on_startup():
-    """Oferece recuperação de operação anterior - CORREÇÃO: Função faltando"""
-    # Pode deixar vazio - funcionalidade opcional
-    pass
-
-def create_operation_checkpoint(operation_type, files_processed, current_step, temp_files):
-    """Cria checkpoint para recuperação - CORREÇÃO: Função faltando"""
-    # Funcionalidade avançada - pode deixar como placeholder
-    pass
-
-def cleanup_checkpoint():
-    """Limpa checkpoint - CORREÇÃO: Função faltando"""
-    # Funcionalidade avançada - pode deixar como placeholder
-    pass
-
 def show_environment_check():
     """Mostra verificação de ambiente - CORREÇÃO: Função faltando"""
     try:
@@ -2290,7 +4182,7 @@ def show_message_in_main_thread(title, message, type="info"):
         else:
             messagebox.showinfo(title, message)
     
-    root.after(0, show)
+    bomba_ui.agendar(show)
 
 # =============================================================================
 # FUNÇÕES PRINCIPAIS DE PROCESSAMENTO - COM SEGURANÇA
@@ -2341,27 +4233,374 @@ def aplicar_criptografia(writer, password):
             logging.error(f"❌ Falha total na criptografia: {e2}")
             raise PDFProcessingError(f"Falha na criptografia: {e2}")
 
+# =============================================================================
+# POOL DE DESCRITORES DAS ENTRADAS
+# =============================================================================
+class EntradaReabrivel:
+    """
+    Arquivo de entrada cujo descritor é emprestado do pool: fechado quando outra
+    entrada precisa da vaga e reaberto sob demanda, na posição em que estava.
+    """
+    def __init__(self, pool, path):
+        self.pool = pool
+        self.path = os.fspath(path)
+        self.tamanho = os.path.getsize(self.path)
+        self.posicao = 0
+        self.aberturas = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def _com_arquivo(self, operacao):
+        with self.lock:
+            if self.closed:
+                raise ValueError(f"Entrada já fechada: {self.path}")
+            arquivo = self.pool.descritor(self)
+            arquivo.seek(self.posicao)
+            resultado = operacao(arquivo)
+            self.posicao = arquivo.tell()
+            return resultado
+
+    def read(self, size=-1):
+        return self._com_arquivo(lambda arquivo: arquivo.read(size))
+
+    def readinto(self, buffer):
+        return self._com_arquivo(lambda arquivo: arquivo.readinto(buffer))
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.posicao
+        elif whence == io.SEEK_END:
+            offset += self.tamanho
+        if offset < 0:
+            raise ValueError("Posição negativa")
+        self.posicao = offset
+        return self.posicao
+
+    def tell(self):
+        return self.posicao
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def close(self):
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self.pool.liberar(self)
+
+class PoolDescritores:
+    """
+    Empresta descritores às entradas das uniões, com no máximo `limite` abertos
+    ao mesmo tempo (todas as operações). Ao atingir o limite, a entrada usada há
+    mais tempo é fechada; entradas em leitura no momento não são escolhidas.
+    """
+    def __init__(self, limite):
+        self.limite = limite
+        self.lock = threading.Lock()
+        self.abertos = collections.OrderedDict()  # entrada -> arquivo, do menos ao mais recente
+        self.entradas = 0
+        self.reaberturas = 0
+        self.pico = 0
+
+    def abrir(self, path):
+        entrada = EntradaReabrivel(self, path)
+        with self.lock:
+            self.entradas += 1
+        return entrada
+
+    def descritor(self, entrada):
+        """Arquivo aberto da entrada (chamado com entrada.lock adquirido)"""
+        with self.lock:
+            arquivo = self.abertos.get(entrada)
+            if arquivo is not None:
+                self.abertos.move_to_end(entrada)
+                return arquivo
+            for vitima in list(self.abertos):
+                if len(self.abertos) < self.limite:
+                    break
+                # Sem espera: quem está lendo mantém o descritor (evita deadlock)
+                if vitima.lock.acquire(blocking=False):
+                    try:
+                        self.abertos.pop(vitima).close()
+                    finally:
+                        vitima.lock.release()
+            arquivo = open(entrada.path, "rb")
+            if entrada.aberturas:
+                self.reaberturas += 1
+            entrada.aberturas += 1
+            self.abertos[entrada] = arquivo
+            self.pico = max(self.pico, len(self.abertos))
+            return arquivo
+
+    def liberar(self, entrada):
+        with self.lock:
+            arquivo = self.abertos.pop(entrada, None)
+            self.entradas -= 1
+        if arquivo is not None:
+            arquivo.close()
+
+    def estatisticas(self):
+        with self.lock:
+            return {
+                'abertos': len(self.abertos),
+                'limite': self.limite,
+                'entradas': self.entradas,
+                'pico': self.pico,
+                'reaberturas': self.reaberturas,
+            }
+
+def calcular_limite_descritores():
+    """POOL_DESCRITORES_MAX, reduzido quando o limite de arquivos abertos do sistema é baixo"""
+    limite = POOL_DESCRITORES_MAX
+    try:
+        import resource
+        suave, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if suave != resource.RLIM_INFINITY:
+            limite = min(limite, max(8, suave // 4))
+    except (ImportError, ValueError, OSError):
+        pass  # Windows: o limite do CRT (512) comporta o teto padrão
+    return limite
+
+pool_descritores = PoolDescritores(calcular_limite_descritores())
+
+# =============================================================================
+# UNIÃO EM STREAMING
+# =============================================================================
+ESTRUTURAS_NAO_COPIADAS_STREAMING = {"/AcroForm": "formulários", "/Outlines": "marcadores"}
+
+class UniaoStreaming:
+    """
+    Motor de união que grava cada página no destino assim que ela é copiada.
+    Ficam residentes só a origem aberta no momento (objetos já gravados saem do
+    cache do PdfReader), os offsets da xref e os números das páginas; a árvore
+    de páginas, o catálogo e a xref são gravados em finalizar(). Marcadores e
+    formulários das origens não são copiados.
+    """
+    def __init__(self, destino, token, senha=None):
+        self.generic = importar_tardio("PyPDF2.generic")
+        self.destino = destino
+        self.token = token
+        self.arquivo = None
+        self.offsets = [None]  # Índice = número do objeto (0 é a entrada livre da xref)
+        self.pages = []  # Números dos objetos de página, na ordem da saída
+        self.nos = []  # Nós intermediários da árvore: (número, páginas)
+        self.raiz = self._reservar()
+        self.criptografia = None
+        if senha:
+            # Mesmo esquema de aplicar_criptografia (RC4 128 bits); chaves e /Encrypt vêm do PyPDF2
+            writer = PdfWriter()
+            writer.encrypt(user_password=senha, owner_password=senha, use_128bit=True)
+            self.criptografia = (writer._encrypt_key, writer._ID, writer.get_object(writer._encrypt))
+        self.destino.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    @classmethod
+    def em_arquivo(cls, path, token):
+        """União gravada num arquivo próprio (segmento durável)"""
+        arquivo = open(path, "wb")
+        uniao = cls(ArquivoCancelavel(arquivo, token), token)
+        uniao.arquivo = arquivo
+        return uniao
+
+    def _reservar(self):
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def _ref(self, numero):
+        return self.generic.IndirectObject(numero, 0, None)
+
+    def _chave(self, numero):
+        """Chave RC4 do objeto (algoritmo 1 da especificação, como no PdfWriter)"""
+        chave = self.criptografia[0]
+        base = chave + (numero & 0xFFFFFF).to_bytes(3, "little") + b"\x00\x00"
+        return hashlib.md5(base).digest()[:min(16, len(chave) + 5)]
+
+    def _gravar_objeto(self, numero, obj, criptografar=True):
+        self.offsets[numero] = self.destino.tell()
+        self.destino.write(f"{numero} 0 obj\n".encode("ascii"))
+        chave = self._chave(numero) if self.criptografia and criptografar else None
+        obj.write_to_stream(self.destino, chave)
+        self.destino.write(b"\nendobj\n")
+
+    def _traduzir(self, obj, traducao, pendentes):
+        """Cópia do objeto com referências renumeradas; referências novas entram em `pendentes`"""
+        generic = self.generic
+        if isinstance(obj, generic.IndirectObject):
+            chave = (obj.idnum, obj.generation)
+            if chave in traducao:
+                numero = traducao[chave]
+                # Página da origem fora da seleção: a referência vira null
+                return self._ref(numero) if numero is not None else generic.NullObject()
+            numero = traducao[chave] = self._reservar()
+            pendentes.append((obj, numero))
+            return self._ref(numero)
+        if isinstance(obj, generic.StreamObject):
+            copia = type(obj)()
+            copia._data = obj._data
+            itens = ((k, v) for k, v in obj.items() if k != "/Length")
+        elif isinstance(obj, generic.DictionaryObject):
+            copia = generic.DictionaryObject()
+            itens = obj.items()
+        elif isinstance(obj, generic.ArrayObject):
+            return generic.ArrayObject(self._traduzir(valor, traducao, pendentes) for valor in obj)
+        else:
+            return obj
+        for chave, valor in itens:
+            copia[chave] = self._traduzir(valor, traducao, pendentes)
+        return copia
+
+    def _no_da_pagina(self, numero):
+        if not self.nos or len(self.nos[-1][1]) >= STREAMING_PAGINAS_POR_NO:
+            self.nos.append((self._reservar(), []))
+        self.nos[-1][1].append(numero)
+        return self.nos[-1][0]
+
+    def append(self, path, indices=None):
+        """
+        Copia e grava as páginas do arquivo - todas, ou só as de `indices` (base 0,
+        na ordem dada). A verificação de segurança fica com quem chama. Retorna as
+        estruturas do catálogo da origem que não são copiadas (/AcroForm, /Outlines).
+        """
+        generic = self.generic
+        buffer = mapear_pdf(path)
+        try:
+            reader = PdfReader(buffer)
+            catalogo = reader.trailer["/Root"]
+            nao_copiadas = [nome for nome in ESTRUTURAS_NAO_COPIADAS_STREAMING if nome in catalogo]
+            paginas = reader.pages
+            traducao = {}
+            if indices is not None:
+                for page in paginas:
+                    ref = page.indirect_reference
+                    traducao[(ref.idnum, ref.generation)] = None
+                paginas = [paginas[indice] for indice in indices]
+            # Páginas numeradas antes da cópia: anotações e destinos que apontam para
+            # outras páginas do documento são traduzidos sem copiar a árvore de origem
+            for page in paginas:
+                ref = page.indirect_reference
+                traducao[(ref.idnum, ref.generation)] = self._reservar()
+
+            for page in paginas:
+                self.token.raise_if_cancelled()
+                ref = page.indirect_reference
+                numero = traducao[(ref.idnum, ref.generation)]
+                pendentes = []
+                copia = self._traduzir(generic.DictionaryObject(
+                    (k, v) for k, v in page.items() if k != "/Parent"), traducao, pendentes)
+                copia[generic.NameObject("/Parent")] = self._ref(self._no_da_pagina(numero))
+                self._gravar_objeto(numero, copia)
+                self.pages.append(numero)
+
+                while pendentes:
+                    origem, destino_numero = pendentes.pop()
+                    obj = origem.get_object()
+                    if isinstance(obj, generic.DictionaryObject) and obj.get("/Type") in ("/Pages", "/Catalog"):
+                        obj = generic.NullObject()  # Não arrasta a árvore de páginas da origem
+                    self._gravar_objeto(destino_numero, self._traduzir(obj, traducao, pendentes))
+                    reader.resolved_objects.pop((origem.generation, origem.idnum), None)
+            return nao_copiadas
+        finally:
+            try:
+                buffer.close()
+            except BufferError:
+                pass  # Ainda referenciado; liberado junto com o reader
+
+    def finalizar(self, duravel=False):
+        """Grava árvore de páginas, catálogo, xref e trailer"""
+        generic = self.generic
+        nome = generic.NameObject
+        for numero, paginas in self.nos:
+            self._gravar_objeto(numero, generic.DictionaryObject({
+                nome("/Type"): nome("/Pages"),
+                nome("/Parent"): self._ref(self.raiz),
+                nome("/Kids"): generic.ArrayObject(self._ref(p) for p in paginas),
+                nome("/Count"): generic.NumberObject(len(paginas)),
+            }))
+        self._gravar_objeto(self.raiz, generic.DictionaryObject({
+            nome("/Type"): nome("/Pages"),
+            nome("/Kids"): generic.ArrayObject(self._ref(numero) for numero, _ in self.nos),
+            nome("/Count"): generic.NumberObject(len(self.pages)),
+        }))
+        catalogo = self._reservar()
+        self._gravar_objeto(catalogo, generic.DictionaryObject({
+            nome("/Type"): nome("/Catalog"),
+            nome("/Pages"): self._ref(self.raiz),
+        }))
+        trailer = generic.DictionaryObject({nome("/Root"): self._ref(catalogo)})
+        if self.criptografia:
+            _, identificador, dicionario = self.criptografia
+            numero = self._reservar()
+            self._gravar_objeto(numero, dicionario, criptografar=False)
+            trailer[nome("/Encrypt")] = self._ref(numero)
+            trailer[nome("/ID")] = identificador
+        trailer[nome("/Size")] = generic.NumberObject(len(self.offsets))
+
+        inicio_xref = self.destino.tell()
+        self.destino.write(f"xref\n0 {len(self.offsets)}\n0000000000 65535 f \n".encode("ascii"))
+        for inicio in range(1, len(self.offsets), 4096):
+            self.destino.write("".join(
+                f"{offset:010d} 00000 n \n" if offset is not None else "0000000000 65535 f \n"
+                for offset in self.offsets[inicio:inicio + 4096]
+            ).encode("ascii"))
+        self.destino.write(b"trailer\n")
+        trailer.write_to_stream(self.destino, None)
+        self.destino.write(f"\nstartxref\n{inicio_xref}\n%%EOF\n".encode("ascii"))
+
+        if self.arquivo:
+            self.arquivo.flush()
+            if duravel:
+                os.fsync(self.arquivo.fileno())
+
+    def close(self):
+        if self.arquivo:
+            self.arquivo.close()
+
 # -----------------------
 # Funções Juntar PDFs (com threading SEGURO)
 # -----------------------
-def merge_pdfs_thread():
-    global cancel_operation
-    cancel_operation = False
+def caminho_segmento(workspace, numero):
+    return os.path.join(workspace.get_path(), f"segmento_{numero:04d}.pdf")
+
+def gravar_segmento_duravel(merger, workspace, numero, files_count):
+    """Grava de forma durável (fsync) o segmento unido até aqui na área da operação"""
+    path = caminho_segmento(workspace, numero)
+    if isinstance(merger, UniaoStreaming):
+        # Páginas já estão no arquivo do segmento; falta o fechamento
+        merger.finalizar(duravel=True)
+    else:
+        with open(path, "wb") as f_out:
+            merger.write(f_out)
+            f_out.flush()
+            os.fsync(f_out.fileno())
+    workspace.registrar_uso(path)
+    logging.info(f"Segmento durável gravado: {os.path.basename(path)} ({files_count} arquivos)")
+    return {
+        'path': path,
+        'size': os.path.getsize(path),
+        'files_count': files_count,
+        'pages': len(merger.pages)
+    }
 
+def capturar_parametros_merge():
+    """
+    Lê a aba Juntar na thread principal e congela as opções do trabalho,
+    que pode esperar na fila enquanto o usuário prepara o próximo.
+    """
     files = merge_list.get(0, tk.END)
     if not files:
         show_message_in_main_thread("Erro", "Nenhum arquivo PDF selecionado.", "error")
-        return
+        return None
 
-    # 🔥 LOG DE AUDITORIA - INÍCIO
+    # VALIDAÇÃO DE LIMITES
+    max_arquivos = limite_arquivos_operacao()
+    if len(files) > max_arquivos:
+        show_message_in_main_thread("Erro", f"Máximo de {max_arquivos} arquivos por operação.", "error")
+        return None
+
+    resume = consumir_merge_resume(files)
     password = password_entry.get().strip()
-    log_audit_event("merge_start", files, options={
-        'pdfa': pdfa_var.get(),
-        'protected': protect_var.get() and bool(password),
-        'compress': compress_var.get(),
-        'remove_metadata': meta_var.get(),
-        'file_count': len(files)
-    })
     
     # 🔥 VALIDAÇÃO CONFLITO PDF/A vs PROTEÇÃO
     if pdfa_var.get() and protect_var.get() and password:
@@ -2382,28 +4621,24 @@ def merge_pdfs_thread():
             pdfa_var.set(False)
             show_status("Proteção mantida - PDF/A desativado", "warning")
 
-    # VALIDAÇÃO DE LIMITES
-    if len(files) > MAX_FILES_PER_OPERATION:
-        show_message_in_main_thread("Erro", f"Máximo de {MAX_FILES_PER_OPERATION} arquivos por operação.", "error")
-        return
-
     folder = merge_output_entry.get() or os.path.dirname(files[0])
     
     try:
         os.makedirs(folder, exist_ok=True)
     except Exception as e:
         show_message_in_main_thread("Erro", f"Não foi possível criar diretório:\n{folder}\n\nErro: {e}", "error")
-        return
+        return None
 
     # Validação de senha
-    password = password_entry.get().strip()
     if protect_var.get() and password:
         is_valid, msg = validate_password_strength(password)
         if not is_valid:
             show_message_in_main_thread("Senha Fraca", f"{msg}\n\nDeseja continuar mesmo assim?", "warning")
     
     custom_name = merge_filename_entry.get().strip()
-    if custom_name and custom_name != "Deixe vazio para nome automático":
+    if resume:
+        output_name = os.path.basename(resume['output_path'])
+    elif custom_name and custom_name != "Deixe vazio para nome automático":
         output_name = custom_name
         if not output_name.lower().endswith(".pdf"):
             output_name += ".pdf"
@@ -2417,44 +4652,163 @@ def merge_pdfs_thread():
                 'protected': protect_var.get() and bool(password)
             }
         )
+
+    return {
+        'files': list(files),
+        'resume': resume,
+        'password': password,
+        'protected': protect_var.get() and bool(password),
+        'compress': compress_var.get(),
+        'compress_level': compress_level.get(),
+        'pdfa': pdfa_var.get(),
+        'remove_metadata': meta_var.get(),
+        'validacao_completa': deep_validate_var.get(),
+        'folder': folder,
+        'output_name': output_name
+    }
+
+def escolher_motor_uniao(files):
+    """
+    'streaming' quando a união pelo PdfMerger (entradas residentes) não cabe na
+    memória disponível, 'grande' quando há arquivos grandes, senão 'pypdf2'
+    """
+    total_bytes = 0
+    total_paginas = 0
+    for f in files:
+        try:
+            total_bytes += os.path.getsize(f)
+            total_paginas += contar_paginas_pdf(f)
+        except Exception as e:
+            logging.debug(f"Sem contagem de páginas para {f}: {e}")
+    if not uniao_cabe_em_memoria(total_bytes, total_paginas):
+        return "streaming"
+    if any(arquivo_grande(f) for f in files):
+        return "grande"
+    return "pypdf2"
+
+def merge_pdfs_thread(params, token=None, progresso=None):
+    """Executa uma união com os parâmetros congelados; retorna True em caso de sucesso"""
+    global checkpoint_preservado
+    token = token or CancellationToken()
+
+    files = params['files']
+    resume = params['resume']
+    password = params['password']
+    protected = params['protected']
+    folder = params['folder']
+
+    # 🔥 LOG DE AUDITORIA - INÍCIO
+    log_audit_event("merge_start", files, options={
+        'pdfa': params['pdfa'],
+        'protected': protected,
+        'compress': params['compress'],
+        'remove_metadata': params['remove_metadata'],
+        'file_count': len(files)
+    })
     
-    output_path = generate_unique_filename(folder, output_name)
-    remove_meta = meta_var.get()
-    convert_pdfa = pdfa_var.get()
+    output_path = IndiceNomesSaida(folder).reservar(params['output_name'])
+    remove_meta = params['remove_metadata']
+    convert_pdfa = params['pdfa']
 
     # CALCULAR PROGRESSO REAL
     total_steps = len(files) + 3
     current_step = 0
     
-    progress_widget = None
-    if 'progress_merge' in globals():
-        progress_widget = progress_merge
+    progress_widget = progresso
+    if progress_widget:
         safe_widget_config(progress_widget, maximum=total_steps)
         safe_widget_config(progress_widget, value=current_step)
 
-    temp_files_to_cleanup = []
+    intermediarios = []
+    merger = None
+    estruturas_perdidas = []  # (arquivo, estruturas) que o motor em streaming não copia
+    motor = escolher_motor_uniao(files)
+    streaming = motor == "streaming"
+    modo_grande = motor == "grande"
+    # Uniões grandes gravam segmentos duráveis a cada MERGE_SEGMENT_SIZE arquivos,
+    # referenciados pelo checkpoint, para poderem ser retomadas após interrupção
+    usar_segmentos = not modo_grande and len(files) > MERGE_SEGMENT_SIZE
+    senha_saida = password if protected and not params['pdfa'] else None
+    protecao_aplicada = False  # Só vira True depois que a criptografia foi de fato gravada
+    if resume:
+        workspace = ScratchWorkspace.adotar(folder, resume.get('workspace'))
+        segmentos = list(resume['segments'])
+    else:
+        workspace = ScratchWorkspace(folder)
+        segmentos = []
+    workspace.preservar = usar_segmentos
+    processados = sum(seg['files_count'] for seg in segmentos)
+    current_step = processados
+    journal = None
+    if progress_widget:
+        safe_widget_config(progress_widget, value=current_step)
+
+    try:
+        # PREFLIGHT: a união ocupa um intermediário; só uma fase seguinte (compressão,
+        # PDF/A ou proteção pelo PyPDF2) grava um segundo, e os segmentos duráveis
+        # continuam em disco até o commit
+        tamanho_uniao = estimate_final_size(files, {})['maximo']
+        necessarios = tamanho_uniao
+        if params['compress'] or params['pdfa']:
+            necessarios += estimate_final_size(files, {
+                'compress': params['compress'],
+                'compress_level': params['compress_level'],
+                'pdfa': params['pdfa']
+            })['maximo']
+        elif senha_saida and motor == "pypdf2":
+            necessarios += tamanho_uniao
+        if usar_segmentos:
+            necessarios += tamanho_uniao
+        workspace.preflight(necessarios)
+
+        fingerprints = [file_fingerprint(f) for f in files] if usar_segmentos else []
+        opcoes_checkpoint = {
+            'compress': params['compress'],
+            'compress_level': params['compress_level'],
+            'pdfa': params['pdfa'],
+            'protected': protected,
+            'remove_metadata': remove_meta
+        }
 
-    try:
-        # CRIAR CHECKPOINT
-        create_operation_checkpoint("merge", [], current_step, temp_files_to_cleanup)
+        # CRIAR CHECKPOINT (o da execução interrompida é substituído pelo desta)
+        journal = CheckpointJournal(
+            "merge", files=list(files), fingerprints=fingerprints, segments=list(segmentos),
+            workspace=workspace.path, output_path=output_path, options=opcoes_checkpoint,
+            files_processed_count=processados, current_step=current_step
+        )
+        if resume and resume.get('checkpoint_file'):
+            try:
+                os.remove(resume['checkpoint_file'])
+            except OSError:
+                pass
+            logging.info(f"Retomando união a partir do arquivo {processados + 1}/{len(files)}")
         
         logging.info(f"Iniciando união de {len(files)} arquivos -> {output_path}")
         
+        # 🔥 INTERMEDIÁRIO EM MEMÓRIA (TRANSBORDA PARA DISCO SÓ SE NECESSÁRIO)
+        current = SpooledIntermediate(workspace, prefix="merge")
+        intermediarios.append(current)
+
         # FASE 1: Unir PDFs - COM BATCH PROCESSING
-        merger = PdfMerger()
+        logging.info(f"Motor da união: {motor}")
+
+        def nova_uniao():
+            if streaming and usar_segmentos:
+                return UniaoStreaming.em_arquivo(caminho_segmento(workspace, len(segmentos)), token)
+            if streaming:
+                return UniaoStreaming(ArquivoCancelavel(current, token), token, senha=senha_saida)
+            return UniaoGrande() if modo_grande else PdfMerger()
+
+        no_segmento = 0
         
         # 🔥 PROCESSAMENTO EM LOTES
-        for batch_num, batch in enumerate(process_in_batches(files, batch_size=5)):
-            if cancel_operation:
-                status_var.set("Operação cancelada.")
-                logging.info("Operação cancelada pelo usuário")
-                return
+        for batch_num, batch in enumerate(process_in_batches(files[processados:], batch_size=5, token=token)):
+            token.raise_if_cancelled()
             
             show_status(f"Processando lote {batch_num + 1}...", "info")
             
-            for idx, f in enumerate(batch):
-                if cancel_operation:
-                    return
+            for f in batch:
+                token.raise_if_cancelled()
                     
                 # VALIDAÇÃO DE SEGURANÇA
                 try:
@@ -2464,149 +4818,204 @@ def merge_pdfs_thread():
                     show_message_in_main_thread("Erro de Segurança", f"Arquivo rejeitado:\n{os.path.basename(f)}\n\nMotivo: {e}", "error")
                     return
                 
-                merger.append(f)
+                if merger is None:
+                    merger = nova_uniao()
+                perdidas = merger.append(f)
+                if streaming and perdidas:
+                    descricao = ", ".join(ESTRUTURAS_NAO_COPIADAS_STREAMING[nome] for nome in perdidas)
+                    logging.warning(f"{os.path.basename(f)}: {descricao} não serão copiados (união em streaming)")
+                    estruturas_perdidas.append(f"{os.path.basename(f)}: {descricao}")
+                processados += 1
+                no_segmento += 1
                 current_step += 1
                 if progress_widget:
                     safe_widget_config(progress_widget, value=current_step)
                 
-                create_operation_checkpoint("merge", files[:idx+1], current_step, temp_files_to_cleanup)
-                show_status(f"Unindo {idx + 1}/{len(files)}: {os.path.basename(f)}", "info")
-                root.update_idletasks()
-
-        # 🔥 ARQUIVO TEMPORÁRIO SEGURO
-        temp_output = safe_temp_file(prefix="merge", suffix=".pdf")
-        temp_files_to_cleanup.append(temp_output)
-        
-        with open(temp_output, "wb") as f_out:
-            merger.write(f_out)
+                # Fecha um segmento durável (exceto no último arquivo: ele segue direto para a saída,
+                # salvo em streaming, em que a saída é montada a partir dos segmentos)
+                if usar_segmentos and no_segmento >= MERGE_SEGMENT_SIZE and (streaming or processados < len(files)):
+                    show_status(f"Gravando segmento {len(segmentos) + 1}...", "info")
+                    segmento = gravar_segmento_duravel(merger, workspace, len(segmentos), no_segmento)
+                    segmentos.append(segmento)
+                    journal.segmento(segmento, workspace=workspace.path)
+                    merger.close()
+                    merger = None
+                    no_segmento = 0
+                
+                journal.arquivo_processado(processados, current_step)
+                show_status(f"Unindo {processados}/{len(files)}: {os.path.basename(f)}", "info")
+
+        token.raise_if_cancelled()
+
+        if streaming and usar_segmentos:
+            # O último grupo também vira segmento; a saída é montada a partir deles, em ordem
+            if merger is not None:
+                segmento = gravar_segmento_duravel(merger, workspace, len(segmentos), no_segmento)
+                segmentos.append(segmento)
+                journal.segmento(segmento, workspace=workspace.path)
+                merger.close()
+            merger = UniaoStreaming(ArquivoCancelavel(current, token), token, senha=senha_saida)
+            for numero, segmento in enumerate(segmentos, 1):
+                show_status(f"Montando saída: segmento {numero}/{len(segmentos)}...", "info")
+                merger.append(segmento['path'])
+        else:
+            if merger is None:
+                merger = nova_uniao()
+            # Segmentos duráveis entram no início, na ordem em que foram gravados
+            posicao = 0
+            for segmento in segmentos:
+                merger.merge(posicao, segmento['path'])
+                posicao += segmento['pages']
+
+        paginas_esperadas = len(merger.pages)
+        if streaming:
+            merger.finalizar()
+        else:
+            if modo_grande and senha_saida:
+                # Reler a união pelo PyPDF2 na fase 2 traria o documento inteiro para a memória
+                merger.proteger(senha_saida)
+            merger.write(ArquivoCancelavel(current, token))
         merger.close()
+        merger = None
+        current.finalizar_escrita()
+        # Streaming e pikepdf criptografam na própria gravação
+        protecao_aplicada = bool(senha_saida) and motor != "pypdf2"
         
         current_step += 1
         if progress_widget:
             safe_widget_config(progress_widget, value=current_step)
         show_status("Salvando arquivo unido...", "info")
-        root.update_idletasks()
-        
-        current_temp = temp_output
 
         # FASE 2: Proteção e metadados
-        if (not pdfa_var.get()) and protect_var.get() and password:
+        if (not params['pdfa']) and protected and motor == "pypdf2":
             current_step += 1
             if progress_widget:
                 safe_widget_config(progress_widget, value=current_step)
-            status_var.set("Aplicando proteção...")
-            root.update_idletasks()
+            show_status("Aplicando proteção...", "info")
             
             try:
-                reader = PdfReader(current_temp)
+                current.seek(0)
+                reader = PdfReader(current)
                 writer = PdfWriter()
                 
                 for page in reader.pages:
                     writer.add_page(page)
                 
-                if protect_var.get() and password:
-                    aplicar_criptografia(writer, password)
+                aplicar_criptografia(writer, password)
                 
                 if remove_meta:
                     writer.add_metadata({})
                 elif reader.metadata:
                     writer.add_metadata(reader.metadata)
                 
-                temp_protected = safe_temp_file(prefix="protected", suffix=".pdf")
-                temp_files_to_cleanup.append(temp_protected)
+                protegido_tmp = SpooledIntermediate(workspace, prefix="protected")
+                intermediarios.append(protegido_tmp)
+                writer.write(ArquivoCancelavel(protegido_tmp, token))
+                protegido_tmp.finalizar_escrita()
                 
-                with open(temp_protected, "wb") as f_out:
-                    writer.write(f_out)
-                    
-                if current_temp in temp_files_to_cleanup:
-                    temp_files_to_cleanup.remove(current_temp)
-                remove_temp_file(current_temp)
-                try:
-                    os.remove(current_temp)
-                except:
-                    pass
-                    
-                current_temp = temp_protected
+                current.close()
+                current = protegido_tmp
+                protecao_aplicada = True
                 
+            except (OperationCancelledError, SystemOverloadError):
+                # Orçamento de área temporária estourado não é falha da proteção
+                raise
             except Exception as e:
                 logging.warning(f"Falha na proteção: {e}")
                 show_message_in_main_thread("Aviso", f"Proteção falhou: {e}\n\nContinuando sem proteção.", "warning")
 
-        # FASE 3: Compressão
-        if compress_var.get() and GHOSTSCRIPT_PATH:
+        # FASE 3: Compressão (Ghostscript exige arquivos em disco)
+        if params['compress'] and GHOSTSCRIPT_PATH:
             try:
                 current_step += 1
                 if progress_widget:
                     safe_widget_config(progress_widget, value=current_step)
                 
                 show_status("Comprimindo PDF...", "info")
-                root.update_idletasks()
                 
-                temp_comprimido = safe_temp_file(prefix="compressed", suffix=".pdf")
-                temp_files_to_cleanup.append(temp_comprimido)
+                temp_comprimido = safe_temp_file(prefix="compressed", suffix=".pdf", workspace=workspace)
                 
-                nivel_compressao = compress_level.get()
-                reducao = comprimir_com_ghostscript(current_temp, temp_comprimido, nivel_compressao)
+                nivel_compressao = params['compress_level']
                 
-                if os.path.exists(temp_comprimido) and os.path.getsize(temp_comprimido) > 0:
-                    if current_temp in temp_files_to_cleanup:
-                        temp_files_to_cleanup.remove(current_temp)
-                    remove_temp_file(current_temp)
-                    try:
-                        os.remove(current_temp)
-                    except:
-                        pass
-                    
-                    current_temp = temp_comprimido
+                def progresso_compressao(feitas, total, taxa, eta):
+                    if progress_widget and total:
+                        safe_widget_config(progress_widget, maximum=total, value=min(feitas, total))
+                    total_txt = f"/{total}" if total else ""
+                    show_status(f"Comprimindo PDF: página {feitas}{total_txt} · {taxa:.1f} pág/s · "
+                                f"restante: {formatar_eta(eta)}", "info")
+                
+                try:
+                    reducao = comprimir_com_ghostscript(current.materialize(), temp_comprimido, nivel_compressao,
+                                                        progress_callback=progresso_compressao, token=token)
+                finally:
+                    if progress_widget:
+                        safe_widget_config(progress_widget, maximum=total_steps, value=current_step)
+                
+                comprimido = SpooledIntermediate.from_file(workspace, temp_comprimido, prefix="compressed")
+                intermediarios.append(comprimido)
+                comprimido.finalizar_escrita()
+                
+                if comprimido.size() > 0:
+                    current.close()
+                    current = comprimido
                     show_status(f"PDF comprimido: redução de {reducao:.1f}%", "success")
                 else:
                     logging.warning("Arquivo comprimido inválido, mantendo original")
                     show_message_in_main_thread("Aviso", "Compressão falhou - mantendo PDF original", "warning")
                     
+            except (OperationCancelledError, SystemOverloadError):
+                raise
             except Exception as e:
                 logging.warning(f"Falha na compressão: {e}")
                 show_message_in_main_thread("Aviso", f"Compressão falhou: {e}\n\nContinuando com PDF não comprimido.", "warning")
 
-        # CONCLUSÃO
-        os.replace(current_temp, output_path)
+        # CONCLUSÃO - gravação direta (em memória) ou rename atômico no volume de destino
+        token.raise_if_cancelled()
+        current.commit(output_path)
         
         show_status("Validando integridade do PDF...", "info")
-        root.update_idletasks()
         
-        is_valid, validation_msg = validate_output_pdf(output_path)
+        is_valid, validation_msg, tempos_validacao = validate_output_pdf(
+            output_path,
+            paginas_esperadas=paginas_esperadas,
+            completa=params['validacao_completa'],
+            senha=password if protecao_aplicada else None
+        )
+        logging.info(f"Validação da saída: {tempos_validacao}")
         if not is_valid:
             logging.error(f"PDF de saída inválido: {validation_msg}")
-            
-            fallback_success = False
-            if os.path.exists(current_temp):
-                try:
-                    logging.info("Tentando fallback para arquivo temporário original...")
-                    os.replace(current_temp, output_path)
-                    is_valid, validation_msg = validate_output_pdf(output_path)
-                    if is_valid:
-                        fallback_success = True
-                        logging.info("Fallback bem-sucedido!")
-                except Exception as fallback_error:
-                    logging.error(f"Falha no fallback: {fallback_error}")
-            
-            if not fallback_success:
-                try:
-                    if os.path.exists(output_path):
-                        os.remove(output_path)
-                except:
-                    pass
-                raise PDFProcessingError(f"Falha na validação do PDF de saída: {validation_msg}")
+            try:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+            except:
+                pass
+            raise PDFProcessingError(f"Falha na validação do PDF de saída: {validation_msg}")
         
         # 🔥 LOG DE AUDITORIA - SUCESSO
         tamanho_final = os.path.getsize(output_path) / 1024 / 1024
         log_audit_event("merge_success", files, options={
             'output_path': output_path,
             'final_size_mb': round(tamanho_final, 2),
-            'compression_applied': compress_var.get(),
-            'pdfa_applied': pdfa_var.get(),
-            'protection_applied': protect_var.get() and bool(password)
+            'compression_applied': params['compress'],
+            'pdfa_applied': params['pdfa'],
+            'protection_applied': protecao_aplicada,
+            'validation_mode': "completa" if params['validacao_completa'] else "estrutural",
+            'validation_ms': tempos_validacao,
+            'merge_engine': motor,
+            'structures_dropped': estruturas_perdidas
         })
         
+        if estruturas_perdidas:
+            nomes = "\n".join(f"• {item}" for item in estruturas_perdidas[:5])
+            if len(estruturas_perdidas) > 5:
+                nomes += f"\n... e mais {len(estruturas_perdidas) - 5}"
+            show_message_in_main_thread(
+                "Aviso",
+                "A união foi feita em streaming (grande demais para a memória) e estas "
+                f"estruturas das entradas não foram copiadas para a saída:\n\n{nomes}",
+                "warning"
+            )
+        
         show_status(f"PDF criado e validado: {output_path} ({tamanho_final:.1f} MB)", "success")
         logging.info(f"PDF unido criado e validado: {output_path} ({tamanho_final:.1f} MB) - {validation_msg}")
         
@@ -2619,8 +5028,12 @@ def merge_pdfs_thread():
             if result:
                 abrir_pasta_output(folder)
         
-        root.after(0, show_success_dialog)
+        bomba_ui.agendar(show_success_dialog)
+        return True
 
+    except OperationCancelledError:
+        show_status("Operação cancelada.", "warning")
+        logging.info("Operação cancelada pelo usuário")
     except Exception as e:
         # 🔥 LOG DE AUDITORIA - ERRO
         log_audit_event("merge_error", files, options={
@@ -2630,23 +5043,38 @@ def merge_pdfs_thread():
         
         logging.error(f"Falha ao unir PDFs: {e}")
         show_message_in_main_thread("Erro", f"Falha ao unir PDFs:\n{e}", "error")
-        status_var.set("Erro ao unir arquivos.")
+        show_status("Erro ao unir arquivos.", "error")
     finally:
         # LIMPEZA
-        for temp_file in temp_files_to_cleanup:
+        if merger is not None:
             try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                    remove_temp_file(temp_file)
-            except Exception as e:
-                logging.warning(f"Erro ao limpar {temp_file}: {e}")
+                merger.close()
+            except Exception:
+                pass
+        for intermediario in intermediarios:
+            intermediario.close()
         
-        cleanup_checkpoint()
-        set_ui_state(True)
-        if progress_widget:
-            safe_widget_config(progress_widget, value=0)
+        if aplicacao_encerrando and segmentos:
+            # Programa fechado no meio da união: mantém segmentos e checkpoint para retomada
+            if journal:
+                journal.fechar()
+            checkpoint_preservado = True
+            logging.info(f"União interrompida com {len(segmentos)} segmento(s) preservado(s) para retomada")
+        else:
+            if journal:
+                journal.remover()
+            workspace.preservar = False
+            workspace.cleanup()
+        # Reserva do nome que não recebeu a saída (erro, cancelamento ou retomada futura)
+        IndiceNomesSaida.liberar(output_path)
+
+# União entre o clique e o enfileiramento (hash de duplicados em segundo plano)
+verificando_merge = False
 
 def merge_pdfs(event=None):
+    global verificando_merge
+    if verificando_merge:
+        return
     if merge_list.size() == 0:
         show_message_in_main_thread("Aviso", "Nenhum arquivo adicionado.", "warning")
         return
@@ -2654,30 +5082,186 @@ def merge_pdfs(event=None):
     # VERIFICAR LIMITES ANTES DE INICIAR
     try:
         total_pages = 0
+        max_paginas = limite_total_paginas()
         for f in merge_list.get(0, tk.END):
-            reader = safe_pdf_reader(f)
-            total_pages += len(reader.pages)
-            if total_pages > MAX_TOTAL_PAGES:
-                raise SystemOverloadError(f"Limite de {MAX_TOTAL_PAGES} páginas excedido")
+            total_pages += contar_paginas_pdf(f)
+            if total_pages > max_paginas:
+                raise SystemOverloadError(f"Limite de {max_paginas} páginas excedido")
     except SystemOverloadError as e:
         show_message_in_main_thread("Limite Excedido", str(e), "error")
         return
     except Exception as e:
         logging.warning(f"Erro ao verificar limites: {e}")
     
-    set_ui_state(False)
-    if 'btn_cancel_merge' in globals():
+    # Mesmo documento com nomes diferentes (ex.: digitalizado duas vezes): o hash
+    # roda fora da thread principal; a confirmação e o enfileiramento voltam para ela
+    files = merge_list.get(0, tk.END)
+
+    def verificar_duplicados():
         try:
-            btn_cancel_merge.pack(pady=5)
-        except tk.TclError:
-            pass
-    submit_thread_task(merge_pdfs_thread)
+            duplicados = grupos_duplicados(files)
+        except Exception as e:
+            logging.warning(f"Erro ao verificar duplicados: {e}")
+            duplicados = []
+        bomba_ui.agendar(enfileirar_merge, files, duplicados)
+
+    verificando_merge = True
+    enable_submit_on_conditions()
+    show_status("Verificando duplicados...", "info")
+    threading.Thread(target=verificar_duplicados, name="JuntaPDF-hash", daemon=True).start()
+
+def enfileirar_merge(files, duplicados):
+    global verificando_merge
+    try:
+        _enfileirar_merge(files, duplicados)
+    finally:
+        verificando_merge = False
+        enable_submit_on_conditions()
+
+def _enfileirar_merge(files, duplicados):
+    if duplicados:
+        linhas = "\n".join("• " + " = ".join(os.path.basename(f) for f in grupo) for grupo in duplicados[:5])
+        if not messagebox.askyesno(
+            "Documentos Duplicados",
+            f"A lista contém documentos com conteúdo idêntico:\n\n{linhas}\n\nUnir mesmo assim?",
+            icon='warning'
+        ):
+            return
+    
+    params = capturar_parametros_merge()
+    if not params:
+        return
+    
+    descricao = f"Juntar {len(params['files'])} arquivo(s) → {params['output_name']}"
+    fila_trabalhos.enfileirar("merge", descricao,
+                              lambda trabalho: merge_pdfs_thread(params, trabalho.token, trabalho.progresso))
+    show_toast("União adicionada à fila de trabalhos")
+    atualizar_fila_ui()
+
+def cancelar_trabalho_da_aba(tipo):
+    """Cancela só o trabalho acompanhado pela barra da aba; os demais seguem na fila"""
+    trabalho_id = fila_trabalhos.em_destaque(tipo)
+    if trabalho_id is None:
+        return
+    fila_trabalhos.cancelar(trabalho_id)
+    logging.info(f"Cancelamento do trabalho #{trabalho_id} solicitado pelo usuário")
+    atualizar_fila_ui()
 
 def cancel_merge():
-    global cancel_operation
-    cancel_operation = True
-    logging.info("Cancelamento solicitado pelo usuário")
+    cancelar_trabalho_da_aba("merge")
     
+class AuditWriter:
+    """
+    Grava o log de auditoria em uma thread dedicada, alimentada por fila limitada.
+    Eventos são gravados em lote com o arquivo mantido aberto; fsync a cada
+    fsync_interval segundos e na finalização. Com a fila cheia, o evento é
+    gravado de forma síncrona para nunca ser descartado.
+    """
+
+    def __init__(self, audit_dir, fsync_interval=AUDIT_FSYNC_INTERVAL):
+        self.audit_dir = audit_dir
+        self.fsync_interval = fsync_interval
+        self.fila = queue.Queue(maxsize=AUDIT_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.arquivo = None
+        self.arquivo_path = None
+        self.pendente_fsync = False
+        self.ultimo_fsync = time.monotonic()
+        self.encerrado = False
+        self.thread = threading.Thread(target=self._run, name="JuntaPDF-audit", daemon=True)
+        self.thread.start()
+
+    def registrar(self, evento):
+        if self.encerrado:
+            self._gravar([evento], sincronizar=True)
+            return
+        try:
+            self.fila.put_nowait(evento)
+        except queue.Full:
+            logging.debug("Fila de auditoria cheia - gravação síncrona")
+            self._gravar([evento])
+
+    def _run(self):
+        while True:
+            timeout = max(0.0, self.fsync_interval - (time.monotonic() - self.ultimo_fsync))
+            try:
+                evento = self.fila.get(timeout=timeout if self.pendente_fsync else None)
+            except queue.Empty:
+                self._gravar([], sincronizar=True)
+                continue
+
+            lote = []
+            encerrar = evento is None
+            if not encerrar:
+                lote.append(evento)
+            while not encerrar and len(lote) < AUDIT_BATCH_SIZE:
+                try:
+                    evento = self.fila.get_nowait()
+                except queue.Empty:
+                    break
+                if evento is None:
+                    encerrar = True
+                else:
+                    lote.append(evento)
+
+            self._gravar(lote, sincronizar=encerrar)
+            if encerrar:
+                return
+
+    def _abrir(self):
+        """Arquivo mensal de auditoria; reaberto quando o mês muda"""
+        audit_file = os.path.join(self.audit_dir, f"audit_{time.strftime('%Y%m')}.log")
+        if audit_file != self.arquivo_path:
+            self._fechar_arquivo()
+            os.makedirs(self.audit_dir, exist_ok=True)
+            self.arquivo = open(audit_file, 'a', encoding='utf-8')
+            self.arquivo_path = audit_file
+        return self.arquivo
+
+    def _fechar_arquivo(self):
+        if self.arquivo:
+            self.arquivo.flush()
+            os.fsync(self.arquivo.fileno())
+            self.arquivo.close()
+            self.arquivo = None
+            self.arquivo_path = None
+
+    def _gravar(self, lote, sincronizar=False):
+        with self.lock:
+            try:
+                if lote:
+                    f = self._abrir()
+                    f.write(''.join(json.dumps(evento, ensure_ascii=False) + '\n' for evento in lote))
+                    f.flush()
+                    self.pendente_fsync = True
+                agora = time.monotonic()
+                if self.arquivo and self.pendente_fsync and (sincronizar or agora - self.ultimo_fsync >= self.fsync_interval):
+                    os.fsync(self.arquivo.fileno())
+                    self.pendente_fsync = False
+                    self.ultimo_fsync = agora
+            except Exception as e:
+                logging.warning(f"Erro ao gravar auditoria: {e}")
+
+    def fechar(self, timeout=5):
+        """Esvazia a fila e sincroniza o arquivo - chamado no encerramento"""
+        if self.encerrado:
+            return
+        self.encerrado = True
+        try:
+            self.fila.put(None, timeout=timeout)
+            self.thread.join(timeout)
+        except queue.Full:
+            logging.warning("Fila de auditoria não esvaziou a tempo")
+        with self.lock:
+            try:
+                self._fechar_arquivo()
+            except Exception as e:
+                logging.warning(f"Erro ao finalizar auditoria: {e}")
+
+# Salvar em arquivo separado de auditoria (não no log normal)
+audit_writer = AuditWriter(os.path.join(tempfile.gettempdir(), "JuntaPDF_Audit"))
+atexit.register(audit_writer.fechar)
+
 def log_audit_event(operation, files, user=None, options=None):
     """
     Registro de auditoria para compliance institucional
@@ -2695,14 +5279,8 @@ def log_audit_event(operation, files, user=None, options=None):
             'version': 'JuntaPDF 2.0'
         }
         
-        # Salvar em arquivo separado de auditoria (não no log normal)
-        audit_dir = os.path.join(tempfile.gettempdir(), "JuntaPDF_Audit")
-        os.makedirs(audit_dir, exist_ok=True)
-        
-        audit_file = os.path.join(audit_dir, f"audit_{time.strftime('%Y%m')}.log")
-        
-        with open(audit_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(audit_log, ensure_ascii=False) + '\n')
+        # Gravação assíncrona: o I/O fica fora do caminho crítico da operação
+        audit_writer.registrar(audit_log)
             
         logging.debug(f"Evento de auditoria registrado: {operation}")
         
@@ -2713,19 +5291,329 @@ def log_audit_event(operation, files, user=None, options=None):
 # -----------------------
 # Funções Dividir/Extrair PDFs (com threading SEGURO)
 # -----------------------
-def split_or_extract_pdfs_thread():
-    global cancel_operation
-    cancel_operation = False
-    
+# Categorias de /Resources endereçadas por nome nos content streams
+CATEGORIAS_RECURSOS = ("/Font", "/XObject", "/ExtGState", "/ColorSpace", "/Pattern", "/Shading", "/Properties")
+NOME_PDF_REGEX = re.compile(rb"/([^\s/\[\]()<>{}%]+)")
+NOME_PDF_ESCAPE_REGEX = re.compile(r"#([0-9A-Fa-f]{2})")
+
+def nomes_usados_no_conteudo(page):
+    """Nomes (/F1, /Im3...) que aparecem nos content streams da página"""
+    conteudo = page.get("/Contents")
+    if conteudo is None:
+        return set()
+    conteudo = conteudo.get_object()
+    streams = conteudo if isinstance(conteudo, list) else [conteudo]
+    nomes = set()
+    for stream in streams:
+        dados = stream.get_object().get_data()
+        for bruto in NOME_PDF_REGEX.findall(dados):
+            nome = bruto.decode("latin-1")
+            if "#" in nome:
+                nome = NOME_PDF_ESCAPE_REGEX.sub(lambda m: chr(int(m.group(1), 16)), nome)
+            nomes.add("/" + nome)
+    return nomes
+
+def pagina_com_recursos_podados(page):
+    """
+    Cópia rasa da página cujo /Resources só tem o que os content streams usam.
+    Páginas que compartilham um dicionário com dezenas de fontes e imagens
+    deixam de levá-lo inteiro para cada parte da divisão. A página original não
+    é alterada; em qualquer dúvida (ex.: Form XObject sem /Resources próprio,
+    que herda os da página) devolve a página como está.
+    """
+    generic = importar_tardio("PyPDF2.generic")
+    try:
+        recursos = page.get("/Resources")
+        if recursos is None:
+            return page
+        recursos = recursos.get_object()
+        usados = nomes_usados_no_conteudo(page)
+
+        podados = generic.DictionaryObject()
+        removidos = 0
+        for chave, valor in recursos.items():
+            if chave not in CATEGORIAS_RECURSOS:
+                podados[generic.NameObject(chave)] = valor
+                continue
+            categoria = valor.get_object()
+            if not isinstance(categoria, generic.DictionaryObject):
+                podados[generic.NameObject(chave)] = valor
+                continue
+            mantidos = generic.DictionaryObject()
+            for nome, item in categoria.items():
+                if nome in usados:
+                    mantidos[generic.NameObject(nome)] = item
+                else:
+                    removidos += 1
+            if chave == "/XObject":
+                for item in mantidos.values():
+                    xobject = item.get_object()
+                    if xobject.get("/Subtype") == "/Form" and "/Resources" not in xobject:
+                        return page
+            if mantidos:
+                podados[generic.NameObject(chave)] = mantidos
+
+        if not removidos:
+            return page
+
+        copia = type(page)(page.pdf, page.indirect_reference)
+        copia.update(page)
+        copia[generic.NameObject("/Resources")] = podados
+        return copia
+    except Exception as e:
+        logging.debug(f"Poda de recursos ignorada para a página: {e}")
+        return page
+
+def estimar_bytes_pagina(page, contabilizados):
+    """
+    Bytes que a página acrescenta a uma parte: streams (como gravados) e objetos
+    indiretos alcançáveis a partir dela que ainda não estão em `contabilizados`
+    (ids já somados na parte atual - fontes e imagens compartilhadas contam uma vez).
+    Ligações para a árvore e para outras páginas não são seguidas.
+    """
+    generic = importar_tardio("PyPDF2.generic")
+    total = SPLIT_PAGINA_OVERHEAD
+    pendentes = [page]
+    while pendentes:
+        obj = pendentes.pop()
+        if isinstance(obj, generic.IndirectObject):
+            if obj.idnum in contabilizados:
+                continue
+            contabilizados.add(obj.idnum)
+            total += SPLIT_OBJETO_OVERHEAD
+            obj = obj.get_object()
+        if isinstance(obj, generic.StreamObject):
+            total += tamanho_serializado(obj)
+        if isinstance(obj, dict):
+            pendentes.extend(valor for chave, valor in obj.items() if chave not in SPLIT_CHAVES_NAO_SEGUIDAS)
+        elif isinstance(obj, list):
+            pendentes.extend(obj)
+    return total
+
+def agrupar_paginas_por_tamanho(paginas, limite_bytes, token, estimador=estimar_bytes_pagina, podar=pagina_com_recursos_podados):
+    """
+    Intervalos [inicio, fim) de páginas consecutivas cuja soma estimada cabe no
+    limite. A estimativa é feita sobre a página já podada, como será gravada.
+    """
+    grupos = []
+    inicio = 0
+    contabilizados = set()
+    acumulado = SPLIT_ARQUIVO_OVERHEAD
+    for indice, page in enumerate(paginas):
+        token.raise_if_cancelled()
+        page = podar(page)
+        tamanho = estimador(page, contabilizados)
+        if indice > inicio and acumulado + tamanho > limite_bytes:
+            grupos.append((inicio, indice))
+            inicio = indice
+            # A página abre uma parte nova: recontabiliza sem os objetos da anterior
+            contabilizados = set()
+            tamanho = estimador(page, contabilizados)
+            acumulado = SPLIT_ARQUIVO_OVERHEAD
+        acumulado += tamanho
+    if inicio < len(paginas):
+        grupos.append((inicio, len(paginas)))
+    return grupos
+
+def gravar_paginas_parte(origem, inicio, fim, output_path, token):
+    """Grava as páginas [inicio, fim) da origem numa parte (redivisão de partes já gravadas)"""
+    indices = range(inicio, fim)
+    try:
+        with open(output_path, "wb") as f_out:
+            destino = ArquivoCancelavel(f_out, token)
+            if arquivo_grande(origem):
+                with abrir_pdf_grande(origem) as pdf:
+                    if not parte_grande_cabe_em_memoria(pdf, indices, token):
+                        EscritorStreaming(origem, indices, token).write(destino)
+                        return
+                    writer = EscritorGrande()
+                    for indice in indices:
+                        writer.add_page(pdf.pages[indice])
+                    writer.write(destino)
+            else:
+                reader = safe_pdf_reader(origem)
+                writer = PdfWriter()
+                for indice in indices:
+                    writer.add_page(pagina_com_recursos_podados(reader.pages[indice]))
+                writer.write(destino)
+    except BaseException:
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+        raise
+
+class SaidaParte:
+    """
+    Destino da serialização de uma parte: acumula em memória até `limite` bytes;
+    passando disso, descarrega o acumulado no arquivo final e segue gravando direto.
+    """
+    def __init__(self, output_path, limite):
+        self.output_path = output_path
+        self.limite = limite
+        self.buffer = io.BytesIO()
+        self.arquivo = None
+
+    @property
+    def direta(self):
+        return self.arquivo is not None
+
+    def write(self, data):
+        if self.arquivo is None and self.buffer.tell() + len(data) > self.limite:
+            self.arquivo = open(self.output_path, "wb")
+            with self.buffer.getbuffer() as acumulado:
+                self.arquivo.write(acumulado)
+            self.buffer.close()
+        if self.arquivo is not None:
+            return self.arquivo.write(data)
+        return self.buffer.write(data)
+
+    def tell(self):
+        return self.arquivo.tell() if self.arquivo is not None else self.buffer.tell()
+
+    def close(self):
+        if self.arquivo is not None:
+            self.arquivo.close()
+
+class GravadorPartes:
+    """
+    Pipeline de gravação da divisão: a thread do trabalho serializa cada parte
+    em memória (CPU) e segue montando a próxima enquanto um pool pequeno grava
+    as anteriores no destino (E/S, geralmente rede). O total de bytes aguardando
+    gravação é limitado; ao atingir o limite, a montagem espera. Partes maiores
+    que o limite e partes de arquivos grandes (EscritorGrande) são gravadas
+    direto pela thread do trabalho, sem buffer.
+    """
+    def __init__(self, token, gravadores=SPLIT_GRAVADORES, limite_bytes=SPLIT_BUFFER_MAX):
+        self.token = token
+        self.limite_bytes = limite_bytes
+        self.bytes_pendentes = 0
+        self.condicao = threading.Condition()
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=gravadores, thread_name_prefix="JuntaPDF-gravacao")
+        self.futuros = set()  # Só gravações ainda não concluídas
+        self.falha = None  # Primeira exceção de uma gravação do pool
+
+    def serializar(self, writer):
+        """Serializa a parte em memória (permite medir antes de decidir gravar)"""
+        buffer = io.BytesIO()
+        writer.write(ArquivoCancelavel(buffer, self.token))
+        return buffer
+
+    def enviar(self, writer, output_path, buffer=None):
+        """Serializa a parte e a entrega ao pool; falhas de gravações anteriores aparecem aqui"""
+        self._verificar_falhas()
+        if buffer is None and getattr(writer, 'gravacao_direta', False):
+            self._gravar_direto(writer, output_path)
+            return
+        if buffer is None:
+            buffer = self._serializar_ate_limite(writer, output_path)
+            if buffer is None:
+                return
+        tamanho = buffer.tell()
+        if tamanho > self.limite_bytes:
+            # Já serializada (modo tamanho) mas acima do limite: não entra na fila
+            self._gravar(buffer, output_path, 0)
+            return
+
+        with self.condicao:
+            # Uma parte cabe sempre no limite; espera só enquanto outras ocupam o espaço
+            while self.bytes_pendentes and self.bytes_pendentes + tamanho > self.limite_bytes:
+                self.token.raise_if_cancelled()
+                self.condicao.wait(0.2)
+            self.bytes_pendentes += tamanho
+        futuro = self.pool.submit(self._gravar, buffer, output_path, tamanho)
+        with self.condicao:
+            self.futuros.add(futuro)
+        futuro.add_done_callback(self._gravacao_concluida)
+
+    def _gravacao_concluida(self, futuro):
+        with self.condicao:
+            self.futuros.discard(futuro)
+            if self.falha is None and not futuro.cancelled() and futuro.exception():
+                self.falha = futuro.exception()
+
+    def _gravar(self, buffer, output_path, tamanho):
+        try:
+            self.token.raise_if_cancelled()
+            with open(output_path, "wb") as f_out:
+                f_out.write(buffer.getbuffer())
+        except BaseException:
+            # Não deixa parte incompleta (nem a reserva vazia) no destino
+            try:
+                os.remove(output_path)
+            except OSError:
+                pass
+            raise
+        finally:
+            buffer.close()
+            with self.condicao:
+                self.bytes_pendentes -= tamanho
+                self.condicao.notify_all()
+
+    def _serializar_ate_limite(self, writer, output_path):
+        """Buffer da parte, ou None se ela passou do limite e já foi gravada direto no destino"""
+        saida = SaidaParte(output_path, self.limite_bytes)
+        try:
+            writer.write(ArquivoCancelavel(saida, self.token))
+        except BaseException:
+            saida.close()
+            if saida.direta:
+                try:
+                    os.remove(output_path)
+                except OSError:
+                    pass
+            raise
+        if saida.direta:
+            saida.close()
+            return None
+        return saida.buffer
+
+    def _gravar_direto(self, writer, output_path):
+        """Grava na thread do trabalho, em streaming até o destino"""
+        try:
+            with open(output_path, "wb") as f_out:
+                writer.write(ArquivoCancelavel(f_out, self.token))
+        except BaseException:
+            try:
+                os.remove(output_path)
+            except OSError:
+                pass
+            raise
+
+    def _verificar_falhas(self):
+        with self.condicao:
+            falha = self.falha
+        if falha is not None:
+            raise falha
+
+    def _pendentes(self):
+        with self.condicao:
+            return list(self.futuros)
+
+    def concluir(self):
+        """Espera todas as gravações; relança a primeira falha"""
+        concurrent.futures.wait(self._pendentes())
+        self._verificar_falhas()
+        self.token.raise_if_cancelled()
+
+    def encerrar(self):
+        """Descarta o que não começou a ser gravado e libera o pool"""
+        for futuro in self._pendentes():
+            futuro.cancel()
+        self.pool.shutdown(wait=True)
+
+def capturar_parametros_split():
+    """Lê a aba Dividir na thread principal e congela as opções do trabalho"""
     files = split_list.get(0, tk.END)
     if not files:
         show_message_in_main_thread("Erro", "Nenhum arquivo PDF selecionado.", "error")
-        return
+        return None
 
     # VALIDAÇÃO DE LIMITES
-    if len(files) > MAX_FILES_PER_OPERATION:
-        show_message_in_main_thread("Erro", f"Máximo de {MAX_FILES_PER_OPERATION} arquivos por operação.", "error")
-        return
+    max_arquivos = limite_arquivos_operacao()
+    if len(files) > max_arquivos:
+        show_message_in_main_thread("Erro", f"Máximo de {max_arquivos} arquivos por operação.", "error")
+        return None
 
     folder = split_output_entry.get() or os.path.dirname(files[0])
     
@@ -2734,17 +5622,24 @@ def split_or_extract_pdfs_thread():
         os.makedirs(folder, exist_ok=True)
     except Exception as e:
         show_message_in_main_thread("Erro", f"Não foi possível criar diretório:\n{folder}\n\nErro: {e}", "error")
-        return
+        return None
 
     # DETECTAR MODO DE DIVISÃO
     split_mode = split_mode_var.get()
+    params = {
+        'files': list(files),
+        'folder': folder,
+        'split_mode': split_mode,
+        'convert_pdfa': pdfa_var_split.get()
+    }
     
     # VALIDAÇÕES POR MODO
     if split_mode == "extract":
         page_ranges_input = split_pages_entry.get().strip()
         if not page_ranges_input:
             show_message_in_main_thread("Erro", "Especifique os intervalos de páginas.", "error")
-            return
+            return None
+        params['page_ranges'] = page_ranges_input
     
     elif split_mode == "interval":
         try:
@@ -2753,7 +5648,8 @@ def split_or_extract_pdfs_thread():
                 raise ValueError
         except ValueError:
             show_message_in_main_thread("Erro", "Intervalo deve ser um número inteiro maior que 0.", "error")
-            return
+            return None
+        params['interval'] = interval
     
     elif split_mode == "parts":
         try:
@@ -2762,179 +5658,342 @@ def split_or_extract_pdfs_thread():
                 raise ValueError
         except ValueError:
             show_message_in_main_thread("Erro", "Número de partes deve ser um inteiro maior que 0.", "error")
-            return
+            return None
+        params['parts'] = parts
+    
+    elif split_mode == "size":
+        try:
+            max_mb = float(split_size_var.get().replace(",", "."))
+            if max_mb <= 0:
+                raise ValueError
+        except ValueError:
+            show_message_in_main_thread("Erro", "Tamanho máximo deve ser um número de MB maior que 0.", "error")
+            return None
+        params['max_bytes'] = int(max_mb * 1024 * 1024)
+
+    return params
 
-    convert_pdfa = pdfa_var_split.get()
+def split_or_extract_pdfs_thread(params, token=None, progresso=None):
+    """Executa uma divisão/extração com os parâmetros congelados; retorna True em caso de sucesso"""
+    token = token or CancellationToken()
+
+    files = params['files']
+    folder = params['folder']
+    split_mode = params['split_mode']
+    convert_pdfa = params['convert_pdfa']
+    progress_widget = progresso
+    gravador = None
+    reservas = []
+    abertos = []
 
     try:
         # CALCULAR TOTAL DE ETAPAS
         total_pages_to_process = 0
         for f in files:
             try:
-                total_pages_to_process += len(safe_pdf_reader(f).pages)
+                total_pages_to_process += contar_paginas_pdf(f)
             except:
                 pass
 
         # VERIFICAR LIMITE TOTAL
-        if total_pages_to_process > MAX_TOTAL_PAGES:
-            raise SystemOverloadError(f"Limite de {MAX_TOTAL_PAGES} páginas excedido")
+        max_paginas = limite_total_paginas()
+        if total_pages_to_process > max_paginas:
+            raise SystemOverloadError(f"Limite de {max_paginas} páginas excedido")
 
-        extra_steps = 2 if pdfa_var_split.get() and PDFA_AVAILABLE else 1
-        total_steps = total_pages_to_process + extra_steps
+        total_steps = total_pages_to_process + 1
         
         # Usar safe_widget_config para progressbar
-        progress_widget = None
-        if 'progress_split' in globals():
-            progress_widget = progress_split
+        if progress_widget:
             safe_widget_config(progress_widget, maximum=max(1, total_steps))
             safe_widget_config(progress_widget, value=0)
-        else:
-            logging.warning("Progressbar split não disponível")
 
         current_step = 0
+        arquivos_gerados = []
+        paginas_acima_limite = []
+        partes_tamanho = {}  # Modo tamanho: parte -> (origem, início, fim, prefixo do nome)
+        nomes_saida = IndiceNomesSaida(folder)
+        gravador = GravadorPartes(token)
 
         logging.info(f"Iniciando divisão de {len(files)} arquivos (modo: {split_mode}) -> {folder}")
 
         for file_idx, f in enumerate(files):
-            if cancel_operation:
-                status_var.set("Operação cancelada.")
-                logging.info("Operação cancelada pelo usuário")
-                return
+            token.raise_if_cancelled()
             
-            # VALIDAÇÃO DE SEGURANÇA
+            # VALIDAÇÃO DE SEGURANÇA (mesma leitura do parse)
+            grande = arquivo_grande(f)
             try:
-                validate_file_security(f)
+                if grande:
+                    validate_file_security(f)
+                    reader = abrir_pdf_grande(f)
+                    abertos.append(reader)
+                else:
+                    reader = safe_pdf_reader(f)
             except SecurityError as e:
                 logging.error(f"Arquivo rejeitado por segurança: {f} - {e}")
                 continue
             
-            reader = safe_pdf_reader(f)
+            # Arquivos grandes: partes montadas pelo qpdf, que também poda os recursos
+            if grande:
+                logging.info(f"{os.path.basename(f)}: modo de arquivos grandes (pikepdf, acesso sob demanda)")
+                novo_escritor, podar, estimador = EscritorGrande, (lambda page: page), estimar_bytes_pagina_grande
+            else:
+                novo_escritor, podar, estimador = PdfWriter, pagina_com_recursos_podados, estimar_bytes_pagina
+            
             total_pages_file = len(reader.pages)
             base_name = os.path.splitext(os.path.basename(f))[0]
 
+            def montar_parte(indices):
+                """Escritor com as páginas `indices` (base 0); partes grandes demais seguem página a página"""
+                if grande and not parte_grande_cabe_em_memoria(reader, indices, token):
+                    logging.info(f"{os.path.basename(f)}: parte de {len(indices)} páginas excede a memória - gravação página a página")
+                    return EscritorStreaming(f, indices, token)
+                writer = novo_escritor()
+                for page_idx in indices:
+                    token.raise_if_cancelled()
+                    writer.add_page(podar(reader.pages[page_idx]))
+                return writer
+
             # ===== MODO 1: EXTRAIR PÁGINAS ESPECÍFICAS =====
             if split_mode == "extract":
-                page_ranges_input = split_pages_entry.get().strip()
+                page_ranges_input = params['page_ranges']
                 pages_to_extract = parse_page_ranges(page_ranges_input, total_pages_file)
                 
-                writer = PdfWriter()
-                for page_idx, page_num in enumerate(pages_to_extract):
-                    if cancel_operation:
-                        return
-                    
-                    writer.add_page(reader.pages[page_num - 1])
-                    current_step += 1
-                    if progress_widget:
-                        safe_widget_config(progress_widget, value=current_step)
-                    show_status(f"Extraindo {file_idx+1}/{len(files)} - Página {page_idx+1}/{len(pages_to_extract)}", "info")
-                    root.update_idletasks()
+                show_status(f"Extraindo {file_idx+1}/{len(files)} - {len(pages_to_extract)} páginas", "info")
+                writer = montar_parte([page_num - 1 for page_num in pages_to_extract])
+                current_step += len(pages_to_extract)
+                if progress_widget:
+                    safe_widget_config(progress_widget, value=current_step)
 
                 output_name = get_default_output_name("extract", [f], page_ranges=page_ranges_input)
-                output_path = generate_unique_filename(folder, output_name)
+                output_path = nomes_saida.reservar(output_name)
+                reservas.append(output_path)
                 
-                with open(output_path, "wb") as f_out:
-                    writer.write(f_out)
+                gravador.enviar(writer, output_path)
+                arquivos_gerados.append(output_path)
 
             # ===== MODO 2: DIVIDIR POR INTERVALO =====
             elif split_mode == "interval":
-                interval = int(split_interval_var.get())
+                interval = params['interval']
                 part_num = 1
                 
                 for start_page in range(0, total_pages_file, interval):
-                    if cancel_operation:
-                        return
+                    token.raise_if_cancelled()
                     
-                    writer = PdfWriter()
                     end_page = min(start_page + interval, total_pages_file)
-                    
-                    for page_idx in range(start_page, end_page):
-                        writer.add_page(reader.pages[page_idx])
-                        current_step += 1
-                        if progress_widget:
-                            safe_widget_config(progress_widget, value=current_step)
-                        root.update_idletasks()
+                    writer = montar_parte(range(start_page, end_page))
+                    current_step += end_page - start_page
+                    if progress_widget:
+                        safe_widget_config(progress_widget, value=current_step)
                     
                     output_name = f"{base_name}_parte_{part_num:02d}_pag_{start_page+1}-{end_page}.pdf"
-                    output_path = generate_unique_filename(folder, output_name)
+                    output_path = nomes_saida.reservar(output_name)
+                    reservas.append(output_path)
                     
-                    with open(output_path, "wb") as f_out:
-                        writer.write(f_out)
+                    gravador.enviar(writer, output_path)
+                    arquivos_gerados.append(output_path)
                     
                     show_status(f"Dividindo {file_idx+1}/{len(files)} - Parte {part_num} (páginas {start_page+1}-{end_page})", "info")
                     part_num += 1
 
             # ===== MODO 3: DIVIDIR EM X PARTES =====
             elif split_mode == "parts":
-                num_parts = int(split_parts_var.get())
+                num_parts = params['parts']
                 pages_per_part = total_pages_file // num_parts
                 remainder = total_pages_file % num_parts
                 
                 current_page = 0
                 for part_num in range(1, num_parts + 1):
-                    if cancel_operation:
-                        return
-                    
-                    writer = PdfWriter()
+                    token.raise_if_cancelled()
                     
                     # Distribui páginas extras nas primeiras partes
                     part_size = pages_per_part + (1 if part_num <= remainder else 0)
                     end_page = current_page + part_size
                     
-                    for page_idx in range(current_page, end_page):
-                        writer.add_page(reader.pages[page_idx])
-                        current_step += 1
-                        if progress_widget:
-                            safe_widget_config(progress_widget, value=current_step)
-                        root.update_idletasks()
+                    writer = montar_parte(range(current_page, end_page))
+                    current_step += part_size
+                    if progress_widget:
+                        safe_widget_config(progress_widget, value=current_step)
                     
                     output_name = f"{base_name}_parte_{part_num:02d}_de_{num_parts:02d}_pag_{current_page+1}-{end_page}.pdf"
-                    output_path = generate_unique_filename(folder, output_name)
+                    output_path = nomes_saida.reservar(output_name)
+                    reservas.append(output_path)
                     
-                    with open(output_path, "wb") as f_out:
-                        writer.write(f_out)
+                    gravador.enviar(writer, output_path)
+                    arquivos_gerados.append(output_path)
                     
                     show_status(f"Dividindo {file_idx+1}/{len(files)} - Parte {part_num}/{num_parts}", "info")
                     current_page = end_page
 
+            # ===== MODO 5: DIVIDIR POR TAMANHO MÁXIMO =====
+            elif split_mode == "size":
+                limite = params['max_bytes']
+                # Estimativa incremental por página; só partes que estourarem o limite
+                # depois de serializadas são divididas ao meio e remontadas
+                pendentes = collections.deque(agrupar_paginas_por_tamanho(reader.pages, limite, token, estimador, podar))
+                part_num = 1
+                
+                while pendentes:
+                    token.raise_if_cancelled()
+                    inicio, fim = pendentes.popleft()
+                    
+                    writer = novo_escritor()
+                    for page_idx in range(inicio, fim):
+                        writer.add_page(podar(reader.pages[page_idx]))
+                    buffer = gravador.serializar(writer)
+                    
+                    if buffer.tell() > limite:
+                        if fim - inicio > 1:
+                            meio = (inicio + fim) // 2
+                            pendentes.appendleft((meio, fim))
+                            pendentes.appendleft((inicio, meio))
+                            logging.debug(f"Parte {inicio+1}-{fim} excedeu {limite} bytes; dividindo ao meio")
+                            continue
+                        paginas_acima_limite.append(f"{os.path.basename(f)} p. {inicio+1}")
+                        logging.warning(f"Página {inicio+1} de {f} sozinha excede o tamanho máximo")
+                    
+                    output_name = f"{base_name}_parte_{part_num:02d}_pag_{inicio+1}-{fim}.pdf"
+                    output_path = nomes_saida.reservar(output_name)
+                    reservas.append(output_path)
+                    
+                    gravador.enviar(writer, output_path, buffer)
+                    arquivos_gerados.append(output_path)
+                    partes_tamanho[output_path] = (f, inicio, fim, f"{base_name}_parte_{part_num:02d}")
+                    
+                    current_step += fim - inicio
+                    if progress_widget:
+                        safe_widget_config(progress_widget, value=current_step)
+                    show_status(f"Dividindo {file_idx+1}/{len(files)} - Parte {part_num} (páginas {inicio+1}-{fim})", "info")
+                    part_num += 1
+
             # ===== MODO 4: DIVIDIR TODAS AS PÁGINAS (AGORA EM ÚLTIMO) =====
             elif split_mode == "all":
                 for i, page in enumerate(reader.pages):
-                    if cancel_operation:
-                        return
+                    token.raise_if_cancelled()
                     
-                    writer = PdfWriter()
-                    writer.add_page(page)
+                    writer = novo_escritor()
+                    writer.add_page(podar(page))
                     
                     output_name = f"{base_name}_pagina_{i+1:03d}_de_{total_pages_file:03d}.pdf"
-                    output_path = generate_unique_filename(folder, output_name)
+                    output_path = nomes_saida.reservar(output_name)
+                    reservas.append(output_path)
                     
-                    with open(output_path, "wb") as f_out:
-                        writer.write(f_out)
+                    gravador.enviar(writer, output_path)
+                    arquivos_gerados.append(output_path)
 
                     current_step += 1
                     if progress_widget:
                         safe_widget_config(progress_widget, value=current_step)
                     show_status(f"Processando {file_idx+1}/{len(files)} - Página {i+1}/{total_pages_file}", "info")
-                    root.update_idletasks()
+
+            if grande:
+                reader.close()
+                abertos.remove(reader)
+
+        # Partes ainda em gravação precisam estar no disco antes do PDF/A e da conclusão
+        show_status("Gravando partes restantes...", "info")
+        gravador.concluir()
+
+        # CONVERSÃO PDF/A DAS PARTES - POOL LIMITADO DE PROCESSOS GHOSTSCRIPT
+        falhas_pdfa = []
+        if convert_pdfa and PDFA_AVAILABLE and arquivos_gerados:
+            base_step = current_step
+            total_steps = base_step + len(arquivos_gerados) + 1
+            if progress_widget:
+                safe_widget_config(progress_widget, maximum=total_steps)
+
+            def on_parte_pdfa(concluidas, total, parte):
+                if progress_widget:
+                    safe_widget_config(progress_widget, value=base_step + concluidas)
+                show_status(f"PDF/A {concluidas}/{total}: {os.path.basename(parte)}", "info")
+
+            falhas_pdfa = converter_partes_pdfa(arquivos_gerados, on_parte_concluida=on_parte_pdfa, token=token)
+
+            # Modo tamanho: a conversão muda o tamanho das partes (fontes embutidas, perfil ICC).
+            # As que passaram do limite são redivididas ao meio a partir da origem e convertidas de novo
+            limite = params.get('max_bytes')
+            sem_pdfa = {parte for parte, _ in falhas_pdfa}
+            excedentes = [parte for parte in partes_tamanho if parte not in sem_pdfa and os.path.getsize(parte) > limite]
+            while excedentes:
+                token.raise_if_cancelled()
+                novas = []
+                for parte in excedentes:
+                    origem, inicio, fim, prefixo = partes_tamanho.pop(parte)
+                    if fim - inicio < 2:
+                        pagina = f"{os.path.basename(origem)} p. {inicio+1}"
+                        if pagina not in paginas_acima_limite:
+                            paginas_acima_limite.append(pagina)
+                        continue
+                    logging.debug(f"{os.path.basename(parte)} excedeu {limite} bytes após o PDF/A; dividindo ao meio")
+                    os.remove(parte)
+                    arquivos_gerados.remove(parte)
+                    meio = (inicio + fim) // 2
+                    for sufixo, (de, ate) in zip("ab", ((inicio, meio), (meio, fim))):
+                        output_path = nomes_saida.reservar(f"{prefixo}{sufixo}_pag_{de+1}-{ate}.pdf")
+                        reservas.append(output_path)
+                        gravar_paginas_parte(origem, de, ate, output_path, token)
+                        partes_tamanho[output_path] = (origem, de, ate, prefixo + sufixo)
+                        arquivos_gerados.append(output_path)
+                        novas.append(output_path)
+                if not novas:
+                    break
+                show_status(f"Redividindo {len(novas)} parte(s) acima do limite após o PDF/A...", "info")
+                falhas_novas = converter_partes_pdfa(novas, token=token)
+                falhas_pdfa += falhas_novas
+                sem_pdfa = {parte for parte, _ in falhas_novas}
+                excedentes = [parte for parte in novas if parte not in sem_pdfa and os.path.getsize(parte) > limite]
 
         # CONCLUSÃO
         if progress_widget:
             safe_widget_config(progress_widget, value=total_steps)
-        show_status("Operação concluída!", "success")
-        logging.info("Operação de divisão concluída com sucesso")
-        show_message_in_main_thread("Sucesso", "Operação concluída!", "info")
+
+        if paginas_acima_limite:
+            nomes = "\n".join(f"• {pagina}" for pagina in paginas_acima_limite[:5])
+            if len(paginas_acima_limite) > 5:
+                nomes += f"\n... e mais {len(paginas_acima_limite) - 5}"
+            show_message_in_main_thread(
+                "Páginas Acima do Limite",
+                f"{len(paginas_acima_limite)} página(s) sozinha(s) já excedem o tamanho máximo "
+                f"e foram gravadas em partes próprias:\n\n{nomes}",
+                "warning"
+            )
+
+        if falhas_pdfa:
+            nomes = "\n".join(f"• {os.path.basename(parte)}" for parte, _ in falhas_pdfa[:5])
+            if len(falhas_pdfa) > 5:
+                nomes += f"\n... e mais {len(falhas_pdfa) - 5}"
+            show_status(f"Operação concluída - {len(falhas_pdfa)} parte(s) sem PDF/A", "warning")
+            logging.warning(f"Divisão concluída com {len(falhas_pdfa)} falha(s) de conversão PDF/A")
+            show_message_in_main_thread(
+                "Concluído com Avisos",
+                f"Operação concluída, mas {len(falhas_pdfa)} parte(s) não puderam ser "
+                f"convertidas para PDF/A e foram mantidas no formato original:\n\n{nomes}",
+                "warning"
+            )
+        else:
+            show_status("Operação concluída!", "success")
+            logging.info("Operação de divisão concluída com sucesso")
+            show_message_in_main_thread("Sucesso", "Operação concluída!", "info")
+        return True
         
+    except OperationCancelledError:
+        show_status("Operação cancelada.", "warning")
+        logging.info("Operação cancelada pelo usuário")
     except (ValueError, SystemOverloadError) as e:
         logging.error(f"Erro na divisão: {e}")
         show_message_in_main_thread("Erro", str(e), "error")
     except Exception as e:
         logging.error(f"Falha ao processar PDFs: {e}")
         show_message_in_main_thread("Erro", f"Falha ao processar PDFs:\n{e}", "error")
-        status_var.set("Erro ao processar arquivos.")
+        show_status("Erro ao processar arquivos.", "error")
     finally:
-        set_ui_state(True)
-        if progress_widget:
-            root.after(300, lambda: safe_widget_config(progress_widget, value=0))
+        if gravador:
+            gravador.encerrar()
+        for documento in abertos:
+            documento.close()
+        # Reservas de partes que não chegaram a ser gravadas
+        for reserva in reservas:
+            IndiceNomesSaida.liberar(reserva)
+    return False
 
 def split_or_extract_pdfs(event=None):
     if split_list.size() == 0:
@@ -2944,29 +6003,29 @@ def split_or_extract_pdfs(event=None):
     # VERIFICAR LIMITES ANTES DE INICIAR
     try:
         total_pages = 0
+        max_paginas = limite_total_paginas()
         for f in split_list.get(0, tk.END):
-            reader = safe_pdf_reader(f)
-            total_pages += len(reader.pages)
-            if total_pages > MAX_TOTAL_PAGES:
-                raise SystemOverloadError(f"Limite de {MAX_TOTAL_PAGES} páginas excedido")
+            total_pages += contar_paginas_pdf(f)
+            if total_pages > max_paginas:
+                raise SystemOverloadError(f"Limite de {max_paginas} páginas excedido")
     except SystemOverloadError as e:
         show_message_in_main_thread("Limite Excedido", str(e), "error")
         return
     except Exception as e:
         logging.warning(f"Erro ao verificar limites: {e}")
     
-    set_ui_state(False)
-    if 'btn_cancel_split' in globals():
-        try:
-            btn_cancel_split.pack(pady=5)
-        except tk.TclError:
-            pass
-    submit_thread_task(split_or_extract_pdfs_thread)
+    params = capturar_parametros_split()
+    if not params:
+        return
+    
+    descricao = f"Dividir {len(params['files'])} arquivo(s) (modo: {params['split_mode']})"
+    fila_trabalhos.enfileirar("split", descricao,
+                              lambda trabalho: split_or_extract_pdfs_thread(params, trabalho.token, trabalho.progresso))
+    show_toast("Divisão adicionada à fila de trabalhos")
+    atualizar_fila_ui()
 
 def cancel_split():
-    global cancel_operation
-    cancel_operation = True
-    logging.info("Cancelamento solicitado pelo usuário")
+    cancelar_trabalho_da_aba("split")
 
 # -----------------------
 # Abrir PDF com duplo clique
@@ -2999,48 +6058,50 @@ def drop(event, listbox, files_var, pages_var, size_var):
         return
         
     dropped = root.tk.splitlist(event.data)
-    added = 0
-    invalid = []
     
     # Verificar limite de arquivos
     current_count = listbox.size()
-    if current_count + len(dropped) > MAX_FILES_PER_OPERATION:
+    max_arquivos = limite_arquivos_operacao()
+    if current_count + len(dropped) > max_arquivos:
         show_message_in_main_thread(
             "Limite Excedido", 
-            f"Máximo de {MAX_FILES_PER_OPERATION} arquivos por operação.\n"
+            f"Máximo de {max_arquivos} arquivos por operação.\n"
             f"Atualmente: {current_count}, tentando adicionar: {len(dropped)}",
             "warning"
         )
-        dropped = dropped[:MAX_FILES_PER_OPERATION - current_count]
-    
-    for f in dropped:
-        if f.lower().endswith(".pdf") and f not in listbox.get(0, tk.END):
-            is_valid, error = validate_pdf(f)
-            if is_valid:
-                listbox.insert(tk.END, f)
-                added += 1
-                logging.info(f"Arquivo adicionado via drag & drop: {os.path.basename(f)}")
-            else:
-                invalid.append((os.path.basename(f), error))
-                logging.warning(f"Arquivo inválido via drag & drop: {os.path.basename(f)}")
-    
-    if invalid:
+        dropped = dropped[:max_arquivos - current_count]
+    
+    existentes = listbox.get(0, tk.END)
+    candidatos = [f for f in dropped if f.lower().endswith(".pdf") and f not in existentes]
+    
+    def ao_adicionar(inseridos):
+        for f in inseridos:
+            logging.info(f"Arquivo adicionado via drag & drop: {os.path.basename(f)}")
+        if inseridos:
+            status_var.set(f"{len(inseridos)} arquivo(s) adicionados via arrastar/soltar.")
+            show_toast(f"{len(inseridos)} arquivo(s) adicionados.")
+            update_stats(listbox, files_var, pages_var, size_var)
+        enable_submit_on_conditions()
+
+    def ao_rejeitar(invalid):
+        for f, _ in invalid:
+            logging.warning(f"Arquivo inválido via drag & drop: {os.path.basename(f)}")
         error_msg = "PDFs inválidos:\n\n"
-        for name, err in invalid[:3]:
-            error_msg += f"• {name}\n"
+        for f, _ in invalid[:3]:
+            error_msg += f"• {os.path.basename(f)}\n"
         if len(invalid) > 3:
             error_msg += f"... e mais {len(invalid) - 3}"
         show_message_in_main_thread("Aviso", error_msg, "warning")
-    
-    if added > 0:
-        status_var.set(f"{added} arquivo(s) adicionados via arrastar/soltar.")
-        show_toast(f"{added} arquivo(s) adicionados.")
-        update_stats(listbox, files_var, pages_var, size_var)
+
+    adicionar_sem_duplicados(listbox, candidatos, ao_adicionar, ao_rejeitar)
 def on_closing():
     """Função para fechar o programa corretamente"""
-    global cancel_operation
-    cancel_operation = True
+    global aplicacao_encerrando
+    aplicacao_encerrando = True
+    cancelar_operacao()
+    kill_ghostscript_processes()
     cleanup_temp_files()
+    audit_writer.fechar()
     root.quit()
     root.destroy()
 # =============================================================================
@@ -3302,9 +6363,10 @@ pdfa_check = ttk.Checkbutton(frame_opts_merge, text="Converter para PDF/A-2B", v
 pdfa_check.grid(row=0, column=0, sticky="w", padx=10, pady=3)
 
 # TEXTO EXPLICATIVO DO PDF/A (como você gostava)
+TEXTO_PDFA_MERGE = "Formato PDF/A-2B recomendado para o Sistema Eletrônico de Informações (SEI) do Governo Federal"
 pdfa_info_label = ttk.Label(
     frame_opts_merge,
-    text="Formato PDF/A-2B recomendado para o Sistema Eletrônico de Informações (SEI) do Governo Federal",
+    text=TEXTO_PDFA_MERGE,
     foreground="darkgreen",
     font=("Segoe UI", 8)
 )
@@ -3336,6 +6398,11 @@ compress_combo.config(state="disabled")
 meta_check = ttk.Checkbutton(frame_opts_merge, text="Remover metadados", variable=meta_var)
 meta_check.grid(row=2, column=2, sticky="w", padx=20, pady=3)
 
+# Linha 4: Validação da saída
+deep_validate_check = ttk.Checkbutton(frame_opts_merge, text="Validação completa da saída (lenta em arquivos grandes)",
+                                      variable=deep_validate_var)
+deep_validate_check.grid(row=3, column=0, columnspan=3, sticky="w", padx=10, pady=3)
+
 # Info PDF/A se não disponível
 if not PDFA_AVAILABLE:
     pdfa_check.config(state="disabled")
@@ -3477,6 +6544,24 @@ split_parts_entry.pack(side="left", padx=(0, 5))
 ttk.Label(parts_frame, text="partes iguais (ex: 18 páginas ÷ 3 partes = 6 páginas/parte)", 
           foreground="gray", font=("Segoe UI", 8)).pack(side="left")
 
+# ----- MODO 5: DIVIDIR POR TAMANHO MÁXIMO -----
+size_radio = ttk.Radiobutton(
+    frame_split_opts,
+    text="Dividir em arquivos de até:",
+    variable=split_mode_var,
+    value="size"
+)
+size_radio.grid(row=4, column=0, padx=10, pady=5, sticky="w")
+
+size_frame = ttk.Frame(frame_split_opts)
+size_frame.grid(row=4, column=1, padx=5, pady=5, sticky="w")
+
+split_size_entry = ttk.Entry(size_frame, textvariable=split_size_var, width=8)
+split_size_entry.pack(side="left", padx=(0, 5))
+
+ttk.Label(size_frame, text="MB cada (páginas consecutivas, ex: limite de upload do sistema)", 
+          foreground="gray", font=("Segoe UI", 8)).pack(side="left")
+
 # ----- MODO 4: DIVIDIR TODAS AS PÁGINAS (AGORA EM ÚLTIMO LUGAR) -----
 all_radio = ttk.Radiobutton(
     frame_split_opts,
@@ -3484,7 +6569,7 @@ all_radio = ttk.Radiobutton(
     variable=split_mode_var,
     value="all"
 )
-all_radio.grid(row=4, column=0, columnspan=2, padx=10, pady=5, sticky="w")
+all_radio.grid(row=5, column=0, columnspan=2, padx=10, pady=5, sticky="w")
 
 # Configurar estados iniciais dos campos
 def update_split_fields_state(*args):
@@ -3495,6 +6580,7 @@ def update_split_fields_state(*args):
     split_pages_entry.config(state="disabled")
     split_interval_entry.config(state="disabled")
     split_parts_entry.config(state="disabled")
+    split_size_entry.config(state="disabled")
     
     # Habilita apenas o campo do modo selecionado
     if mode == "extract":
@@ -3503,6 +6589,8 @@ def update_split_fields_state(*args):
         split_interval_entry.config(state="normal")
     elif mode == "parts":
         split_parts_entry.config(state="normal")
+    elif mode == "size":
+        split_size_entry.config(state="normal")
 
 # Conectar mudança de modo
 split_mode_var.trace_add("write", update_split_fields_state)
@@ -3525,9 +6613,10 @@ ttk.Button(frame_output_split, text="Selecionar Pasta",
 pdfa_var_split.set(PDFA_AVAILABLE)
 pdfa_check_split = ttk.Checkbutton(frame_output_split, text="Converter para PDF/A-2B", variable=pdfa_var_split)
 pdfa_check_split.grid(row=1, column=0, columnspan=2, sticky="w", padx=10, pady=3)
+TEXTO_PDFA_SPLIT = "Formato recomendado para documentos eletrônicos no SEI/Governo Federal"
 pdfa_info_split = ttk.Label(
     frame_output_split,
-    text="Formato recomendado para documentos eletrônicos no SEI/Governo Federal",
+    text=TEXTO_PDFA_SPLIT,
     foreground="darkgreen", 
     font=("Segoe UI", 8)
 )
@@ -3537,6 +6626,23 @@ if not PDFA_AVAILABLE:
     pdfa_check_split.config(state="disabled")
     pdfa_info_split.config(text="Instale Ghostscript para habilitar", foreground="red")
 
+def atualizar_ui_ambiente():
+    """Reaplica a disponibilidade de PDF/A nas abas depois de uma nova detecção de ambiente"""
+    if PDFA_AVAILABLE:
+        pdfa_check.config(state="normal")
+        pdfa_check_split.config(state="normal")
+        pdfa_info_label.config(text=TEXTO_PDFA_MERGE, foreground="darkgreen")
+        pdfa_info_split.config(text=TEXTO_PDFA_SPLIT, foreground="darkgreen")
+        show_status("PDF/A ✓ - Ghostscript detectado", "info")
+    else:
+        pdfa_var.set(False)
+        pdfa_var_split.set(False)
+        pdfa_check.config(state="disabled")
+        pdfa_check_split.config(state="disabled")
+        pdfa_info_label.config(text="Instale Ghostscript para habilitar PDF/A", foreground="red")
+        pdfa_info_split.config(text="Instale Ghostscript para habilitar", foreground="red")
+        show_status("PDF/A ✗ (Ghostscript não detectado)", "warning")
+
 frame_output_split.columnconfigure(1, weight=1)
 
 # BOTÃO PRINCIPAL
@@ -3557,6 +6663,113 @@ progress_split.pack(pady=5)
 # Botão cancelar
 btn_cancel_split = ttk.Button(split_frame, text="Cancelar Operação", command=cancel_split)
 
+# -----------------------
+# Aba Fila de Trabalhos
+# -----------------------
+def trabalho_selecionado():
+    selecao = fila_tree.selection()
+    return int(selecao[0]) if selecao else None
+
+def mover_trabalho_selecionado(direcao):
+    trabalho_id = trabalho_selecionado()
+    if trabalho_id is not None and fila_trabalhos.mover(trabalho_id, direcao):
+        atualizar_fila_ui()
+
+def cancelar_trabalho_selecionado():
+    trabalho_id = trabalho_selecionado()
+    if trabalho_id is not None:
+        fila_trabalhos.cancelar(trabalho_id)
+        atualizar_fila_ui()
+
+def limpar_trabalhos_finalizados():
+    fila_trabalhos.limpar_finalizados()
+    atualizar_fila_ui()
+
+def on_concorrencia_change(*_):
+    try:
+        fila_trabalhos.definir_concorrencia(int(fila_concorrencia_var.get()))
+    except (ValueError, tk.TclError):
+        pass
+
+def atualizar_fila_ui(agendar=False):
+    """Sincroniza a aba Fila, as barras de progresso e os botões de cancelar com a fila"""
+    trabalhos = fila_trabalhos.listar()
+    ids_atuais = set()
+    for posicao, (trabalho_id, tipo, descricao, estado, maximo, valor, erro) in enumerate(trabalhos):
+        iid = str(trabalho_id)
+        ids_atuais.add(iid)
+        percentual = f"{min(100, int(valor * 100 / maximo))}%" if estado == "Executando" else ""
+        valores = (trabalho_id, "Juntar" if tipo == "merge" else "Dividir", descricao, estado, percentual, erro or "")
+        if fila_tree.exists(iid):
+            fila_tree.item(iid, values=valores)
+            if fila_tree.index(iid) != posicao:
+                fila_tree.move(iid, "", posicao)
+        else:
+            fila_tree.insert("", posicao, iid=iid, values=valores)
+    for iid in fila_tree.get_children():
+        if iid not in ids_atuais:
+            fila_tree.delete(iid)
+
+    # Barras e botões de cada aba refletem os trabalhos daquele tipo
+    for tipo, barra, botao in (("merge", progress_merge, btn_cancel_merge), ("split", progress_split, btn_cancel_split)):
+        do_tipo = [t for t in trabalhos if t[1] == tipo and t[3] in ("Na fila", "Executando")]
+        executando = [t for t in do_tipo if t[3] == "Executando"]
+        if executando:
+            safe_widget_config(barra, maximum=executando[-1][4], value=executando[-1][5])
+        else:
+            safe_widget_config(barra, value=0)
+        try:
+            if do_tipo and not botao.winfo_ismapped():
+                botao.pack(pady=5)
+            elif not do_tipo and botao.winfo_ismapped():
+                botao.pack_forget()
+        except tk.TclError:
+            pass
+
+    ativos = sum(1 for t in trabalhos if t[3] in ("Na fila", "Executando"))
+    notebook.tab(fila_frame, text=f"Fila de Trabalhos ({ativos})" if ativos else "Fila de Trabalhos")
+
+    if agendar:
+        root.after(FILA_ATUALIZACAO_MS, atualizar_fila_ui, True)
+
+fila_frame = ttk.Frame(notebook)
+notebook.add(fila_frame, text="Fila de Trabalhos")
+
+frame_trabalhos = ttk.LabelFrame(fila_frame, text="Uniões e divisões enfileiradas")
+frame_trabalhos.pack(fill="both", expand=True, padx=10, pady=5)
+
+fila_tree = ttk.Treeview(
+    frame_trabalhos,
+    columns=("id", "tipo", "descricao", "estado", "progresso", "erro"),
+    show="headings",
+    selectmode="browse"
+)
+for coluna, titulo, largura in (("id", "#", 40), ("tipo", "Tipo", 70), ("descricao", "Descrição", 320),
+                                ("estado", "Estado", 100), ("progresso", "Progresso", 80), ("erro", "Erro", 200)):
+    fila_tree.heading(coluna, text=titulo)
+    fila_tree.column(coluna, width=largura, stretch=(coluna == "descricao"))
+fila_scrollbar = ttk.Scrollbar(frame_trabalhos, orient="vertical", command=fila_tree.yview)
+fila_tree.configure(yscrollcommand=fila_scrollbar.set)
+fila_tree.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+fila_scrollbar.pack(side="right", fill="y")
+
+btn_frame_fila = ttk.Frame(fila_frame)
+btn_frame_fila.pack(fill="x", padx=10, pady=5)
+ttk.Button(btn_frame_fila, text="⏫ Priorizar", command=lambda: mover_trabalho_selecionado("topo")).pack(side="left", padx=5)
+ttk.Button(btn_frame_fila, text="↑ Subir", command=lambda: mover_trabalho_selecionado("subir")).pack(side="left", padx=5)
+ttk.Button(btn_frame_fila, text="↓ Descer", command=lambda: mover_trabalho_selecionado("descer")).pack(side="left", padx=5)
+ttk.Button(btn_frame_fila, text="✖ Cancelar", command=cancelar_trabalho_selecionado).pack(side="left", padx=5)
+ttk.Button(btn_frame_fila, text="🧹 Limpar Finalizados", command=limpar_trabalhos_finalizados).pack(side="left", padx=5)
+
+fila_concorrencia_var = tk.StringVar(value=str(fila_trabalhos.concorrencia))
+ttk.Spinbox(btn_frame_fila, from_=1, to=MAX_CONCURRENT_OPERATIONS, width=4,
+            textvariable=fila_concorrencia_var, command=on_concorrencia_change).pack(side="right", padx=5)
+ttk.Label(btn_frame_fila, text="Simultâneos:").pack(side="right")
+fila_concorrencia_var.trace_add("write", on_concorrencia_change)
+
+root.after(FILA_ATUALIZACAO_MS, atualizar_fila_ui, True)
+bomba_ui.iniciar(root)
+
 # -----------------------
 # Atalhos globais
 # -----------------------
@@ -3617,6 +6830,18 @@ def on_merge_filename_focusout(event):
 merge_filename_entry.bind("<FocusIn>", on_merge_filename_focusin)
 merge_filename_entry.bind("<FocusOut>", on_merge_filename_focusout)
 
+# Perfis da lista atual: calculados uma vez em segundo plano; mudar opções só refaz a conta
+perfis_preview = {'arquivos': None, 'perfis': None}
+
+def calcular_perfis_preview(files):
+    perfis = [obter_perfil_conteudo(f) for f in files if os.path.exists(f)]
+    bomba_ui.publicar(("perfis_preview",), aplicar_perfis_preview, files, perfis)
+
+def aplicar_perfis_preview(files, perfis):
+    if perfis_preview['arquivos'] == files:
+        perfis_preview['perfis'] = perfis
+        update_filename_preview()
+
 # Função para atualizar preview do nome
 def update_filename_preview():
     files = merge_list.get(0, tk.END)
@@ -3624,19 +6849,30 @@ def update_filename_preview():
         filename_preview_var.set("Nenhum arquivo selecionado")
         return
     
+    preview_name = get_default_output_name("merge", files, {...})
+    
     # 🔥 ADICIONAR ESTIMAÇÃO DE TAMANHO
-    estimated_size = estimate_final_size(files, {
+    if perfis_preview['arquivos'] != files:
+        perfis_preview.update(arquivos=files, perfis=None)
+        threading.Thread(target=calcular_perfis_preview, args=(files,), name="JuntaPDF-estimativa", daemon=True).start()
+    if perfis_preview['perfis'] is None:
+        filename_preview_var.set(f"Nome: {preview_name} | Tamanho estimado: calculando...")
+        return
+    
+    estimativa = estimar_tamanho_saida(perfis_preview['perfis'], {
         'compress': compress_var.get(),
-        'compress_level': compress_level.get()
+        'compress_level': compress_level.get(),
+        'pdfa': pdfa_var.get()
     })
-    
-    preview_name = get_default_output_name("merge", files, {...})
-    preview_text = f"Nome: {preview_name} | Tamanho estimado: {estimated_size/1024/1024:.1f}MB"
+    mb = 1024 * 1024
+    preview_text = (f"Nome: {preview_name} | Tamanho estimado: {estimativa['estimativa']/mb:.1f}MB "
+                    f"({estimativa['minimo']/mb:.1f}–{estimativa['maximo']/mb:.1f}MB)")
     filename_preview_var.set(preview_text)
 
 # Conectar eventos para atualizar preview
 merge_list.bind("<<ListboxSelect>>", lambda e: update_filename_preview())
 compress_var.trace_add("write", lambda *_: update_filename_preview())
+compress_level.trace_add("write", lambda *_: update_filename_preview())
 pdfa_var.trace_add("write", lambda *_: update_filename_preview())
 protect_var.trace_add("write", lambda *_: update_filename_preview())
 
@@ -9,27 +9,27 @@ import sys
 import os
 import platform
 import subprocess
+import importlib.util
+
+def modulo_instalado(nome):
+    """Verifica se o módulo existe sem importá-lo (o programa importa ao usar)"""
+    try:
+        return importlib.util.find_spec(nome) is not None
+    except (ImportError, ValueError):
+        return False
 
 def verificar_dependencias():
     """Verifica dependências de forma silenciosa"""
-    try:
-        import PyPDF2
-        import tkinter
-        # Verifica opcionais sem mostrar erro
-        try: import pikepdf; pikepdf_ok = True
-        except: pikepdf_ok = False
-        try: import tkinterdnd2; dnd_ok = True  
-        except: dnd_ok = False
-        try: import psutil; psutil_ok = True
-        except: psutil_ok = False
-        
-        return True, {
-            'pikepdf': pikepdf_ok,
-            'tkinterdnd2': dnd_ok, 
-            'psutil': psutil_ok
-        }
-    except ImportError as e:
-        return False, str(e)
+    for obrigatorio in ("PyPDF2", "tkinter"):
+        if not modulo_instalado(obrigatorio):
+            return False, f"No module named '{obrigatorio}'"
+    
+    # Verifica opcionais sem mostrar erro
+    return True, {
+        'pikepdf': modulo_instalado("pikepdf"),
+        'tkinterdnd2': modulo_instalado("tkinterdnd2"), 
+        'psutil': modulo_instalado("psutil")
+    }
 
 def executar_vbs_silencioso():
     """Tenta executar via VBS completamente silencioso"""